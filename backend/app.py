@@ -1,15 +1,28 @@
 import os
-from flask import Flask, jsonify, request, abort
-from cachetools import TTLCache
+import hmac
+import atexit
+import threading
+from functools import lru_cache
+from flask import Flask, jsonify, request, abort, g
 from dataclasses import asdict
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, JWTManager
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity, get_jwt, JWTManager
 from flask_cors import CORS
 from google.cloud import logging_v2
 from datetime import timedelta
 
 from shared.secrets import get_secret
 from shared.notion_client import NotionClient
+from shared.notion_mirror import NotionMirror, get_mirror
+from shared.github_client import GitHubClient
+from shared.github_auth import get_token_manager
+from shared.event_queue import CoalescingQueue
+from shared import webhooks
+from shared.response_cache import TenantCache
+from shared.job_store import get_job_store
+from shared.name_claims import NameGuard
+from shared.tenants import DEFAULT_TENANT, load_tenants, scope_key, split_scoped_key
 from shared.firestore_client import FirestoreClient
+from shared import telemetry
 
 # --- Initialization ---
 app = Flask(__name__)
@@ -17,7 +30,6 @@ CORS(app, origins=["http://localhost:3000", "http://127.0.0.1:3000"], supports_c
 
 # Load secrets
 GCP_PROJECT_ID = os.getenv("GCP_PROJECT_ID")
-NOTION_API_KEY = get_secret("NOTION_API_KEY", project_id=GCP_PROJECT_ID)
 INTERNAL_API_KEY = get_secret("INTERNAL_API_KEY", project_id=GCP_PROJECT_ID) # For inter-service auth if needed
 
 # Setup the Flask-JWT-Extended extension
@@ -25,14 +37,187 @@ app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=15)
 app.config["JWT_SECRET_KEY"] = get_secret("JWT_SECRET_KEY", project_id=GCP_PROJECT_ID)
 jwt = JWTManager(app)
 
-# In-memory cache with a 10-minute time-to-live
-cache = TTLCache(maxsize=10, ttl=600)
+# In-memory cache with a 10-minute time-to-live, shared by the worker's request threads and
+# partitioned per tenant so one team's entries never evict another's
+cache = TenantCache(
+    maxsize_per_tenant=10,
+    ttl=float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "600")),
+    max_tenants=int(os.getenv("DASHBOARD_CACHE_MAX_TENANTS", "64")),
+)
 
-# Instantiate clients
-notion_db_id = get_secret("PROJECTS_DB_ID", project_id=GCP_PROJECT_ID)
-notion = NotionClient(api_key=get_secret("NOTION_API_KEY", project_id=GCP_PROJECT_ID), projects_db_id=notion_db_id)
+# Notion workspaces served by this deployment (just the default one unless TENANTS is set)
+tenants = load_tenants(GCP_PROJECT_ID)
 firestore = FirestoreClient()
-logging_client = logging_v2.Client()
+_logging_client = None
+_tenant_clients = {}  # tenant id -> (NotionClient, dashboard source)
+# Guards the lazily created clients below; under gunicorn's gthread workers requests run on many threads.
+_client_lock = threading.Lock()
+
+def get_tenant_clients(tenant_id: str) -> tuple:
+    """Returns (NotionClient, dashboard source) for a tenant, creating them on first use."""
+    with _client_lock:
+        clients = _tenant_clients.get(tenant_id)
+        if clients is None:
+            notion = tenants[tenant_id].notion_client(GCP_PROJECT_ID)
+            # Reads come from the tenant's SQLite mirror when NOTION_MIRROR_PATH is set; otherwise Notion is crawled live.
+            clients = _tenant_clients[tenant_id] = (notion, get_mirror(tenant_id) or notion)
+    return clients
+
+def is_operator() -> bool:
+    """Whether the request carries the internal API key, i.e. comes from an operator or an internal service."""
+    api_key = request.headers.get("X-Internal-API-Key", "")
+    return bool(INTERNAL_API_KEY) and hmac.compare_digest(api_key.encode(), INTERNAL_API_KEY.encode())
+
+def current_tenant() -> str:
+    """The signed-in user's tenant, from the JWT `tenant` claim. Tokens without one belong to the default tenant."""
+    tenant_id = get_jwt().get("tenant", DEFAULT_TENANT)
+    if tenant_id not in tenants:
+        abort(403, description="This account is not assigned to a workspace.")
+    return tenant_id
+
+def get_logging_client() -> logging_v2.Client:
+    """Creates the Cloud Logging client on first use, so the API can start without logging credentials."""
+    global _logging_client
+    with _client_lock:
+        if _logging_client is None:
+            _logging_client = logging_v2.Client()
+    return _logging_client
+
+# --- Event-Driven Sync ---
+# Webhook events are coalesced per project and debounced, then only the affected projects are synced.
+# Each tenant has its own webhook URLs (/v1/webhooks/<source>/<tenant id>) and secrets.
+
+_webhook_secrets = {}  # (tenant id, secret name) -> secret
+
+def webhook_secret(tenant_id: str, name: str):
+    """
+    GITHUB_WEBHOOK_SECRET or NOTION_WEBHOOK_SECRET for a tenant, or None when not configured.
+    Only found secrets are cached, so a secret stored after the handshake is picked up without a restart.
+    """
+    secret = _webhook_secrets.get((tenant_id, name))
+    if secret is None:
+        secret = tenants[tenant_id].optional_secret(name, GCP_PROJECT_ID)
+        if secret:
+            _webhook_secrets[(tenant_id, name)] = secret
+    return secret
+
+@lru_cache(maxsize=None)
+def dashboard_only_db_ids(tenant_id: str) -> frozenset:
+    """Pages in these databases only feed the dashboard, never GitHub."""
+    return frozenset(tenants[tenant_id].dashboard_only_database_ids(GCP_PROJECT_ID))
+
+_github_token_manager = None
+_github_client = None
+
+def get_github_token_manager():
+    """Shared by every webhook sync so a valid token is reused; the API never falls back to browser sign-in."""
+    global _github_token_manager
+    with _client_lock:
+        if _github_token_manager is None:
+            _github_token_manager = get_token_manager(GCP_PROJECT_ID)
+    return _github_token_manager
+
+def get_github_client() -> GitHubClient:
+    """
+    One GitHub client per process, created on first use: webhook batches then share its rate budget,
+    ETag cache and connection pool instead of starting cold. Batches run one at a time on the sync queue's thread.
+    """
+    global _github_client
+    token_manager = get_github_token_manager()
+    with _client_lock:
+        if _github_client is None:
+            _github_client = GitHubClient(token_manager=token_manager)
+    return _github_client
+
+# Set once the process is shutting down: batches are then only queued as jobs, which the scheduled sync worker drains.
+_shutting_down = threading.Event()
+
+def sync_tenant_changes(tenant_id: str, keys: list):
+    """
+    Refreshes a tenant's local Notion data, then syncs its affected projects to GitHub. A changed
+    feature or quality characteristic page is found in the refreshed mirror and mapped to its project.
+    """
+    from workers import github_sync_worker
+
+    shutting_down = _shutting_down.is_set()
+    notion, dashboard_source = get_tenant_clients(tenant_id)
+    if any(webhooks.split_key(key)[0] in (webhooks.NOTION_PAGE, webhooks.NOTION_DATA) for key in keys):
+        cache.pop(tenant_id, "dashboard_data")
+        cache.pop(tenant_id, "dashboard_summary")
+        # Pages the mirror has not seen yet resolve to every active project, so skipping the refresh
+        # on shutdown only queues more jobs than needed; the next refresh still picks the edit up.
+        if isinstance(dashboard_source, NotionMirror) and not shutting_down:
+            dashboard_source.refresh(notion)
+    sync_keys = [key for key in keys if webhooks.split_key(key)[0] != webhooks.NOTION_DATA]
+    if sync_keys:
+        # Tenants share the GitHub account, so repo and board names belong to the first tenant that syncs them.
+        guard = NameGuard(tenant_id) if len(tenants) > 1 else None
+        github_sync_worker.sync_targets(sync_keys, notion=dashboard_source, github=get_github_client(),
+                                        store=get_job_store(tenant_id), drain_now=not shutting_down,
+                                        tenant_id=tenant_id, guard=guard)
+
+def sync_changed_projects(scoped_keys: list):
+    """Coalescing queue handler: splits a batch of tenant-scoped keys by tenant and syncs each tenant in turn."""
+    keys_by_tenant = {}
+    for scoped_key in scoped_keys:
+        tenant_id, key = split_scoped_key(scoped_key)
+        keys_by_tenant.setdefault(tenant_id, []).append(key)
+    for tenant_id, keys in keys_by_tenant.items():
+        try:
+            sync_tenant_changes(tenant_id, keys)
+        except Exception as e:
+            # One tenant's failure must not hold back the others in the batch.
+            print(f"Sync of tenant '{tenant_id}' changes failed: {e}")
+
+# The queue flushes on a background thread between requests, so the Cloud Run service must keep its
+# CPU allocated outside requests (--no-cpu-throttling, see cloudbuild.yaml); with throttled CPU a
+# debounced batch may not run until the next request arrives.
+sync_queue = CoalescingQueue(
+    sync_changed_projects,
+    debounce_seconds=float(os.getenv("SYNC_DEBOUNCE_SECONDS", "5")),
+    max_delay_seconds=float(os.getenv("SYNC_MAX_DELAY_SECONDS", "30")),
+)
+
+def shutdown_sync_queue():
+    """
+    Hands the keys still waiting in the debounce window to the durable job store before the process
+    exits, instead of dropping them. The jobs are not drained here, as Cloud Run stops the instance
+    seconds after SIGTERM; the scheduled sync worker runs them.
+    """
+    _shutting_down.set()
+    left = sync_queue.stop(timeout=float(os.getenv("SYNC_SHUTDOWN_TIMEOUT_SECONDS", "8")))
+    if left:
+        print(f"Sync queue stopped before {len(left)} key(s) could be queued: {left}")
+
+atexit.register(shutdown_sync_queue)
+
+# --- Request Instrumentation ---
+
+@app.before_request
+def start_request_span():
+    """Opens a server span for the request and starts counting its outbound API calls."""
+    g.telemetry_accounting = telemetry.start_call_accounting()
+    g.telemetry_span = telemetry.start_span(f"{request.method} {request.url_rule.rule if request.url_rule else request.path}",
+                                            telemetry.SERVER, http_method=request.method)
+
+@app.after_request
+def record_request_status(response):
+    span = g.get("telemetry_span")
+    if span:
+        span.set_attribute("http.status_code", response.status_code)
+        calls = telemetry.current_call_counts()
+        span.set_attribute("outbound_calls", calls)
+        response.headers["X-Outbound-Calls"] = str(sum(calls.values()))
+    return response
+
+@app.teardown_request
+def end_request_span(error=None):
+    span = g.pop("telemetry_span", None)
+    if span:
+        span.end(error=error)
+    token = g.pop("telemetry_accounting", None)
+    if token:
+        telemetry.stop_call_accounting(token)
 
 # --- Authentication Endpoints ---
 
@@ -60,7 +245,8 @@ def login_user():
     
     if user and firestore.verify_password(user.password_hash, data['password']):
         # Identity can be any data that is json serializable
-        access_token = create_access_token(identity=user.email)
+        # The tenant claim scopes every dashboard request to the user's workspace.
+        access_token = create_access_token(identity=user.email, additional_claims={"tenant": user.tenant_id or DEFAULT_TENANT})
         return jsonify(token=access_token)
     
     return abort(401, description="Invalid credentials.")
@@ -92,30 +278,125 @@ def get_profile():
 def get_dashboard_data():
     print("JWT identity:", get_jwt_identity())
     """Endpoint to get all data for the main dashboard."""
-    cache_key = "dashboard_data"
-    cached_data = cache.get(cache_key)
-    if cached_data:
-        print("Returning data from cache.")
-        return jsonify(asdict(cached_data))
+    # Concurrent misses share one fetch instead of each crawling Notion.
+    tenant_id = current_tenant()
+    dashboard_source = get_tenant_clients(tenant_id)[1]
+    dashboard_data, hit = cache.get_or_load(tenant_id, "dashboard_data", dashboard_source.get_all_dashboard_data)
+    print("Returning data from cache." if hit else "Cache miss. Fetched dashboard data.")
+
+    with telemetry.span("dashboard.serialize", cache="hit" if hit else "miss"):
+        return jsonify(asdict(dashboard_data))
+
+@app.route("/v1/dashboard/summary", methods=["GET"])
+@jwt_required()
+def get_dashboard_summary():
+    """Counts for summary views (by status, assignee, CRM phase; overdue tasks) without the rows themselves."""
+    tenant_id = current_tenant()
+
+    def load_summary():
+        # A cached full snapshot already carries its aggregates.
+        cached_data = cache.get(tenant_id, "dashboard_data")
+        return cached_data.aggregates if cached_data and cached_data.aggregates else get_tenant_clients(tenant_id)[1].get_dashboard_summary()
 
-    print("Cache miss. Fetching data from Notion.")
-    dashboard_data = notion.get_all_dashboard_data()
-    cache[cache_key] = dashboard_data
+    summary, _ = cache.get_or_load(tenant_id, "dashboard_summary", load_summary)
+    return jsonify(asdict(summary))
 
-    return jsonify(asdict(dashboard_data))
+@app.route("/v1/metrics", methods=["GET"])
+@jwt_required(optional=True)
+def get_metrics():
+    """
+    Latency percentiles and error counts per traced span, plus cache and webhook sync queue counters.
+    Those cover every tenant served by this process, so only operators (internal API key) see them;
+    a signed-in user gets their own tenant's cache counters and pending webhook syncs.
+    """
+    if is_operator():
+        return jsonify({**telemetry.metrics_snapshot(), "cache": cache.stats,
+                        "sync_queue": {**sync_queue.stats, "pending": len(sync_queue.pending())}})
+    if get_jwt_identity() is None:
+        abort(401, description="Sign in or use the internal API key.")
+    tenant_id = current_tenant()
+    pending = [key for key in sync_queue.pending() if split_scoped_key(key)[0] == tenant_id]
+    return jsonify({"cache": cache.stats["tenants"].get(tenant_id, {}), "sync_queue": {"pending": len(pending)}})
+
+# --- Webhook Endpoints ---
+
+def _webhook_tenant(tenant_id: str) -> str:
+    if tenant_id not in tenants:
+        abort(404, description=f"Unknown tenant '{tenant_id}'.")
+    return tenant_id
+
+@app.route("/v1/webhooks/github", methods=["POST"])
+@app.route("/v1/webhooks/github/<tenant_id>", methods=["POST"])
+def github_webhook(tenant_id: str = DEFAULT_TENANT):
+    """Receives `issues` and `projects_v2_item` events and queues a sync of the affected project."""
+    secret = webhook_secret(_webhook_tenant(tenant_id), "GITHUB_WEBHOOK_SECRET")
+    if not secret:
+        abort(503, description="GitHub webhooks are not configured.")
+    if not webhooks.verify_signature(secret, request.get_data(), request.headers.get("X-Hub-Signature-256")):
+        abort(401, description="Invalid signature.")
+
+    keys = webhooks.keys_from_github_event(request.headers.get("X-GitHub-Event", ""), request.get_json(silent=True) or {})
+    sync_queue.submit(scope_key(tenant_id, key) for key in keys)
+    return jsonify({"queued": keys}), 202
+
+@app.route("/v1/webhooks/notion", methods=["POST"])
+@app.route("/v1/webhooks/notion/<tenant_id>", methods=["POST"])
+def notion_webhook(tenant_id: str = DEFAULT_TENANT):
+    """Receives Notion page change events and queues a sync of the affected project."""
+    _webhook_tenant(tenant_id)
+    payload = request.get_json(silent=True) or {}
+    if "verification_token" in payload:
+        # One-time subscription handshake: the token becomes the tenant's NOTION_WEBHOOK_SECRET. It is
+        # kept out of the logs; an operator fetches it once from the admin endpoint below. Anyone can
+        # post a handshake, so only the first token is kept.
+        if not firestore.save_webhook_verification(tenant_id, "notion", payload["verification_token"]):
+            print(f"Ignored a Notion webhook verification token for tenant '{tenant_id}': one was already received.")
+            return jsonify({"status": "ignored"}), 200
+        print(f"Received a Notion webhook verification token for tenant '{tenant_id}'; fetch it from "
+              f"/v1/admin/webhooks/notion/{tenant_id}/verification-token and store it as "
+              f"{tenants[tenant_id].secret_id('NOTION_WEBHOOK_SECRET')}.")
+        return jsonify({"status": "received"}), 200
+    secret = webhook_secret(tenant_id, "NOTION_WEBHOOK_SECRET")
+    if not secret:
+        abort(503, description="Notion webhooks are not configured.")
+    if not webhooks.verify_signature(secret, request.get_data(), request.headers.get("X-Notion-Signature")):
+        abort(401, description="Invalid signature.")
+
+    keys = webhooks.keys_from_notion_event(payload, dashboard_only_db_ids(tenant_id))
+    sync_queue.submit(scope_key(tenant_id, key) for key in keys)
+    return jsonify({"queued": keys}), 202
+
+@app.route("/v1/admin/webhooks/notion/<tenant_id>/verification-token", methods=["POST"])
+def claim_notion_verification_token(tenant_id: str):
+    """
+    Returns the Notion webhook verification token received for a tenant and deletes it, so it can be
+    read only once. Requires the internal API key in the X-Internal-API-Key header.
+    """
+    _webhook_tenant(tenant_id)
+    if not is_operator():
+        abort(401, description="Invalid API key.")
+    token = firestore.pop_webhook_verification(tenant_id, "notion")
+    if token is None:
+        abort(404, description="No verification token is waiting for this tenant.")
+    return jsonify({"verification_token": token,
+                    "secret_id": tenants[tenant_id].secret_id("NOTION_WEBHOOK_SECRET")}), 200
 
 @app.route("/v1/logs", methods=["GET"])
 @jwt_required()
 def get_logs():
-    """Fetches structured logs from Google Cloud Logging."""
+    """Fetches the signed-in user's tenant's structured worker logs from Google Cloud Logging."""
     limit = request.args.get('limit', 50, type=int)
+    tenant_id = current_tenant()
     
     # Filter for logs created by our workers that have a jsonPayload
     # In production, you might filter by a specific log name
-    log_filter = f'jsonPayload.service:"GitHub Sync Worker"'
+    log_filter = f'jsonPayload.service:"GitHub Sync Worker" AND jsonPayload.tenant="{tenant_id}"'
+    if tenant_id == DEFAULT_TENANT:
+        # Entries written before logs carried a tenant belong to the single-workspace setup.
+        log_filter = f'jsonPayload.service:"GitHub Sync Worker" AND (jsonPayload.tenant="{tenant_id}" OR NOT jsonPayload.tenant:*)'
     
     try:
-        entries = logging_client.list_log_entries(
+        entries = get_logging_client().list_log_entries(
             resource_names=[f"projects/{GCP_PROJECT_ID}"],
             filter_=log_filter,
             order_by=logging_v2.DESCENDING,
@@ -146,4 +427,5 @@ def get_logs():
         abort(500, description="Could not fetch logs.")
 
 if __name__ == "__main__":
+    # Flask's development server; production runs under gunicorn (see gunicorn.conf.py).
     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 8080)))
\ No newline at end of file
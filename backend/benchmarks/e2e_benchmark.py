@@ -0,0 +1,296 @@
+"""
+End-to-end performance benchmarks against local Notion and GitHub stand-in servers.
+
+Covers:
+    NotionClient.get_all_dashboard_data
+    github_sync_worker.run: a cold run that creates everything, then a warm run that
+        only checks for updates
+    /v1/dashboard: cache miss and hit
+    the local Notion mirror: full and incremental refresh, then dashboard reads served
+        from SQLite
+    the sync planner: planning against an empty and a synced GitHub account, and the
+        diff alone over pre-fetched snapshots
+    the reverse GitHub -> Notion sync: half the issues closed, written back serially
+        and concurrently
+Reports wall time, API request counts and peak Python memory.
+
+Usage (from the backend directory):
+    python -m benchmarks.e2e_benchmark [--sizes 10,100,1000,10000] [--latency-ms 0]
+        [--rate-limit-every 0] [--only dashboard,sync,api,mirror,plan,reverse] [--json results.json]
+        [--compare baseline.json --tolerance 0.25]
+
+With --compare, the run exits non-zero if any wall time or request count regressed
+by more than the tolerance against the baseline results file.
+"""
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import dataclass, asdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.fake_servers import FakeNotionServer, FakeGitHubServer
+from benchmarks.fake_workspace import DATABASE_IDS, GitHubState, make_notion_workspace
+
+BENCHMARKS = ("dashboard", "sync", "api", "mirror", "plan", "reverse")
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    rows: int
+    wall_ms: float
+    requests: int
+    rate_limited: int
+    peak_mb: float
+    ok: bool = True
+
+
+def _configure_environment(notion_server: FakeNotionServer, github_server: FakeGitHubServer):
+    """Points every client and secret lookup at the stand-in servers."""
+    os.environ.update(DATABASE_IDS)
+    os.environ.update({
+        "NOTION_API_URL": notion_server.api_url,
+        "GITHUB_API_URL": github_server.api_url,
+        "NOTION_API_KEY": "bench-notion-key",
+        "INTERNAL_API_KEY": "bench-internal-key",
+        "JWT_SECRET_KEY": "bench-jwt-secret-with-enough-length",
+        # Lets google-cloud-firestore build a client without credentials; no calls reach it.
+        "FIRESTORE_EMULATOR_HOST": os.getenv("FIRESTORE_EMULATOR_HOST", "127.0.0.1:8681"),
+        "GOOGLE_CLOUD_PROJECT": os.getenv("GOOGLE_CLOUD_PROJECT", "bench-project"),
+    })
+
+
+def _measure(name: str, rows: int, func, servers: list, track_memory: bool) -> BenchmarkResult:
+    for server in servers:
+        server.reset_counts()
+    if track_memory:
+        tracemalloc.start()
+    captured = io.StringIO()
+    start = time.perf_counter()
+    ok = True
+    try:
+        with redirect_stdout(captured):
+            func()
+    except Exception as e:
+        print(f"  {name} failed: {e}")
+        ok = False
+    wall_ms = (time.perf_counter() - start) * 1000
+    peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if track_memory else 0.0
+    if track_memory:
+        tracemalloc.stop()
+    # The sync worker swallows its own exceptions and logs a WORKER_FAILURE line instead.
+    if "WORKER_FAILURE" in captured.getvalue():
+        ok = False
+    return BenchmarkResult(
+        name=name,
+        rows=rows,
+        wall_ms=wall_ms,
+        requests=sum(server.total_requests for server in servers),
+        rate_limited=sum(server.request_counts["rate_limited"] for server in servers),
+        peak_mb=peak_mb,
+        ok=ok,
+    )
+
+
+def _bench_dashboard(rows, notion_server, track_memory):
+    from shared.notion_client import NotionClient
+
+    notion = NotionClient(api_key="bench-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"])
+    return [_measure("get_all_dashboard_data", rows, notion.get_all_dashboard_data, [notion_server], track_memory)]
+
+
+def _bench_sync(rows, notion_server, github_server, track_memory):
+    from shared.notion_client import NotionClient
+    from shared.github_client import GitHubClient
+    from workers import github_sync_worker
+    from shared.job_store import InMemoryJobStore
+
+    github_server.state = GitHubState()
+    store = InMemoryJobStore()
+    notion = NotionClient(api_key="bench-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"])
+    # PyGithub's write throttling is disabled so the benchmark measures our own overhead.
+    github = GitHubClient(token="bench-github-token", fetch_schema=False,
+                          seconds_between_requests=0, seconds_between_writes=0)
+    servers = [notion_server, github_server]
+    return [
+        _measure("sync_run_cold", rows, lambda: github_sync_worker.run(notion=notion, github=github, store=store), servers, track_memory),
+        _measure("sync_run_warm", rows, lambda: github_sync_worker.run(notion=notion, github=github, store=store), servers, track_memory),
+    ]
+
+
+def _bench_api(rows, notion_server, track_memory):
+    try:
+        with redirect_stdout(io.StringIO()):
+            import app as api
+    except Exception as e:
+        print(f"  /v1/dashboard skipped: could not import the Flask app ({e})")
+        return []
+    from flask_jwt_extended import create_access_token
+
+    with api.app.app_context():
+        token = create_access_token(identity="bench@example.com")
+    client = api.app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def fetch():
+        response = client.get("/v1/dashboard", headers=headers)
+        if response.status_code != 200:
+            raise RuntimeError(f"/v1/dashboard returned {response.status_code}")
+
+    api.cache.clear()
+    return [
+        _measure("/v1/dashboard miss", rows, fetch, [notion_server], track_memory),
+        _measure("/v1/dashboard hit", rows, fetch, [notion_server], track_memory),
+    ]
+
+
+def _bench_mirror(rows, notion_server, track_memory):
+    from shared.notion_client import NotionClient
+    from shared.notion_mirror import NotionMirror
+
+    notion = NotionClient(api_key="bench-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"])
+    with tempfile.TemporaryDirectory() as mirror_dir:
+        mirror = NotionMirror(os.path.join(mirror_dir, "mirror.db"))
+        return [
+            _measure("mirror_refresh_full", rows, lambda: mirror.refresh(notion), [notion_server], track_memory),
+            _measure("mirror_refresh_incr", rows, lambda: mirror.refresh(notion), [notion_server], track_memory),
+            _measure("mirror_dashboard_read", rows, mirror.get_all_dashboard_data, [notion_server], track_memory),
+        ]
+
+
+def _bench_plan(rows, notion_server, github_server, track_memory):
+    from shared.notion_client import NotionClient
+    from shared.github_client import GitHubClient
+    from shared import sync_plan
+    from workers import github_sync_worker
+    from shared.job_store import InMemoryJobStore
+
+    github_server.state = GitHubState()
+    notion = NotionClient(api_key="bench-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"])
+    github = GitHubClient(token="bench-github-token", fetch_schema=False,
+                          seconds_between_requests=0, seconds_between_writes=0)
+    servers = [notion_server, github_server]
+    with redirect_stdout(io.StringIO()):
+        project_pages = notion.get_active_projects()
+    results = [_measure("plan_cold", rows, lambda: sync_plan.plan_sync(notion, github, project_pages), servers, track_memory)]
+
+    with redirect_stdout(io.StringIO()):
+        github_sync_worker.run(notion=notion, github=github, store=InMemoryJobStore())
+        features = {page['id']: notion.get_features_for_project(page) for page in project_pages}
+        snapshot = sync_plan.snapshot_github(github, [sync_plan.project_name(page) for page in project_pages])
+    results.append(_measure("plan_warm", rows, lambda: sync_plan.plan_sync(notion, github, project_pages), servers, track_memory))
+    results.append(_measure("plan_diff_only", rows, lambda: sync_plan.build_plan(project_pages, features, snapshot), servers, track_memory))
+    return results
+
+
+def _bench_reverse(rows, notion_server, github_server, track_memory):
+    import copy
+    from shared.notion_client import NotionClient
+    from shared.github_client import GitHubClient
+    from shared import reverse_sync
+    from workers import github_sync_worker
+    from shared.job_store import InMemoryJobStore
+
+    github_server.state = GitHubState()
+    notion = NotionClient(api_key="bench-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"])
+    github = GitHubClient(token="bench-github-token", fetch_schema=False,
+                          seconds_between_requests=0, seconds_between_writes=0)
+    servers = [notion_server, github_server]
+    with redirect_stdout(io.StringIO()):
+        github_sync_worker.run(notion=notion, github=github, store=InMemoryJobStore())
+    # Close every other issue after the push, so GitHub is the newer side.
+    for node_id in list(github_server.state.issues)[::2]:
+        github_server.state.close_issue(node_id)
+    pages_before = copy.deepcopy(notion_server.workspace.pages)
+
+    def measure(name, max_workers):
+        notion_server.workspace.pages = copy.deepcopy(pages_before)
+        with tempfile.TemporaryDirectory() as state_dir:
+            # A fresh cursor reads every item; Notion pacing is off so the client's own throughput shows.
+            cursor = reverse_sync.ReverseSyncCursor(os.path.join(state_dir, "cursor.json"))
+            return _measure(name, rows, lambda: reverse_sync.run_reverse_sync(notion, github, cursor=cursor, max_workers=max_workers, rate=0),
+                            servers, track_memory)
+
+    return [measure("reverse_sync_serial", 1), measure("reverse_sync_concurrent", 8)]
+
+
+def run(sizes: list[int], benchmarks: list[str], latency_ms: float, rate_limit_every: int,
+        track_memory: bool = True) -> list[BenchmarkResult]:
+    results = []
+    server_options = {"latency_ms": latency_ms, "rate_limit_every": rate_limit_every, "retry_after": 0.05}
+    with FakeNotionServer(**server_options) as notion_server, FakeGitHubServer(**server_options) as github_server:
+        _configure_environment(notion_server, github_server)
+        for rows in sizes:
+            notion_server.workspace = make_notion_workspace(rows)
+            print(f"Running benchmarks for {rows} rows...")
+            if "dashboard" in benchmarks:
+                results += _bench_dashboard(rows, notion_server, track_memory)
+            if "sync" in benchmarks:
+                results += _bench_sync(rows, notion_server, github_server, track_memory)
+            if "api" in benchmarks:
+                results += _bench_api(rows, notion_server, track_memory)
+            if "mirror" in benchmarks:
+                results += _bench_mirror(rows, notion_server, track_memory)
+            if "plan" in benchmarks:
+                results += _bench_plan(rows, notion_server, github_server, track_memory)
+            if "reverse" in benchmarks:
+                results += _bench_reverse(rows, notion_server, github_server, track_memory)
+    return results
+
+
+def print_results(results: list[BenchmarkResult]):
+    print(f"\n{'benchmark':<24} {'rows':>7} {'wall ms':>11} {'requests':>9} {'429s':>6} {'peak MB':>9} {'ok':>4}")
+    for r in results:
+        print(f"{r.name:<24} {r.rows:>7} {r.wall_ms:>11.1f} {r.requests:>9} {r.rate_limited:>6} {r.peak_mb:>9.1f} {'yes' if r.ok else 'NO':>4}")
+
+
+def compare(results: list[BenchmarkResult], baseline_path: str, tolerance: float) -> list[str]:
+    """Returns a description of every regression beyond `tolerance` relative to the baseline file."""
+    with open(baseline_path) as baseline_file:
+        baseline = {(b["name"], b["rows"]): b for b in json.load(baseline_file)}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result.name, result.rows))
+        if not previous:
+            continue
+        for metric in ("wall_ms", "requests"):
+            old, new = previous[metric], getattr(result, metric)
+            if old and new > old * (1 + tolerance):
+                regressions.append(f"{result.name} @ {result.rows} rows: {metric} {old:.1f} -> {new:.1f}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000", help="Comma-separated task counts (projects = rows/10).")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="Comma-separated subset of: " + ", ".join(BENCHMARKS))
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency added to every stand-in API request.")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with a rate-limit error.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (faster, no peak memory column).")
+    parser.add_argument("--json", help="Write results to this file.")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression for --compare.")
+    args = parser.parse_args()
+
+    results = run(
+        sizes=[int(size) for size in args.sizes.split(",")],
+        benchmarks=args.only.split(","),
+        latency_ms=args.latency_ms,
+        rate_limit_every=args.rate_limit_every,
+        track_memory=not args.no_memory,
+    )
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump([asdict(r) for r in results], results_file, indent=2)
+    if args.compare:
+        regressions = compare(results, args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if regressions else 0)
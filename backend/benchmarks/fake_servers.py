@@ -0,0 +1,426 @@
+"""
+Local stand-ins for the Notion and GitHub APIs, used by the benchmarks.
+Both run on a background ThreadingHTTPServer, can add fixed latency to every
+request, can answer every Nth request with a rate-limit error, and count
+requests per route so benchmarks can report API call totals.
+"""
+import re
+import abc
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from benchmarks.fake_workspace import NotionWorkspace, GitHubState
+
+
+class FakeAPIServer(abc.ABC):
+    """Base class: owns the HTTP server thread, latency/rate-limit injection and request counters."""
+    def __init__(self, latency_ms: float = 0.0, rate_limit_every: int = 0, retry_after: float = 1.0):
+        self.latency_ms = latency_ms
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.request_counts = Counter()
+        self._lock = threading.Lock()
+        # Requests are served concurrently but applied to the in-memory state one at a time.
+        self._state_lock = threading.Lock()
+        self._total_requests = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reset_counts(self):
+        with self._lock:
+            self.request_counts.clear()
+
+    @property
+    def total_requests(self) -> int:
+        return sum(count for route, count in self.request_counts.items() if route != "rate_limited")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without TCP_NODELAY a keep-alive client
+            # waits out the peer's delayed ACK (~40 ms) on every response.
+            disable_nagle_algorithm = True
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw_body = self.rfile.read(length) if length else b""
+                body = json.loads(raw_body) if raw_body else {}
+                parsed = urlparse(self.path)
+                status_code, payload, headers = server._serve(self.command, parsed.path, parse_qs(parsed.query), body, self.headers)
+                # 304 Not Modified must not carry a body.
+                encoded = b"" if status_code == 304 else json.dumps(payload).encode("utf-8")
+                self.send_response(status_code)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(encoded)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _serve(self, method: str, path: str, query: dict, body: dict, headers) -> tuple:
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        with self._lock:
+            self._total_requests += 1
+            throttled = self.rate_limit_every and self._total_requests % self.rate_limit_every == 0
+            if throttled:
+                self.request_counts["rate_limited"] += 1
+        if throttled:
+            return self.rate_limited_response(path)
+        with self._state_lock:
+            status_code, route, payload, extra_headers = self.dispatch(method, path, query, body, headers)
+        with self._lock:
+            self.request_counts[route] += 1
+        return status_code, payload, extra_headers
+
+    @abc.abstractmethod
+    def rate_limited_response(self, path: str) -> tuple:
+        """Returns (status_code, payload, headers) for a throttled request."""
+
+    @abc.abstractmethod
+    def dispatch(self, method: str, path: str, query: dict, body: dict, headers) -> tuple:
+        """Returns (status_code, route_label, payload, headers)."""
+
+
+class FakeNotionServer(FakeAPIServer):
+    """Serves database queries (with cursor pagination and simple filters), pages and block children."""
+    def __init__(self, workspace: NotionWorkspace = None, **kwargs):
+        super().__init__(**kwargs)
+        self.workspace = workspace or NotionWorkspace()
+
+    @property
+    def api_url(self) -> str:
+        return f"{self.url}/v1"
+
+    def rate_limited_response(self, path: str) -> tuple:
+        payload = {"object": "error", "status": 429, "code": "rate_limited", "message": "Rate limited"}
+        return 429, payload, {"Retry-After": str(self.retry_after)}
+
+    def dispatch(self, method, path, query, body, headers):
+        match = re.fullmatch(r"/v1/databases/([^/]+)/query", path)
+        if match and method == "POST":
+            return self._query_database(match.group(1), body)
+        match = re.fullmatch(r"/v1/pages/([^/]+)", path)
+        if match and method == "GET":
+            page = self.workspace.pages.get(match.group(1))
+            return (200, "GET /pages", page, {}) if page else self._not_found("GET /pages")
+        if match and method == "PATCH":
+            return self._update_page(match.group(1), body)
+        match = re.fullmatch(r"/v1/blocks/([^/]+)/children", path)
+        if match and method == "GET":
+            blocks = self.workspace.blocks.get(match.group(1), [])
+            return 200, "GET /blocks/children", {"object": "list", "results": blocks, "has_more": False, "next_cursor": None}, {}
+        return self._not_found(f"{method} {path}")
+
+    def _not_found(self, route: str) -> tuple:
+        return 404, route, {"object": "error", "status": 404, "code": "object_not_found"}, {}
+
+    def _update_page(self, page_id: str, body: dict) -> tuple:
+        page = self.workspace.pages.get(page_id)
+        if not page:
+            return self._not_found("PATCH /pages")
+        for name, value in (body.get("properties") or {}).items():
+            prop_type = next(iter(value))
+            existing = page["properties"].get(name)
+            if existing and existing.get("type") != prop_type:
+                # Like Notion, a value must have the property's own type.
+                return 400, "PATCH /pages", {"object": "error", "status": 400, "code": "validation_error",
+                                             "message": f"{name} is expected to be {existing['type']}."}, {}
+            page["properties"][name] = {"type": prop_type, **value}
+        page["last_edited_time"] = time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime())
+        return 200, "PATCH /pages", page, {}
+
+    def _query_database(self, db_id: str, body: dict) -> tuple:
+        if db_id not in self.workspace.databases:
+            return self._not_found("POST /databases/query")
+        pages = [self.workspace.pages[page_id] for page_id in self.workspace.databases[db_id]]
+        if body.get("filter"):
+            pages = [page for page in pages if self._matches(page, body["filter"])]
+        start = int(body.get("start_cursor") or 0)
+        page_size = min(int(body.get("page_size") or 100), 100)
+        results = pages[start:start + page_size]
+        has_more = start + page_size < len(pages)
+        payload = {
+            "object": "list",
+            "results": results,
+            "has_more": has_more,
+            "next_cursor": str(start + page_size) if has_more else None,
+        }
+        return 200, "POST /databases/query", payload, {}
+
+    def _matches(self, page: dict, filter_payload: dict) -> bool:
+        if "and" in filter_payload:
+            return all(self._matches(page, f) for f in filter_payload["and"])
+        if "or" in filter_payload:
+            return any(self._matches(page, f) for f in filter_payload["or"])
+        if filter_payload.get("timestamp") == "last_edited_time":
+            condition = filter_payload["last_edited_time"]
+            edited = page["last_edited_time"]
+            if "after" in condition:
+                return edited > condition["after"]
+            if "on_or_after" in condition:
+                return edited >= condition["on_or_after"]
+            return True
+        prop = page["properties"].get(filter_payload.get("property"), {})
+        for prop_type in ("select", "status"):
+            if prop_type in filter_payload:
+                value = (prop.get(prop_type) or {}).get("name")
+                return value == filter_payload[prop_type].get("equals")
+        return True
+
+
+class FakeGitHubServer(FakeAPIServer):
+    """
+    Serves the REST endpoints PyGithub uses for the sync (user, repos, issues)
+    and the GraphQL operations issued by GitHubClient, matched by operation name.
+    Like GitHub, it reports X-RateLimit-* headers per resource (core, graphql) and the
+    GraphQL `rateLimit` field, answers If-None-Match with 304 without charging the
+    budget, and refuses calls once `rate_limit` calls were made in the window.
+    """
+    def __init__(self, state: GitHubState = None, per_page: int = 30, rate_limit: int = 5000, **kwargs):
+        super().__init__(**kwargs)
+        self.state = state or GitHubState()
+        self.per_page = per_page
+        self.rate_limit = rate_limit
+        self.reset_rate_limit()
+        self.graphql_handlers = {
+            "GetUserProjects": self._gql_get_user_projects,
+            "CreateProject": self._gql_create_project,
+            "AddItemToProject": self._gql_add_item_to_project,
+            "GetProjectItems": self._gql_get_project_items,
+            "UpdateIssueBody": self._gql_update_issue_body,
+            "GetProjectItemChanges": self._gql_get_project_item_changes,
+            # Batched requests send one aliased mutation per input, each input in its own variable.
+            "CreateProjects": self._batched(self._gql_create_project),
+            "CreateIssues": self._batched(self._gql_create_issue),
+            "AddIssuesToProjects": self._batched(self._gql_add_item_to_project),
+            "UpdateIssueBodies": self._batched(self._gql_update_issue_body, rename={"id": "issueId"}),
+        }
+
+    @property
+    def api_url(self) -> str:
+        return self.url
+
+    def rate_limited_response(self, path: str) -> tuple:
+        headers = {"Retry-After": str(int(self.retry_after)), "X-RateLimit-Remaining": "0"}
+        if path == "/graphql":
+            return 429, {"message": "API rate limit exceeded"}, headers
+        # GitHub signals secondary rate limits on REST with a 403 that PyGithub knows to retry.
+        return 403, {"message": "You have exceeded a secondary rate limit. Please wait a few minutes before you try again."}, headers
+
+    def reset_rate_limit(self, window_seconds: int = 3600):
+        self.rate_limit_used = Counter()
+        self.rate_limit_reset = int(time.time()) + window_seconds
+
+    def _rate_headers(self, resource: str) -> dict:
+        return {
+            "X-RateLimit-Limit": str(self.rate_limit),
+            "X-RateLimit-Remaining": str(max(0, self.rate_limit - self.rate_limit_used[resource])),
+            "X-RateLimit-Reset": str(self.rate_limit_reset),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def dispatch(self, method, path, query, body, headers):
+        resource = "graphql" if path == "/graphql" else "core"
+        if self.rate_limit_used[resource] >= self.rate_limit:
+            return 403, "rate_limit_exhausted", {"message": "API rate limit exceeded"}, self._rate_headers(resource)
+        status_code, route, payload, extra_headers = self._route(method, path, query, body, headers)
+        if method == "GET" and status_code == 200:
+            etag = '"%s"' % hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+            extra_headers = {**extra_headers, "ETag": etag}
+            if headers.get("If-None-Match") == etag:
+                return 304, f"{route} (304)", None, {**extra_headers, **self._rate_headers(resource)}
+        self.rate_limit_used[resource] += 1
+        if resource == "graphql" and "rateLimit" in body.get("query", "") and (payload.get("data") or None):
+            payload["data"]["rateLimit"] = {
+                "cost": 1,
+                "limit": self.rate_limit,
+                "remaining": max(0, self.rate_limit - self.rate_limit_used[resource]),
+                "resetAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.rate_limit_reset)),
+            }
+        return status_code, route, payload, {**extra_headers, **self._rate_headers(resource)}
+
+    # --- REST ---
+
+    def _user_json(self) -> dict:
+        login = self.state.login
+        return {"login": login, "id": 1, "node_id": f"U_{login}", "type": "User", "url": f"{self.url}/users/{login}"}
+
+    def _repo_json(self, repo: dict) -> dict:
+        login = self.state.login
+        return {
+            "id": repo["id"], "node_id": repo["node_id"], "name": repo["name"], "full_name": f"{login}/{repo['name']}",
+            "description": repo["description"], "private": False, "owner": self._user_json(),
+            "url": f"{self.url}/repos/{login}/{repo['name']}",
+        }
+
+    def _issue_json(self, issue: dict) -> dict:
+        return {
+            "id": issue["id"], "node_id": issue["node_id"], "number": issue["number"], "title": issue["title"],
+            "body": issue["body"], "state": issue["state"], "updated_at": issue["updated_at"],
+            "url": f"{self.url}/repos/{self.state.login}/{issue['repo']}/issues/{issue['number']}",
+        }
+
+    def _route(self, method, path, query, body, headers):
+        if path == "/graphql" and method == "POST":
+            return self._graphql(body)
+        if path == "/user" and method == "GET":
+            return 200, "GET /user", self._user_json(), {}
+        if path == "/user/repos" and method == "GET":
+            return self._list_repos(query)
+        if path == "/user/repos" and method == "POST":
+            return self._create_repo(body)
+        match = re.fullmatch(r"/repos/([^/]+)/([^/]+)", path)
+        if match and method == "GET":
+            repo = self.state.repos.get(match.group(2))
+            if not repo:
+                return 404, "GET /repos", {"message": "Not Found"}, {}
+            return 200, "GET /repos", self._repo_json(repo), {}
+        match = re.fullmatch(r"/repos/([^/]+)/([^/]+)/issues", path)
+        if match and method == "POST":
+            return self._create_issue(match.group(2), body)
+        return 404, f"{method} {path}", {"message": "Not Found"}, {}
+
+    def _list_repos(self, query: dict) -> tuple:
+        page = int(query.get("page", ["1"])[0])
+        per_page = int(query.get("per_page", [str(self.per_page)])[0])
+        repos = list(self.state.repos.values())
+        chunk = repos[(page - 1) * per_page:page * per_page]
+        headers = {}
+        if page * per_page < len(repos):
+            headers["Link"] = f'<{self.url}/user/repos?per_page={per_page}&page={page + 1}>; rel="next"'
+        return 200, "GET /user/repos", [self._repo_json(repo) for repo in chunk], headers
+
+    def _create_repo(self, body: dict) -> tuple:
+        if body["name"] in self.state.repos:
+            return 422, "POST /user/repos", {"message": "Repository creation failed."}, {}
+        repo_id = self.state.next_id()
+        repo = {"id": repo_id, "node_id": f"R_{repo_id}", "name": body["name"], "description": body.get("description"), "issue_count": 0}
+        self.state.repos[repo["name"]] = repo
+        return 201, "POST /user/repos", self._repo_json(repo), {}
+
+    def _create_issue(self, repo_name: str, body: dict) -> tuple:
+        repo = self.state.repos.get(repo_name)
+        if not repo:
+            return 404, "POST /repos/issues", {"message": "Not Found"}, {}
+        repo["issue_count"] += 1
+        issue_id = self.state.next_id()
+        issue = {
+            "id": issue_id, "node_id": f"I_{issue_id}", "number": repo["issue_count"], "repo": repo_name,
+            "title": body["title"], "body": body.get("body") or "", "state": "open",
+            "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        self.state.issues[issue["node_id"]] = issue
+        return 201, "POST /repos/issues", self._issue_json(issue), {}
+
+    # --- GraphQL ---
+
+    def _graphql(self, body: dict) -> tuple:
+        match = re.search(r"(?:query|mutation)\s+(\w+)", body.get("query", ""))
+        operation = match.group(1) if match else "anonymous"
+        handler = self.graphql_handlers.get(operation)
+        if not handler:
+            return 200, f"GRAPHQL {operation}", {"errors": [{"message": f"Unsupported operation {operation}"}]}, {}
+        data = handler(body.get("variables") or {})
+        return 200, f"GRAPHQL {operation}", {"data": data}, {}
+
+    @staticmethod
+    def _batched(handler, rename: dict = None):
+        def handle(variables: dict) -> dict:
+            data = {}
+            for alias, mutation_input in variables.items():
+                arguments = {(rename or {}).get(key, key): value for key, value in mutation_input.items()}
+                data[alias] = next(iter(handler(arguments).values()))
+            return data
+        return handle
+
+    def _find_project(self, project_id: str) -> dict:
+        return next((p for p in self.state.projects if p["id"] == project_id), None)
+
+    @staticmethod
+    def _page(nodes: list, cursor, size: int = 100) -> dict:
+        start = int(cursor or 0)
+        has_next = start + size < len(nodes)
+        return {"pageInfo": {"hasNextPage": has_next, "endCursor": str(start + size) if has_next else None},
+                "nodes": nodes[start:start + size]}
+
+    def _gql_get_user_projects(self, variables: dict) -> dict:
+        nodes = [{"id": p["id"], "title": p["title"]} for p in self.state.projects]
+        return {"user": {"projectsV2": self._page(nodes, variables.get("cursor"))}}
+
+    def _gql_create_project(self, variables: dict) -> dict:
+        project = {"id": f"PVT_{self.state.next_id()}", "title": variables["title"], "items": []}
+        self.state.projects.append(project)
+        return {"createProjectV2": {"projectV2": {"id": project["id"]}}}
+
+    def _gql_create_issue(self, variables: dict) -> dict:
+        repo = next(r for r in self.state.repos.values() if r["node_id"] == variables["repositoryId"])
+        _, _, issue, _ = self._create_issue(repo["name"], variables)
+        return {"createIssue": {"issue": {"id": issue["node_id"]}}}
+
+    def _gql_add_item_to_project(self, variables: dict) -> dict:
+        project = self._find_project(variables["projectId"])
+        # Like GitHub, adding content that is already on the board returns the existing item.
+        item = next((i for i in project["items"] if i["content_id"] == variables["contentId"]), None)
+        if item is None:
+            item = {"id": f"PVTI_{self.state.next_id()}", "content_id": variables["contentId"],
+                    "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "status": None}
+            project["items"].append(item)
+        return {"addProjectV2ItemById": {"item": {"id": item["id"]}}}
+
+    def _gql_get_project_items(self, variables: dict) -> dict:
+        project = self._find_project(variables["projectId"])
+        nodes = []
+        for item in project["items"]:
+            issue = self.state.issues.get(item["content_id"])
+            content = {"id": issue["node_id"], "title": issue["title"], "body": issue["body"]} if issue else None
+            nodes.append({"id": item["id"], "content": content})
+        return {"node": {"items": self._page(nodes, variables.get("cursor"))}}
+
+    def _gql_get_project_item_changes(self, variables: dict) -> dict:
+        project = self._find_project(variables["projectId"])
+        nodes = []
+        for item in project["items"]:
+            issue = self.state.issues.get(item["content_id"])
+            content = {"id": issue["node_id"], "title": issue["title"], "state": issue["state"].upper(),
+                       "updatedAt": issue["updated_at"]} if issue else None
+            status = {"name": item["status"], "updatedAt": item["updated_at"]} if item.get("status") else None
+            nodes.append({"updatedAt": item.get("updated_at") or "", "content": content, "fieldValueByName": status})
+        return {"node": {"items": self._page(nodes, variables.get("cursor"))}}
+
+    def _gql_update_issue_body(self, variables: dict) -> dict:
+        issue = self.state.issues[variables["issueId"]]
+        issue["body"] = variables["body"]
+        issue["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        return {"updateIssue": {"issue": {"id": issue["node_id"]}}}
@@ -0,0 +1,172 @@
+"""
+Synthetic Notion and GitHub state for the local stand-in servers.
+Property shapes mirror what NotionClient parses, so every code path (relations,
+quality characteristics, feature pages, block children) is exercised.
+"""
+import random
+from datetime import datetime, timedelta
+
+from benchmarks.synthetic_data import STATUSES, PROJECT_STATUSES, CRM_PHASES, PEOPLE
+
+DATABASE_IDS = {
+    "CRM_DB_ID": "crm-db",
+    "PROJECTS_DB_ID": "projects-db",
+    "TASKS_DB_ID": "tasks-db",
+    "STAKEHOLDER_DB_ID": "stakeholders-db",
+}
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def _text(text: str) -> list:
+    return [{"type": "text", "plain_text": text, "text": {"content": text}}]
+
+def title(text: str) -> dict:
+    return {"type": "title", "title": _text(text)}
+
+def rich_text(text: str) -> dict:
+    return {"type": "rich_text", "rich_text": _text(text)}
+
+def select(name: str) -> dict:
+    return {"type": "select", "select": {"name": name} if name else None}
+
+def status(name: str) -> dict:
+    return {"type": "status", "status": {"name": name}}
+
+def people(names: list) -> dict:
+    return {"type": "people", "people": [{"object": "user", "name": name} for name in names if name]}
+
+def date(start: str) -> dict:
+    return {"type": "date", "date": {"start": start} if start else None}
+
+def relation(page_ids: list) -> dict:
+    return {"type": "relation", "relation": [{"id": page_id} for page_id in page_ids], "has_more": False}
+
+
+class NotionWorkspace:
+    """In-memory Notion workspace: databases (ordered page ids), pages and page block children."""
+    def __init__(self):
+        self.databases = {db_id: [] for db_id in DATABASE_IDS.values()}
+        self.pages = {}
+        self.blocks = {}
+        self._clock = 0
+
+    def add_page(self, page_id: str, properties: dict, database_id: str = None) -> dict:
+        self._clock += 1
+        timestamp = (BASE_TIME + timedelta(seconds=self._clock)).isoformat() + ".000Z"
+        page = {
+            "object": "page",
+            "id": page_id,
+            "created_time": timestamp,
+            "last_edited_time": timestamp,
+            "parent": {"type": "database_id", "database_id": database_id} if database_id else {"type": "workspace"},
+            "properties": properties,
+        }
+        self.pages[page_id] = page
+        if database_id:
+            self.databases[database_id].append(page_id)
+        return page
+
+
+def make_notion_workspace(rows: int, seed: int = 42) -> NotionWorkspace:
+    """
+    Builds a workspace with `rows` tasks, rows/10 projects and rows/20 customers and stakeholders.
+    Each project has two quality characteristics with two feature pages each.
+    """
+    rng = random.Random(seed)
+    workspace = NotionWorkspace()
+    project_count = max(1, rows // 10)
+    customer_count = max(1, rows // 20)
+
+    for i in range(customer_count):
+        workspace.add_page(f"customer-{i}", {
+            "Company Name": title(f"Customer {i}"),
+            "CRM Phase": select(rng.choice(CRM_PHASES)),
+            "Initial Project Idea": rich_text(f"Idea {i}"),
+            "Status": status("Open"),
+            "Meeting Next Steps": rich_text(f"Follow up on proposal {i}"),
+        }, DATABASE_IDS["CRM_DB_ID"])
+
+    for i in range(project_count):
+        qc_ids = []
+        for q in range(2):
+            qc_id = f"qc-{i}-{q}"
+            feature_ids = []
+            for f in range(2):
+                feature_id = f"feature-{i}-{q}-{f}"
+                workspace.add_page(feature_id, {
+                    "Feature": title(f"Feature {i}.{q}.{f}"),
+                    "Feature Status": select("Active" if f == 0 or i % 2 else "Backlog"),
+                })
+                workspace.blocks[feature_id] = [
+                    {"type": "heading_2", "heading_2": {"rich_text": _text(f"Feature {i}.{q}.{f}")}},
+                    {"type": "paragraph", "paragraph": {"rich_text": _text("Acceptance criteria and notes.")}},
+                    {"type": "bulleted_list_item", "bulleted_list_item": {"rich_text": _text("Must sync to GitHub.")}},
+                ]
+                feature_ids.append(feature_id)
+            workspace.add_page(qc_id, {
+                "Name": title(f"Quality Characteristic {i}.{q}"),
+                "User Story": rich_text("As a user I want reliable syncs."),
+                "Features": relation(feature_ids),
+            })
+            qc_ids.append(qc_id)
+
+        workspace.add_page(f"project-{i}", {
+            "Project Name": title(f"Project {i}"),
+            "Description": rich_text(f"Synthetic project {i}"),
+            "Project Status": select(rng.choice(PROJECT_STATUSES)),
+            "Stage": select(f"Stage {i % 5}"),
+            "Project Manager": people([rng.choice(PEOPLE)]),
+            "Customer": relation([f"customer-{i % customer_count}"]),
+            "Process Step": select("Build"),
+            "Quality Characteristic": relation(qc_ids),
+        }, DATABASE_IDS["PROJECTS_DB_ID"])
+
+    for i in range(rows):
+        workspace.add_page(f"task-{i}", {
+            "Title": title(f"Task {i}"),
+            "Task Type": select("Development"),
+            "Status": status(rng.choice(STATUSES)),
+            "Project": relation([f"project-{i % project_count}"]),
+            "Responsible": people([rng.choice(PEOPLE)]),
+            "Importance": select("Yes" if i % 3 == 0 else "No"),
+            "Priority": select(rng.choice(["High", "Medium", "Low"])),
+            "Planned_End": date(f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}"),
+        }, DATABASE_IDS["TASKS_DB_ID"])
+
+    for i in range(customer_count):
+        workspace.add_page(f"stakeholder-{i}", {
+            "Stakeholder Name": title(f"Stakeholder {i}"),
+            "Stakeholder Phase": select("Engaged"),
+            "Purpose": rich_text("Sponsor"),
+            "Next Steps": rich_text("Monthly review"),
+            "Status": status("Active"),
+        }, DATABASE_IDS["STAKEHOLDER_DB_ID"])
+
+    return workspace
+
+
+class GitHubState:
+    """In-memory GitHub account: repositories, issues and Projects V2 with their items."""
+    def __init__(self, login: str = "bench-user"):
+        self.login = login
+        self.repos = {}     # name -> repo dict
+        self.issues = {}    # node id -> issue dict
+        self.projects = []  # [{"id", "title", "items": [{"id", "content_id", "updated_at", "status"}]}]
+        self._next_id = 1
+
+    def next_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def close_issue(self, node_id: str, when: str = None):
+        """Closes an issue as a user would on GitHub (used to drive the reverse sync)."""
+        issue = self.issues[node_id]
+        issue["state"] = "closed"
+        issue["updated_at"] = when or datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    def set_item_status(self, project_id: str, node_id: str, status_name: str, when: str = None):
+        """Sets the Status field of the board item holding an issue."""
+        project = next(p for p in self.projects if p["id"] == project_id)
+        item = next(i for i in project["items"] if i["content_id"] == node_id)
+        item["status"] = status_name
+        item["updated_at"] = when or datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
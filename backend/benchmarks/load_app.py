@@ -0,0 +1,42 @@
+"""
+WSGI entry point used by the load benchmark: the real Flask app with its Firestore user store
+swapped for an in-memory one holding a single benchmark user, so /v1/auth/login can be load
+tested without a Firestore emulator. Everything else talks to the stand-in servers configured
+through the environment by benchmarks.load_benchmark.
+"""
+import os
+import sys
+import threading
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import app as api
+from shared.data_models import User
+from benchmarks.load_benchmark import BENCH_EMAIL, BENCH_PASSWORD
+
+
+class InMemoryUsers:
+    """The subset of FirestoreClient the auth endpoints use."""
+    def __init__(self):
+        self._users = {}
+        self._lock = threading.Lock()
+
+    def get_user_by_email(self, email: str):
+        with self._lock:
+            return self._users.get(email)
+
+    def create_user(self, email: str, password: str) -> User:
+        with self._lock:
+            if email in self._users:
+                raise ValueError(f"User with email {email} already exists.")
+            user = self._users[email] = User(id=str(len(self._users) + 1), email=email, password_hash=generate_password_hash(password))
+            return user
+
+    def verify_password(self, password_hash: str, password_to_check: str) -> bool:
+        return check_password_hash(password_hash, password_to_check)
+
+
+api.firestore = InMemoryUsers()
+api.firestore.create_user(BENCH_EMAIL, BENCH_PASSWORD)
+app = api.app
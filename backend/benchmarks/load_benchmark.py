@@ -0,0 +1,231 @@
+"""
+Load test of the API served by gunicorn (gunicorn.conf.py) against the local Notion stand-in.
+
+For each worker/thread configuration, starts gunicorn on benchmarks.load_app and drives it with
+concurrent clients on three scenarios:
+    dashboard_hit   GET /v1/dashboard with a warm cache
+    dashboard_miss  GET /v1/dashboard with caching disabled (DASHBOARD_CACHE_TTL_SECONDS=0);
+                    concurrent misses still share one Notion crawl
+    login           POST /v1/auth/login (password hashing, CPU-bound)
+Reports throughput, latency percentiles and errors.
+
+Usage (from the backend directory):
+    python -m benchmarks.load_benchmark [--configs 1x1,1x8,2x8,4x4] [--rows 100]
+        [--concurrency 16] [--duration 10] [--latency-ms 20] [--worker-class gthread]
+        [--only dashboard_hit,dashboard_miss,login] [--json results.json]
+
+Configurations are WORKERSxTHREADS.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import argparse
+import subprocess
+import threading
+from dataclasses import dataclass, asdict
+
+import requests
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.fake_servers import FakeNotionServer
+from benchmarks.fake_workspace import DATABASE_IDS, make_notion_workspace
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCENARIOS = ("dashboard_hit", "dashboard_miss", "login")
+STARTUP_TIMEOUT_SECONDS = 60
+# The single user benchmarks.load_app seeds its in-memory user store with.
+BENCH_EMAIL = "load@example.com"
+BENCH_PASSWORD = "load-test-password"
+
+
+@dataclass
+class LoadResult:
+    scenario: str
+    config: str
+    concurrency: int
+    requests: int
+    errors: int
+    rps: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    notion_requests: int
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _percentile(samples: list[float], fraction: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class GunicornServer:
+    """Runs gunicorn with the repo's config in a subprocess, with settings overridden through the environment."""
+    def __init__(self, workers: int, threads: int, worker_class: str, env: dict):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.env = {
+            **os.environ, **env,
+            "PORT": str(self.port),
+            "WEB_CONCURRENCY": str(workers),
+            "GUNICORN_THREADS": str(threads),
+            "GUNICORN_WORKER_CLASS": worker_class,
+            "GUNICORN_ACCESS_LOG": "",
+            "GUNICORN_LOG_LEVEL": "warning",
+        }
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "--bind", f"127.0.0.1:{self.port}",
+             "benchmarks.load_app:app"],
+            cwd=BACKEND_DIR, env=self.env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        )
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"gunicorn exited during startup:\n{self.process.stderr.read().decode(errors='replace')}")
+            try:
+                if requests.get(f"{self.url}/", timeout=1).ok:
+                    return self
+            except requests.RequestException:
+                time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError("gunicorn did not start in time")
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def _login(url: str, session: requests.Session) -> requests.Response:
+    return session.post(f"{url}/v1/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}, timeout=120)
+
+
+def _drive(send, concurrency: int, duration: float) -> tuple[list[float], int]:
+    """Runs `send(session)` from `concurrency` client threads for `duration` seconds."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    stop_at = time.monotonic() + duration
+
+    def client():
+        session = requests.Session()
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                ok = send(session).status_code == 200
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors[0] += 1
+
+    threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0]
+
+
+def _run_scenario(scenario: str, server: GunicornServer, notion_server: FakeNotionServer,
+                  concurrency: int, duration: float, config: str) -> LoadResult:
+    setup = requests.Session()
+    if scenario == "login":
+        send = lambda session: _login(server.url, session)
+    else:
+        headers = {"Authorization": f"Bearer {_login(server.url, setup).json()['token']}"}
+        send = lambda session: session.get(f"{server.url}/v1/dashboard", headers=headers, timeout=120)
+        if scenario == "dashboard_hit":
+            # Warm every worker's cache; each gunicorn process keeps its own.
+            _drive(send, concurrency, 1.0)
+
+    notion_server.reset_counts()
+    start = time.perf_counter()
+    latencies, errors = _drive(send, concurrency, duration)
+    elapsed = time.perf_counter() - start
+    return LoadResult(
+        scenario=scenario,
+        config=config,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        rps=len(latencies) / elapsed,
+        p50_ms=_percentile(latencies, 0.50),
+        p95_ms=_percentile(latencies, 0.95),
+        p99_ms=_percentile(latencies, 0.99),
+        notion_requests=notion_server.total_requests,
+    )
+
+
+def run(configs: list[str], scenarios: list[str], rows: int, concurrency: int, duration: float,
+        latency_ms: float, worker_class: str) -> list[LoadResult]:
+    results = []
+    with FakeNotionServer(latency_ms=latency_ms) as notion_server:
+        notion_server.workspace = make_notion_workspace(rows)
+        env = {
+            **DATABASE_IDS,
+            "NOTION_API_URL": notion_server.api_url,
+            "NOTION_API_KEY": "bench-notion-key",
+            "INTERNAL_API_KEY": "bench-internal-key",
+            "JWT_SECRET_KEY": "bench-jwt-secret-with-enough-length",
+            "FIRESTORE_EMULATOR_HOST": os.getenv("FIRESTORE_EMULATOR_HOST", "127.0.0.1:8681"),
+            "GOOGLE_CLOUD_PROJECT": os.getenv("GOOGLE_CLOUD_PROJECT", "bench-project"),
+        }
+        for config in configs:
+            workers, threads = (int(part) for part in config.lower().split("x"))
+            print(f"Load testing {config} ({workers} workers x {threads} threads, {worker_class})...")
+            for scenario in scenarios:
+                scenario_env = {**env, "DASHBOARD_CACHE_TTL_SECONDS": "0"} if scenario == "dashboard_miss" else env
+                with GunicornServer(workers, threads, worker_class, scenario_env) as server:
+                    results.append(_run_scenario(scenario, server, notion_server, concurrency, duration, config))
+    return results
+
+
+def print_results(results: list[LoadResult]):
+    print(f"\n{'scenario':<16} {'config':>7} {'clients':>8} {'requests':>9} {'errors':>7} {'req/s':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'notion':>7}")
+    for r in results:
+        print(f"{r.scenario:<16} {r.config:>7} {r.concurrency:>8} {r.requests:>9} {r.errors:>7} {r.rps:>8.1f} "
+              f"{r.p50_ms:>8.1f} {r.p95_ms:>8.1f} {r.p99_ms:>8.1f} {r.notion_requests:>7}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--configs", default="1x1,1x8,2x8,4x4", help="Comma-separated WORKERSxTHREADS configurations.")
+    parser.add_argument("--only", default=",".join(SCENARIOS), help="Comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--rows", type=int, default=100, help="Task count of the stand-in Notion workspace.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent client connections.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to drive each scenario.")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Latency added to every stand-in Notion request.")
+    parser.add_argument("--worker-class", default="gthread", help="gunicorn worker class (gthread or gevent).")
+    parser.add_argument("--json", help="Write results to this file.")
+    args = parser.parse_args()
+
+    results = run(
+        configs=args.configs.split(","),
+        scenarios=args.only.split(","),
+        rows=args.rows,
+        concurrency=args.concurrency,
+        duration=args.duration,
+        latency_ms=args.latency_ms,
+        worker_class=args.worker_class,
+    )
+    print_results(results)
+    if args.json:
+        with open(args.json, "w") as results_file:
+            json.dump([asdict(r) for r in results], results_file, indent=2)
@@ -0,0 +1,181 @@
+"""
+Profiles NotionClient.get_all_dashboard_data and github_sync_worker.run offline, from recorded HTTP traffic.
+
+record: runs a target once with shared.http_fixtures recording every request and response (secrets
+        redacted) into a gzip JSON Lines fixture. Without --fake-rows it talks to the real APIs with the
+        configured secrets (for `sync` this is a real sync run that writes to GitHub); with --fake-rows it
+        runs against the local stand-in servers.
+replay: runs the target against the fixture only, with the recorded latencies (--latency-scale 1),
+        scaled ones, or none (0), under cProfile. Prints wall time and the hottest functions, and can
+        save the profile (--profile, for snakeviz or pstats) and compare against an earlier run (--json,
+        --compare). For a sampling profile, run the replay under py-spy:
+        py-spy record -o replay.svg -- python -m benchmarks.replay_profile replay dashboard ...
+
+Usage (from the backend directory):
+    python -m benchmarks.replay_profile record {dashboard,sync} --fixture F.jsonl.gz [--tenant ID]
+        [--fake-rows 1000 --latency-ms 20]
+    python -m benchmarks.replay_profile replay {dashboard,sync} --fixture F.jsonl.gz [--latency-scale 0]
+        [--repeat 3] [--profile out.prof] [--top 25] [--json results.json] [--compare baseline.json]
+"""
+import io
+import os
+import sys
+import json
+import time
+import pstats
+import argparse
+import cProfile
+from contextlib import redirect_stdout, nullcontext
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared import http_fixtures
+
+TARGETS = ("dashboard", "sync")
+REPLAY_SECRET = "replay"
+
+
+def _recording_context(tenant_id: str) -> dict:
+    """What a replay needs to issue the same requests: the API URLs and the tenant's database ids."""
+    from shared.tenants import DATABASE_KEYS, load_tenants
+
+    project_id = os.getenv("GCP_PROJECT_ID")
+    tenant = load_tenants(project_id)[tenant_id]
+    return {
+        "target_tenant": tenant_id,
+        "NOTION_API_URL": os.getenv("NOTION_API_URL", "https://api.notion.com/v1"),
+        "GITHUB_API_URL": os.getenv("GITHUB_API_URL", "https://api.github.com"),
+        "databases": {key: tenant.database_id(key, project_id) for key in DATABASE_KEYS},
+    }
+
+
+def _build_target(target: str, context: dict, replay: bool):
+    """Returns a no-argument callable running the target with clients configured for recording or replay."""
+    from shared.notion_client import NotionClient
+    from shared.tenants import load_tenants
+
+    databases = context["databases"]
+    if replay:
+        notion = NotionClient(api_key=REPLAY_SECRET, projects_db_id=databases["PROJECTS_DB_ID"],
+                              base_url=context["NOTION_API_URL"], database_ids=databases)
+    else:
+        tenant = load_tenants(os.getenv("GCP_PROJECT_ID"))[context["target_tenant"]]
+        notion = NotionClient(api_key=tenant.secret("NOTION_API_KEY", os.getenv("GCP_PROJECT_ID")),
+                              projects_db_id=databases["PROJECTS_DB_ID"], base_url=context["NOTION_API_URL"],
+                              database_ids=databases)
+    if target == "dashboard":
+        return notion.get_all_dashboard_data
+
+    from shared.github_client import GitHubClient
+    from shared.github_auth import get_token_manager
+    from shared.job_store import InMemoryJobStore
+    from workers import github_sync_worker
+
+    if replay:
+        # Recorded latencies already include GitHub's answers; PyGithub's own pacing would only add sleeps.
+        github = GitHubClient(token=REPLAY_SECRET, base_url=context["GITHUB_API_URL"], fetch_schema=False,
+                              seconds_between_requests=0, seconds_between_writes=0)
+    elif os.getenv("GITHUB_API_URL"):
+        github = GitHubClient(token=os.getenv("GITHUB_TOKEN", REPLAY_SECRET), base_url=context["GITHUB_API_URL"],
+                              fetch_schema=False, seconds_between_requests=0, seconds_between_writes=0)
+    else:
+        github = GitHubClient(token_manager=get_token_manager(os.getenv("GCP_PROJECT_ID")), fetch_schema=False)
+    return lambda: github_sync_worker.run(notion=notion, github=github, store=InMemoryJobStore())
+
+
+def record(target: str, fixture: str, tenant_id: str, fake_rows: int = 0, latency_ms: float = 0.0):
+    if fake_rows:
+        from benchmarks.fake_servers import FakeNotionServer, FakeGitHubServer
+        from benchmarks.fake_workspace import make_notion_workspace
+        from benchmarks.e2e_benchmark import _configure_environment
+
+        servers = (FakeNotionServer(latency_ms=latency_ms), FakeGitHubServer(latency_ms=latency_ms))
+        for server in servers:
+            server.start()
+        servers[0].workspace = make_notion_workspace(fake_rows)
+        _configure_environment(*servers)
+        os.environ["GITHUB_TOKEN"] = "bench-github-token"
+    try:
+        context = _recording_context(tenant_id)
+        run_target = _build_target(target, context, replay=False)
+        recorder = http_fixtures.install(http_fixtures.FixtureRecorder(fixture, context={**context, "target": target}))
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()):
+            run_target()
+        wall_ms = (time.perf_counter() - start) * 1000
+        http_fixtures.uninstall()
+        print(f"Recorded {recorder.count} request(s) in {wall_ms:.0f} ms to {fixture} ({os.path.getsize(fixture) / 1024:.1f} KB).")
+    finally:
+        if fake_rows:
+            for server in servers:
+                server.stop()
+
+
+def replay(target: str, fixture: str, latency_scale: float, repeat: int = 1, profile_path: str = None, top: int = 25) -> dict:
+    header, _ = http_fixtures.read_fixture(fixture)
+    context = header["context"]
+    if context.get("target") not in (None, target):
+        print(f"Note: {fixture} was recorded for '{context['target']}', not '{target}'.")
+
+    profiler = cProfile.Profile()
+    wall_times, stats = [], {}
+    for _ in range(repeat):
+        # A fresh replayer per run, so every run is served the recording from the start.
+        replayer = http_fixtures.install(http_fixtures.FixtureReplayer(fixture, latency_scale=latency_scale))
+        run_target = _build_target(target, context, replay=True)
+        start = time.perf_counter()
+        with redirect_stdout(io.StringIO()) if target == "sync" else nullcontext():
+            profiler.enable()
+            try:
+                run_target()
+            finally:
+                profiler.disable()
+        wall_times.append((time.perf_counter() - start) * 1000)
+        http_fixtures.uninstall()
+        stats = replayer.stats
+
+    print(f"{target} replayed {repeat}x from {fixture} (latency x{latency_scale}): "
+          f"best {min(wall_times):.1f} ms, mean {sum(wall_times) / len(wall_times):.1f} ms; responses {stats}")
+    if stats.get("missed"):
+        print("Some requests had no recorded response; the code under test no longer matches the recording.")
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+    if profile_path:
+        profiler.dump_stats(profile_path)
+        print(f"Profile written to {profile_path}")
+    return {"target": target, "fixture": os.path.basename(fixture), "latency_scale": latency_scale,
+            "best_ms": min(wall_times), "mean_ms": sum(wall_times) / len(wall_times), **stats}
+
+
+def compare(result: dict, baseline_path: str):
+    with open(baseline_path) as baseline_file:
+        baseline = json.load(baseline_file)
+    for metric in ("best_ms", "mean_ms", "served"):
+        old, new = baseline.get(metric), result[metric]
+        change = f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+        print(f"{metric:<8} {old:>10.1f} -> {new:>10.1f}  {change}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=("record", "replay"))
+    parser.add_argument("target", choices=TARGETS)
+    parser.add_argument("--fixture", required=True, help="Fixture file (gzip JSON Lines), e.g. dashboard.jsonl.gz.")
+    parser.add_argument("--tenant", default="default", help="Tenant to record (see shared.tenants).")
+    parser.add_argument("--fake-rows", type=int, default=0, help="Record against local stand-in servers with this many rows.")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency of the stand-in servers while recording.")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Replay latency: 1 = as recorded, 0 = none.")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay runs; the profile covers all of them.")
+    parser.add_argument("--profile", help="Write the cProfile stats to this file.")
+    parser.add_argument("--top", type=int, default=25, help="Functions to list, by cumulative time.")
+    parser.add_argument("--json", help="Write the replay timings to this file.")
+    parser.add_argument("--compare", help="Replay timings of an earlier run to compare with.")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        record(args.target, args.fixture, args.tenant, args.fake_rows, args.latency_ms)
+    else:
+        result = replay(args.target, args.fixture, args.latency_scale, args.repeat, args.profile, args.top)
+        if args.json:
+            with open(args.json, "w") as results_file:
+                json.dump(result, results_file, indent=2)
+        if args.compare:
+            compare(result, args.compare)
@@ -0,0 +1,79 @@
+"""
+Compares peak RSS of in-memory and streamed PDF report generation.
+Each (mode, size) pair runs in a fresh subprocess so peaks don't leak between runs.
+
+Usage (from the backend directory):
+    python -m benchmarks.report_memory_benchmark [--sizes 1000,10000]
+"""
+import os
+import sys
+import time
+import json
+import argparse
+import resource
+import tempfile
+import subprocess
+from types import SimpleNamespace
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from benchmarks.synthetic_data import make_dashboard_data, iter_customers, iter_projects, iter_tasks
+
+MODES = ("in-memory", "streamed")
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(mode: str, rows: int) -> dict:
+    from shared.report_renderer import ReportRenderer
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        renderer = ReportRenderer(cache_dir=cache_dir)
+        baseline_mb = _peak_rss_mb()
+        start = time.perf_counter()
+        if mode == "in-memory":
+            _, encoded_pdf = renderer.render_pdf(make_dashboard_data(rows))
+            encoded_bytes = len(encoded_pdf)
+        else:
+            sections = SimpleNamespace(
+                projects=iter_projects(rows), customers=iter_customers(rows), tasks=iter_tasks(rows),
+            )
+            # The encoding stays on disk; EmailClient streams it into the request body.
+            encoded_bytes = os.path.getsize(renderer.render_pdf_streamed(sections))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        return {
+            "mode": mode,
+            "rows": rows,
+            "ms": elapsed_ms,
+            "baseline_mb": baseline_mb,
+            "peak_mb": _peak_rss_mb(),
+            "pdf_kb": encoded_bytes * 3 / 4 / 1024,
+        }
+
+
+def run(sizes: list[int]):
+    print(f"{'mode':>10} {'rows':>8} {'ms':>10} {'base MB':>9} {'peak MB':>9} {'pdf KB':>8}")
+    for size in sizes:
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.report_memory_benchmark", "--child", mode, "--sizes", str(size)],
+                cwd=os.path.abspath(os.path.join(os.path.dirname(__file__), '..')),
+                capture_output=True, text=True, check=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{result['mode']:>10} {result['rows']:>8} {result['ms']:>10.1f} "
+                  f"{result['baseline_mb']:>9.1f} {result['peak_mb']:>9.1f} {result['pdf_kb']:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,10000", help="Comma-separated task counts to benchmark.")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(_measure(args.child, int(args.sizes))))
+    else:
+        run([int(size) for size in args.sizes.split(",")])
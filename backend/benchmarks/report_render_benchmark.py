@@ -0,0 +1,45 @@
+"""
+Measures report generation cost at several data sizes.
+
+Usage (from the backend directory):
+    python -m benchmarks.report_render_benchmark [--sizes 10,100,1000]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.report_renderer import ReportRenderer
+from benchmarks.synthetic_data import make_dashboard_data
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def run(sizes: list[int]):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # Cold start: builds the environment and compiles the template.
+        renderer, init_ms = _timed(lambda: ReportRenderer(cache_dir=cache_dir))
+        # Warm start: the template is loaded from the bytecode cache.
+        _, warm_init_ms = _timed(lambda: ReportRenderer(cache_dir=cache_dir))
+        print(f"Renderer init: cold {init_ms:.1f} ms, warm (bytecode cache) {warm_init_ms:.1f} ms\n")
+
+        print(f"{'rows':>8} {'html ms':>10} {'pdf miss ms':>12} {'pdf hit ms':>11} {'pdf KB':>8}")
+        for size in sizes:
+            data = make_dashboard_data(size)
+            _, html_ms = _timed(renderer.render_html, data)
+            (pdf_bytes, _), miss_ms = _timed(renderer.render_pdf, data)
+            _, hit_ms = _timed(renderer.render_pdf, data)
+            print(f"{size:>8} {html_ms:>10.1f} {miss_ms:>12.1f} {hit_ms:>11.1f} {len(pdf_bytes) / 1024:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000", help="Comma-separated task counts to benchmark.")
+    args = parser.parse_args()
+    run([int(size) for size in args.sizes.split(",")])
@@ -0,0 +1,92 @@
+import os
+import sys
+import random
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.data_models import DashboardData, Customer, Project, Task, Stakeholder, QualityCharacteristic
+
+STATUSES = ["Not Started", "In Progress", "Blocked", "Done"]
+PROJECT_STATUSES = ["Active", "On Hold", "Completed"]
+CRM_PHASES = ["Lead", "Discovery", "Proposal", "Negotiation", "Done"]
+PEOPLE = ["Sarah Jones", "Alex Chen", "Priya Naidoo", "Tom Becker", ""]
+
+
+def _counts(rows: int) -> tuple[int, int]:
+    return max(1, rows // 10), max(1, rows // 20)
+
+
+def iter_customers(rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    _, customer_count = _counts(rows)
+    for i in range(customer_count):
+        yield Customer(
+            id=f"customer-{i}",
+            company_name=f"Customer {i}",
+            crm_phase=rng.choice(CRM_PHASES),
+            initial_project_idea=f"Idea {i}",
+            next_step_summary=f"Follow up on proposal {i}",
+            status="Open",
+        )
+
+
+def iter_projects(rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    project_count, customer_count = _counts(rows)
+    for i in range(project_count):
+        yield Project(
+            id=f"project-{i}",
+            project_name=f"Project {i}",
+            description=f"Synthetic project {i}",
+            status=rng.choice(PROJECT_STATUSES),
+            stage=f"Stage {i % 5}",
+            manager=rng.choice(PEOPLE),
+            customer=f"Customer {i % customer_count}",
+            process_step="Build",
+            characteristics=[QualityCharacteristic(
+                id=f"qc-{i}", name=f"QC {i}", user_story="As a user...",
+                feature_ids=[f"feature-{i}"], feature_names=[f"Feature {i}"],
+            )],
+        )
+
+
+def iter_tasks(rows: int, seed: int = 42):
+    rng = random.Random(seed)
+    project_count, _ = _counts(rows)
+    for i in range(rows):
+        yield Task(
+            id=f"task-{i}",
+            title=f"Task {i}",
+            type="Development",
+            status=rng.choice(STATUSES),
+            entity_name=f"Project {i % project_count}",
+            responsible_name=rng.choice(PEOPLE),
+            important="Yes" if i % 3 == 0 else "No",
+            priority=rng.choice(["High", "Medium", "Low"]),
+            planned_end_date=f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+        )
+
+
+def iter_stakeholders(rows: int, seed: int = 42):
+    _, customer_count = _counts(rows)
+    for i in range(customer_count):
+        yield Stakeholder(
+            id=f"stakeholder-{i}",
+            stakeholder_name=f"Stakeholder {i}",
+            stakeholder_phase="Engaged",
+            purpose="Sponsor",
+            next_step_summary="Monthly review",
+            status="Active",
+        )
+
+
+def make_dashboard_data(rows: int, seed: int = 42) -> DashboardData:
+    """
+    Builds a DashboardData snapshot with `rows` tasks and proportionally sized
+    projects, customers and stakeholders. Deterministic for a given seed.
+    """
+    return DashboardData(
+        customers=list(iter_customers(rows, seed)),
+        projects=list(iter_projects(rows, seed)),
+        tasks=list(iter_tasks(rows, seed)),
+        stakeholders=list(iter_stakeholders(rows, seed)),
+    )
@@ -0,0 +1,46 @@
+"""
+Gunicorn settings for the Flask API: `gunicorn --config gunicorn.conf.py app:app`.
+
+Every setting can be overridden from the environment, so a deployment can be retuned without
+rebuilding the image. Requests mostly wait on Notion, Firestore and GitHub, so the default is a
+few processes with many threads each (gthread). GUNICORN_WORKER_CLASS=gevent also works when
+gevent is installed. Each worker process keeps its own dashboard cache and webhook sync queue,
+so webhook events are only coalesced within the process that received them: a burst spread over
+several workers syncs a project once per worker. The job store collapses those syncs into one job
+per project, so this costs extra planning reads, never duplicate writes. When a worker exits
+(shutdown, or recycling after max_requests) the keys still waiting in its queue are handed to the
+job store by worker_exit below rather than dropped.
+"""
+import os
+import multiprocessing
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2, 4)))
+# Threads per worker (gthread) or greenlets per worker (gevent).
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "100"))
+
+# A cold /v1/dashboard crawl of a large workspace takes tens of seconds when the mirror is off.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers now and then so slow leaks cannot build up; the jitter keeps them from restarting together.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "2000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "200"))
+
+# Cloud Run collects stdout/stderr; GUNICORN_ACCESS_LOG="" turns the access log off.
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def worker_exit(server, worker):
+    """Queues the worker's pending webhook keys as sync jobs before it goes (see app.shutdown_sync_queue)."""
+    import sys
+
+    app_module = sys.modules.get("app")
+    if app_module is not None:
+        app_module.shutdown_sync_queue()
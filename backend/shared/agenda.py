@@ -0,0 +1,239 @@
+import os
+import json
+import hashlib
+import tempfile
+import time
+import threading
+from datetime import date, timedelta
+
+DEFAULT_MAX_PROMPT_TOKENS = int(os.getenv("AGENDA_MAX_PROMPT_TOKENS", "4000"))
+DEFAULT_CACHE_PATH = os.path.join(tempfile.gettempdir(), "neuroflux_agenda_cache.json")
+# One entry per distinct weekly prompt; older agendas are of no use once the data has moved on.
+DEFAULT_CACHE_MAX_ENTRIES = int(os.getenv("AGENDA_CACHE_MAX_ENTRIES", "100"))
+DEFAULT_CACHE_MAX_AGE_DAYS = float(os.getenv("AGENDA_CACHE_MAX_AGE_DAYS", "90"))
+
+PROMPT_HEADER = "Generate a concise meeting agenda for the Neuroflux weekly sync. Focus on status changes, upcoming tasks, and risks.\n\n"
+PROMPT_FOOTER = "\nBased on this data, create a bulleted agenda."
+
+PRIORITY_SCORES = {"High": 1.5, "Medium": 0.75, "Low": 0.0}
+# Active projects outrank every task and customer line so they are never trimmed first.
+PROJECT_SCORE = 5.0
+# The summary counts are a handful of short lines; they are the last thing to be trimmed.
+SUMMARY_SCORE = 6.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text), rounded up."""
+    return max(1, (len(text) + 3) // 4)
+
+
+class AgendaPromptBuilder:
+    """
+    Collects prompt parts in a list and joins them once in build().
+    Items carry a relevance score; when the prompt would exceed `max_tokens`,
+    the lowest-scoring items are dropped and each section notes how many were omitted.
+    """
+    def __init__(self, max_tokens: int = DEFAULT_MAX_PROMPT_TOKENS):
+        self.max_tokens = max_tokens
+        self._sections = []  # [(title, [(score, order, line)])]
+        self._order = 0
+
+    def add_section(self, title: str):
+        self._sections.append((title, []))
+
+    def add_item(self, line: str, score: float = 1.0):
+        self._sections[-1][1].append((score, self._order, line))
+        self._order += 1
+
+    def build(self) -> str:
+        kept = self._select_items()
+        parts = [PROMPT_HEADER]
+        for index, (title, items) in enumerate(self._sections):
+            if index:
+                parts.append("\n")
+            parts.append(f"== {title} ==\n")
+            for _, order, line in items:
+                if order in kept:
+                    parts.append(f"- {line}\n")
+            omitted = sum(1 for _, order, _ in items if order not in kept)
+            if omitted:
+                parts.append(f"- (+{omitted} lower-priority items omitted)\n")
+        parts.append(PROMPT_FOOTER)
+        return "".join(parts)
+
+    def _select_items(self) -> set:
+        """Returns the orders of the highest-scoring items that fit the token budget."""
+        # Fixed cost: header, footer, section titles and a possible "omitted" line per section.
+        budget = self.max_tokens - estimate_tokens(PROMPT_HEADER + PROMPT_FOOTER)
+        budget -= sum(estimate_tokens(f"\n== {title} ==\n- (+000 lower-priority items omitted)\n") for title, _ in self._sections)
+
+        ranked = sorted(
+            (item for _, items in self._sections for item in items),
+            key=lambda item: (-item[0], item[1]),
+        )
+        kept = set()
+        for _, order, line in ranked:
+            cost = estimate_tokens(f"- {line}\n")
+            if cost > budget:
+                continue
+            budget -= cost
+            kept.add(order)
+        return kept
+
+
+def _task_score(task, today: date) -> float:
+    score = 1.0 + PRIORITY_SCORES.get(task.priority, 0.0)
+    if task.important == "Yes":
+        score += 0.5
+    if task.planned_end_date:
+        try:
+            due = date.fromisoformat(task.planned_end_date[:10])
+        except ValueError:
+            due = None
+        # Overdue tasks and tasks due in the next two weeks are the likeliest agenda topics.
+        if due and due <= today + timedelta(days=14):
+            score += 1.0
+    return score
+
+
+def _summary_lines(aggregates) -> list[str]:
+    """Headline counts from precomputed dashboard aggregates, so the prompt never counts rows itself."""
+    top = lambda counts, n=3: ", ".join(f"{name} ({count})" for name, count in list(counts.items())[:n])
+    lines = [
+        f"Open tasks: {aggregates.open_tasks} ({aggregates.overdue_tasks} overdue as of {aggregates.as_of})",
+        f"Active projects: {aggregates.active_projects} of {aggregates.totals.get('projects', 0)}",
+    ]
+    if aggregates.customers_by_crm_phase:
+        lines.append(f"Customers by CRM phase: {top(aggregates.customers_by_crm_phase, n=10)}")
+    if aggregates.open_tasks_by_assignee:
+        lines.append(f"Most open tasks: {top(aggregates.open_tasks_by_assignee)}")
+    if aggregates.overdue_tasks_by_assignee:
+        lines.append(f"Most overdue tasks: {top(aggregates.overdue_tasks_by_assignee)}")
+    return lines
+
+
+def build_agenda_prompt(data, max_tokens: int = DEFAULT_MAX_PROMPT_TOKENS, today: date = None) -> str:
+    """Formats dashboard data into a ranked, token-budgeted prompt for the agenda model."""
+    today = today or date.today()
+    builder = AgendaPromptBuilder(max_tokens=max_tokens)
+
+    aggregates = getattr(data, "aggregates", None)
+    if aggregates:
+        builder.add_section("At a Glance")
+        for line in _summary_lines(aggregates):
+            builder.add_item(line, score=SUMMARY_SCORE)
+
+    builder.add_section("Active Projects")
+    for project in data.projects:
+        if project.status == "Active":
+            builder.add_item(f"{project.project_name}: Status is {project.status}, currently in stage '{project.stage}'.", score=PROJECT_SCORE)
+
+    builder.add_section("Key Upcoming Tasks (Not Done)")
+    for task in data.tasks:
+        if task.status != 'Done':
+            builder.add_item(f"{task.title} (Assigned to: {task.responsible_name or 'N/A'})", score=_task_score(task, today))
+
+    builder.add_section("Customer Pipeline Highlights")
+    for customer in data.customers:
+        if customer.crm_phase != "Done":
+            builder.add_item(
+                f"{customer.company_name}: Currently in '{customer.crm_phase}' phase. Next step: {customer.next_step_summary}",
+                score=1.5 if customer.next_step_summary else 1.0,
+            )
+
+    return builder.build()
+
+
+class PromptCache:
+    """
+    Persistent prompt -> response cache stored as a JSON file.
+    Identical prompts (e.g. a week with no changes) are answered without calling the model.
+    The file is only rewritten when a response is stored; hit/miss counts and estimated tokens
+    saved are written with it. Entries older than `max_age_days` are dropped, and beyond
+    `max_entries` the least recently used ones are evicted.
+    """
+    def __init__(self, path: str = None, max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+                 max_age_days: float = DEFAULT_CACHE_MAX_AGE_DAYS):
+        self.path = path or os.getenv("AGENDA_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+        self._lock = threading.Lock()
+        self._data = {"entries": {}, "stats": {"hits": 0, "misses": 0, "tokens_saved": 0}}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as cache_file:
+                    self._data = json.load(cache_file)
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable agenda cache at {self.path}: {e}")
+
+    @staticmethod
+    def key(model_name: str, prompt: str) -> str:
+        return hashlib.sha256(f"{model_name}\n{prompt}".encode('utf-8')).hexdigest()
+
+    def get(self, key: str, prompt: str):
+        with self._lock:
+            stats, entries = self._data["stats"], self._data["entries"]
+            entry = entries.get(key)
+            if entry is not None and time.time() - entry["stored_at"] > self.max_age_seconds:
+                del entries[key]
+                entry = None
+            if entry is None:
+                stats["misses"] += 1
+                return None
+            # Re-inserting keeps the entries in least recently used order for eviction.
+            entries[key] = entries.pop(key)
+            stats["hits"] += 1
+            stats["tokens_saved"] += estimate_tokens(prompt) + estimate_tokens(entry["response"])
+            return entry["response"]
+
+    def put(self, key: str, response: str):
+        with self._lock:
+            entries = self._data["entries"]
+            entries.pop(key, None)
+            entries[key] = {"response": response, "stored_at": time.time()}
+            self._evict()
+            self._save()
+
+    def __len__(self) -> int:
+        return len(self._data["entries"])
+
+    @property
+    def stats(self) -> dict:
+        stats = dict(self._data["stats"])
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _evict(self):
+        entries = self._data["entries"]
+        now = time.time()
+        for key in [key for key, entry in entries.items() if now - entry["stored_at"] > self.max_age_seconds]:
+            del entries[key]
+        while len(entries) > self.max_entries:
+            del entries[next(iter(entries))]
+
+    def _save(self):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)))
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(self._data, tmp_file)
+        os.replace(tmp_path, self.path)
+
+
+class FakeGenerativeModel:
+    """
+    Local stand-in for genai.GenerativeModel, for tests and offline runs.
+    Returns a deterministic agenda built from the prompt's bullet lines and counts calls.
+    """
+    model_name = "fake-agenda-model"
+
+    class _Response:
+        def __init__(self, text: str):
+            self.text = text
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt: str):
+        self.calls += 1
+        bullets = [line for line in prompt.splitlines() if line.startswith("- ")]
+        return self._Response("Agenda:\n" + "\n".join(bullets))
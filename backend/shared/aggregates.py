@@ -0,0 +1,91 @@
+from collections import Counter
+from datetime import date
+from typing import Iterable
+
+from .data_models import DashboardAggregates
+
+UNSPECIFIED = "Unspecified"
+DONE = "Done"
+ACTIVE = "Active"
+
+# Section -> (name of a count, row attribute counted)
+GROUPINGS = {
+    "customers": [("customers_by_crm_phase", "crm_phase")],
+    "projects": [("projects_by_status", "status"), ("projects_by_stage", "stage")],
+    "tasks": [("tasks_by_status", "status")],
+    "stakeholders": [("stakeholders_by_phase", "stakeholder_phase")],
+}
+
+
+def _due_date(planned_end_date):
+    if not planned_end_date:
+        return None
+    try:
+        return date.fromisoformat(planned_end_date[:10]).isoformat()
+    except ValueError:
+        return None
+
+
+class DashboardAggregator:
+    """
+    Counts dashboard rows by status, stage, phase and assignee as they stream past, so a summary
+    never needs a second scan of the rows. Open tasks are kept as an (assignee, due date) rollup;
+    result() turns that into overdue counts for any day, so a stored rollup stays valid as days pass.
+    """
+    def __init__(self):
+        self.totals = Counter()
+        self.counts = {name: Counter() for groupings in GROUPINGS.values() for name, _ in groupings}
+        self.open_tasks = Counter()  # (assignee, due date or None) -> open tasks
+
+    def add(self, section: str, row):
+        self.totals[section] += 1
+        for name, attribute in GROUPINGS[section]:
+            self.counts[name][getattr(row, attribute, None) or UNSPECIFIED] += 1
+        if section == "tasks" and row.status != DONE:
+            self.add_open_tasks(row.responsible_name, row.planned_end_date)
+
+    def add_open_tasks(self, assignee: str, planned_end_date: str, count: int = 1):
+        self.open_tasks[(assignee or UNSPECIFIED, _due_date(planned_end_date))] += count
+
+    def tap(self, section: str, rows: Iterable):
+        """Yields `rows` unchanged, counting each one on the way."""
+        for row in rows:
+            self.add(section, row)
+            yield row
+
+    def result(self, today: date = None) -> DashboardAggregates:
+        as_of = (today or date.today()).isoformat()
+        open_by_assignee, overdue_by_assignee = Counter(), Counter()
+        for (assignee, due), count in self.open_tasks.items():
+            open_by_assignee[assignee] += count
+            # ISO dates compare correctly as strings.
+            if due and due < as_of:
+                overdue_by_assignee[assignee] += count
+        return DashboardAggregates(
+            as_of=as_of,
+            totals={section: self.totals[section] for section in GROUPINGS},
+            open_tasks=sum(open_by_assignee.values()),
+            overdue_tasks=sum(overdue_by_assignee.values()),
+            active_projects=self.counts["projects_by_status"][ACTIVE],
+            open_tasks_by_assignee=dict(open_by_assignee.most_common()),
+            overdue_tasks_by_assignee=dict(overdue_by_assignee.most_common()),
+            **{name: dict(counter.most_common()) for name, counter in self.counts.items()},
+        )
+
+    # --- Persistence (the mirror stores the rollup on refresh) ---
+
+    def to_dict(self) -> dict:
+        return {
+            "totals": dict(self.totals),
+            "counts": {name: dict(counter) for name, counter in self.counts.items()},
+            "open_tasks": [[assignee, due, count] for (assignee, due), count in self.open_tasks.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "DashboardAggregator":
+        aggregator = cls()
+        aggregator.totals.update(data["totals"])
+        for name, counts in data["counts"].items():
+            aggregator.counts[name].update(counts)
+        aggregator.open_tasks.update({(assignee, due): count for assignee, due, count in data["open_tasks"]})
+        return aggregator
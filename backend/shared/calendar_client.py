@@ -1,19 +1,42 @@
 import os.path
+import threading
+from functools import lru_cache
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+from googleapiclient.discovery import build, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
 from googleapiclient.errors import HttpError
 
 # Defines the permissions we need.
 SCOPES = ["https://www.googleapis.com/auth/calendar.events"]
+# The Calendar API accepts up to 50 calls per batch request.
+MAX_BATCH_SIZE = 50
+# Private extended properties that mark the events schedule_events manages, so a rerun finds them.
+MANAGED_PROPERTY = "neurofluxManaged"
+KEY_PROPERTY = "neurofluxKey"
 
-class CalendarClient:
-    def __init__(self, credentials_path='credentials.json', token_path='token.json'):
-        creds = None
-        if os.path.exists(token_path):
+# Credentials are kept in memory per token file so repeated clients skip disk reads and refreshes.
+_credentials_cache = {}
+_credentials_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _calendar_discovery_document():
+    """
+    Loads the Calendar v3 discovery document bundled with google-api-python-client (no network).
+    Returns None when the installed client library does not ship it.
+    """
+    return get_static_doc("calendar", "v3")
+
+def _load_credentials(credentials_path: str, token_path: str) -> Credentials:
+    with _credentials_lock:
+        creds = _credentials_cache.get(token_path)
+        if creds and creds.valid:
+            return creds
+
+        if not creds and os.path.exists(token_path):
             creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-        
+
         # If there are no (valid) credentials available, let the user log in.
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
@@ -21,16 +44,27 @@ class CalendarClient:
             else:
                 flow = InstalledAppFlow.from_client_secrets_file(credentials_path, SCOPES)
                 creds = flow.run_local_server(port=0)
-            
+
             # Save the credentials for the next run
             with open(token_path, 'w') as token_file:
                 token_file.write(creds.to_json())
-        
-        self.service = build("calendar", "v3", credentials=creds)
 
-    def create_event(self, summary: str, description: str, start_time: str, end_time: str, attendees: list):
-        """Creates an event on the user's primary calendar."""
-        event = {
+        _credentials_cache[token_path] = creds
+        return creds
+
+class CalendarClient:
+    def __init__(self, credentials_path='credentials.json', token_path='token.json'):
+        creds = _load_credentials(credentials_path, token_path)
+        document = _calendar_discovery_document()
+        if document is None:
+            print("Bundled Calendar discovery document not found; fetching it from the network.")
+            self.service = build("calendar", "v3", credentials=creds, static_discovery=False, cache_discovery=False)
+        else:
+            self.service = build_from_document(document, credentials=creds)
+
+    def _build_event_body(self, summary: str, description: str, start_time: str, end_time: str, attendees: list,
+                          key: str = None) -> dict:
+        body = {
             "summary": summary,
             "description": description,
             "start": {"dateTime": start_time, "timeZone": "UTC"},
@@ -44,8 +78,105 @@ class CalendarClient:
                 ],
             },
         }
+        if key:
+            body["extendedProperties"] = {"private": {MANAGED_PROPERTY: "1", KEY_PROPERTY: key}}
+        return body
+
+    def create_event(self, summary: str, description: str, start_time: str, end_time: str, attendees: list):
+        """Creates an event on the user's primary calendar."""
+        event = self._build_event_body(summary, description, start_time, end_time, attendees)
         try:
             event = self.service.events().insert(calendarId="primary", body=event).execute()
             print(f"Event created: {event.get('htmlLink')}")
         except HttpError as error:
-            print(f"An error occurred: {error}")
\ No newline at end of file
+            print(f"An error occurred: {error}")
+
+    def create_events(self, events: list[dict]) -> list:
+        """
+        Creates many events through the batch endpoint, up to MAX_BATCH_SIZE per round trip.
+        Each entry takes the same keyword arguments as create_event.
+        Returns the created events in input order (None for any that failed).
+        """
+        requests = [
+            self.service.events().insert(calendarId="primary", body=self._build_event_body(**event))
+            for event in events
+        ]
+        results = self._execute_batch(requests)
+        print(f"Batch created {sum(1 for r in results if r)} of {len(events)} events.")
+        return results
+
+    def update_events(self, updates: dict) -> list:
+        """
+        Patches many existing events through the batch endpoint, up to MAX_BATCH_SIZE per round trip.
+        `updates` maps event ids to the fields to change.
+        Returns the updated events (None for any that failed).
+        """
+        requests = [
+            self.service.events().patch(calendarId="primary", eventId=event_id, body=fields)
+            for event_id, fields in updates.items()
+        ]
+        results = self._execute_batch(requests)
+        print(f"Batch updated {sum(1 for r in results if r)} of {len(updates)} events.")
+        return results
+
+    def find_managed_events(self, time_min: str, time_max: str) -> dict:
+        """Maps the key of every event schedule_events created between `time_min` and `time_max` to its id."""
+        found, page_token = {}, None
+        while True:
+            try:
+                response = self.service.events().list(
+                    calendarId="primary", timeMin=time_min, timeMax=time_max, singleEvents=True,
+                    privateExtendedProperty=f"{MANAGED_PROPERTY}=1", pageToken=page_token,
+                ).execute()
+            except HttpError as error:
+                print(f"An error occurred: {error}")
+                return found
+            for event in response.get("items", []):
+                key = event.get("extendedProperties", {}).get("private", {}).get(KEY_PROPERTY)
+                if key:
+                    found[key] = event["id"]
+            page_token = response.get("nextPageToken")
+            if not page_token:
+                return found
+
+    def schedule_events(self, events: list[dict]) -> list:
+        """
+        Creates or updates many events, each identified by a `key` besides create_event's arguments.
+        Events scheduled by an earlier run under the same key are patched rather than duplicated,
+        so a rerun of the worker costs one lookup plus one batched round trip per MAX_BATCH_SIZE events.
+        Returns the events in input order (None for any that failed).
+        """
+        if not events:
+            return []
+        existing = self.find_managed_events(min(e["start_time"] for e in events), max(e["end_time"] for e in events))
+        updates = {existing[e["key"]]: self._build_event_body(**e) for e in events if e["key"] in existing}
+        creates = [e for e in events if e["key"] not in existing]
+        updated = dict(zip(updates, self.update_events(updates))) if updates else {}
+        created = iter(self.create_events(creates)) if creates else iter(())
+        return [updated[existing[e["key"]]] if e["key"] in existing else next(created) for e in events]
+
+    def _execute_batch(self, requests: list) -> list:
+        results = [None] * len(requests)
+        if len(requests) == 1:
+            # A lone call gains nothing from the multipart batch envelope.
+            try:
+                results[0] = requests[0].execute()
+            except HttpError as error:
+                print(f"An error occurred: {error}")
+            return results
+
+        def callback(request_id, response, exception):
+            if exception is not None:
+                print(f"An error occurred in batch request {request_id}: {exception}")
+            else:
+                results[int(request_id)] = response
+
+        for start in range(0, len(requests), MAX_BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=callback)
+            for index, request in enumerate(requests[start:start + MAX_BATCH_SIZE], start=start):
+                batch.add(request, request_id=str(index))
+            try:
+                batch.execute()
+            except HttpError as error:
+                print(f"An error occurred: {error}")
+        return results
@@ -56,6 +56,8 @@ class User:
     id: Optional[str]  # The Firestore document ID
     email: str
     password_hash: str
+    # Workspace the user belongs to (see shared.tenants); set on the user document by an administrator.
+    tenant_id: Optional[str] = None
 
 @dataclass
 class WeeklyReport:
@@ -65,6 +67,22 @@ class WeeklyReport:
     stakeholders: list
     tasks: list
 
+@dataclass
+class DashboardAggregates:
+    """Counts for summary views, computed in one pass over the rows. Overdue is relative to `as_of`."""
+    as_of: str
+    totals: dict = field(default_factory=dict)
+    open_tasks: int = 0
+    overdue_tasks: int = 0
+    active_projects: int = 0
+    tasks_by_status: dict = field(default_factory=dict)
+    open_tasks_by_assignee: dict = field(default_factory=dict)
+    overdue_tasks_by_assignee: dict = field(default_factory=dict)
+    projects_by_status: dict = field(default_factory=dict)
+    projects_by_stage: dict = field(default_factory=dict)
+    customers_by_crm_phase: dict = field(default_factory=dict)
+    stakeholders_by_phase: dict = field(default_factory=dict)
+
 @dataclass
 class DashboardData:
     customers: List[Customer] = field(default_factory=list)
@@ -73,6 +91,7 @@ class DashboardData:
     stakeholders: List[Stakeholder] = field(default_factory=list)
     sync_logs: List[SyncLog] = field(default_factory=list)
     weekly_report: WeeklyReport = None
+    aggregates: DashboardAggregates = None
 
 @dataclass
 class Feature:
@@ -1,14 +1,25 @@
+import json
+
+import requests
 import brevo_python
 from brevo_python.rest import ApiException
 from brevo_python.models import SendSmtpEmail, SendSmtpEmailAttachment
 
+from . import telemetry
+
+# Attachment bytes sent per chunk when streaming a base64 file into the request body.
+ATTACHMENT_CHUNK_BYTES = 256 * 1024
+
 class EmailClient:
     def __init__(self, api_key: str, sender_email: str):
         configuration = brevo_python.Configuration()
         configuration.api_key['api-key'] = api_key
         self.api_instance = brevo_python.TransactionalEmailsApi(brevo_python.ApiClient(configuration))
+        self.api_key = api_key
+        self.send_url = f"{configuration.host}/smtp/email"
         self.sender = {"email": sender_email, "name": "Neuroflux Reports"}
 
+    @telemetry.traced("email.send_email_with_attachment", telemetry.CLIENT)
     def send_email_with_attachment(self, to_email: str, subject: str, pdf_data: str, pdf_name: str):
         to = [{"email": to_email}]
         attachment = SendSmtpEmailAttachment(
@@ -26,4 +37,39 @@ class EmailClient:
             api_response = self.api_instance.send_transac_email(send_smtp_email)
             print(f"Email sent to {to_email}. Response: {api_response}")
         except ApiException as e:
-            print(f"Exception when calling TransactionalEmailsApi->send_transac_email: {e}\n")
\ No newline at end of file
+            print(f"Exception when calling TransactionalEmailsApi->send_transac_email: {e}\n")
+
+    @telemetry.traced("email.send_email_with_attachment_file", telemetry.CLIENT)
+    def send_email_with_attachment_file(self, to_email: str, subject: str, encoded_pdf_path: str, pdf_name: str):
+        """
+        Like send_email_with_attachment, but streams the attachment from a base64 file, as written
+        by ReportRenderer.render_pdf_streamed, into a chunked request body. Brevo only takes
+        attachment content inline in the JSON body and the SDK needs it as one string, so the
+        request is built here; base64 needs no JSON escaping, so the file is spliced in as is.
+        """
+        message = json.dumps({
+            "sender": self.sender,
+            "to": [{"email": to_email}],
+            "subject": subject,
+            "htmlContent": "<p>Please find the weekly status report attached.</p>",
+        })
+        head = f'{message[:-1]}, "attachment": [{{"name": {json.dumps(pdf_name)}, "content": "'
+
+        def body():
+            yield head.encode('utf-8')
+            with open(encoded_pdf_path, 'rb') as encoded_file:
+                while True:
+                    chunk = encoded_file.read(ATTACHMENT_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    yield chunk
+            yield b'"}]}'
+
+        try:
+            response = requests.post(self.send_url, data=body(), timeout=60, headers={
+                "api-key": self.api_key, "Content-Type": "application/json", "Accept": "application/json",
+            })
+            response.raise_for_status()
+            print(f"Email sent to {to_email}. Response: {response.json()}")
+        except requests.RequestException as e:
+            print(f"Exception when sending to Brevo /smtp/email: {e}\n")
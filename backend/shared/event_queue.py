@@ -0,0 +1,105 @@
+import time
+import threading
+from typing import Callable, Iterable
+
+from . import telemetry
+
+
+class CoalescingQueue:
+    """
+    Collects keys (e.g. "project:<id>") from incoming events and hands them to `handler` in batches.
+    Repeated submissions of a key coalesce into one entry. A key is flushed once it has been quiet
+    for `debounce_seconds`, or `max_delay_seconds` after it first arrived so a steady stream of
+    edits cannot postpone a sync forever. The handler runs on a single background thread, one
+    batch at a time; keys submitted while it runs are picked up by the next batch.
+    """
+    def __init__(self, handler: Callable[[list], None], debounce_seconds: float = 5.0, max_delay_seconds: float = 30.0):
+        self.handler = handler
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._pending = {}  # key -> (first_seen, last_seen)
+        self._condition = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self.stats = {"submitted": 0, "coalesced": 0, "batches": 0, "failed_batches": 0}
+
+    def submit(self, keys: Iterable[str]):
+        keys = list(keys)
+        if not keys:
+            return
+        now = time.monotonic()
+        with self._condition:
+            for key in keys:
+                self.stats["submitted"] += 1
+                if key in self._pending:
+                    self.stats["coalesced"] += 1
+                    first_seen, _ = self._pending[key]
+                    self._pending[key] = (first_seen, now)
+                else:
+                    self._pending[key] = (now, now)
+            self._ensure_worker()
+            self._condition.notify()
+
+    def pending(self) -> list:
+        with self._condition:
+            return list(self._pending)
+
+    def _due_at(self, first_seen: float, last_seen: float) -> float:
+        return min(last_seen + self.debounce_seconds, first_seen + self.max_delay_seconds)
+
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="coalescing-queue", daemon=True)
+            self._thread.start()
+
+    def _take_due(self) -> list:
+        """Waits until at least one key is due, then removes and returns every due key."""
+        with self._condition:
+            while not self._stopped:
+                now = time.monotonic()
+                due = [key for key, seen in self._pending.items() if self._due_at(*seen) <= now]
+                if due:
+                    for key in due:
+                        del self._pending[key]
+                    return due
+                next_due = min((self._due_at(*seen) for seen in self._pending.values()), default=None)
+                self._condition.wait(timeout=None if next_due is None else next_due - now)
+            return []
+
+    def _run(self):
+        while True:
+            batch = self._take_due()
+            if not batch:
+                return
+            self.stats["batches"] += 1
+            try:
+                with telemetry.span("event_queue.flush", keys=len(batch)):
+                    self.handler(batch)
+            except Exception as e:
+                self.stats["failed_batches"] += 1
+                print(f"Event queue batch failed ({len(batch)} keys): {e}")
+
+    def flush(self):
+        """Makes every pending key due immediately (used on shutdown and in benchmarks)."""
+        with self._condition:
+            self._pending = {key: (0.0, 0.0) for key in self._pending}
+            self._condition.notify()
+
+    def stop(self, timeout: float = None) -> list:
+        """
+        Flushes what is pending, lets the worker finish it and stops the background thread.
+        Returns the keys still pending when `timeout` ran out (e.g. behind a long-running batch).
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.flush()
+        with self._condition:
+            while self._pending and self._thread and self._thread.is_alive():
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                self._condition.wait(timeout=0.05)
+            self._stopped = True
+            left = list(self._pending)
+            self._condition.notify()
+        if self._thread:
+            self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return left
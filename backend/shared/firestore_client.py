@@ -3,6 +3,7 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from google.cloud import firestore
 
 from .data_models import User
+from . import telemetry
 
 class FirestoreClient:
     def __init__(self):
@@ -10,7 +11,9 @@ class FirestoreClient:
         # credentials when running on GCP.
         self.db = firestore.Client()
         self.users_collection = self.db.collection('users')
+        self.webhook_verifications = self.db.collection('webhook_verifications')
 
+    @telemetry.traced("firestore.get_user_by_email", telemetry.CLIENT)
     def get_user_by_email(self, email: str) -> Optional[User]:
         """
         Retrieves a user document from Firestore by their email address.
@@ -28,9 +31,11 @@ class FirestoreClient:
         return User(
             id=user_doc.id,
             email=user_data.get("email"),
-            password_hash=user_data.get("password_hash")
+            password_hash=user_data.get("password_hash"),
+            tenant_id=user_data.get("tenant_id")
         )
 
+    @telemetry.traced("firestore.create_user", telemetry.CLIENT)
     def create_user(self, email: str, password: str) -> User:
         """
         Creates a new user in Firestore with a hashed password.
@@ -57,6 +62,45 @@ class FirestoreClient:
             password_hash=password_hash
         )
 
+    @telemetry.traced("auth.verify_password")
     def verify_password(self, password_hash: str, password_to_check: str) -> bool:
         """Verifies a password against its stored hash."""
-        return check_password_hash(password_hash, password_to_check)
\ No newline at end of file
+        return check_password_hash(password_hash, password_to_check)
+
+    @telemetry.traced("firestore.save_webhook_verification", telemetry.CLIENT)
+    def save_webhook_verification(self, tenant_id: str, source: str, token: str) -> bool:
+        """
+        Keeps a webhook subscription's verification token until an operator claims it. The handshake
+        is unauthenticated, so the first token wins: once one is stored (or claimed) later ones are
+        ignored and False is returned. Deleting the document accepts a new subscription's token.
+        """
+        ref = self.webhook_verifications.document(f"{source}_{tenant_id}")
+
+        @firestore.transactional
+        def save(transaction):
+            if ref.get(transaction=transaction).exists:
+                return False
+            transaction.set(ref, {"token": token, "received_at": firestore.SERVER_TIMESTAMP})
+            return True
+
+        return save(self.db.transaction())
+
+    @telemetry.traced("firestore.pop_webhook_verification", telemetry.CLIENT)
+    def pop_webhook_verification(self, tenant_id: str, source: str) -> Optional[str]:
+        """
+        Returns a stored verification token and clears it, or None if there is none (or it was claimed).
+        Runs in a transaction, so a token is handed out at most once. The document is kept, marked
+        claimed, so the handshake cannot be replayed with another token afterwards.
+        """
+        ref = self.webhook_verifications.document(f"{source}_{tenant_id}")
+
+        @firestore.transactional
+        def pop(transaction):
+            snapshot = ref.get(transaction=transaction)
+            token = snapshot.to_dict().get("token") if snapshot.exists else None
+            if token is None:
+                return None
+            transaction.set(ref, {"token": None, "claimed_at": firestore.SERVER_TIMESTAMP}, merge=True)
+            return token
+
+        return pop(self.db.transaction())
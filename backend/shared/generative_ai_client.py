@@ -1,15 +1,31 @@
 import google.generativeai as genai
 
+from .agenda import PromptCache
+
 class GenerativeAIClient:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-2.5-flash')
+    def __init__(self, api_key: str = None, model=None, cache: PromptCache = None):
+        """
+        `model` defaults to Gemini; pass agenda.FakeGenerativeModel() to run offline.
+        `cache` defaults to the persistent PromptCache.
+        """
+        if model is None:
+            genai.configure(api_key=api_key)
+            model = genai.GenerativeModel('gemini-2.5-flash')
+        self.model = model
+        self.cache = cache if cache is not None else PromptCache()
 
     def generate_meeting_agenda(self, prompt: str) -> str:
-        """Generates text content based on a given prompt."""
+        """Generates text content based on a given prompt, reusing cached responses for identical prompts."""
+        cache_key = PromptCache.key(self.model.model_name, prompt)
+        cached = self.cache.get(cache_key, prompt)
+        if cached is not None:
+            print(f"Agenda cache hit. Cache stats: {self.cache.stats}")
+            return cached
+
         try:
             response = self.model.generate_content(prompt)
+            self.cache.put(cache_key, response.text)
             return response.text
         except Exception as e:
             print(f"Error generating content with Gemini: {e}")
-            return f"Error: Could not generate agenda. Details: {e}"
\ No newline at end of file
+            return f"Error: Could not generate agenda. Details: {e}"
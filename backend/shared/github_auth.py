@@ -0,0 +1,366 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+import jwt
+import requests
+from cryptography.fernet import Fernet, InvalidToken
+from github import Auth
+
+from .secrets import get_secret
+from . import telemetry
+
+# Tokens are refreshed this long before they expire, so a token handed out is good for a whole sync job.
+REFRESH_MARGIN_SECONDS = 600
+OAUTH_TOKEN_URL = "https://github.com/login/oauth/access_token"
+
+
+@dataclass
+class GitHubToken:
+    token: str
+    expires_at: Optional[float] = None          # epoch seconds; None for tokens that do not expire (PATs)
+    refresh_token: Optional[str] = None
+    refresh_token_expires_at: Optional[float] = None
+    source: str = ""
+
+    def is_valid(self, margin: float = REFRESH_MARGIN_SECONDS) -> bool:
+        return bool(self.token) and (self.expires_at is None or self.expires_at - margin > time.time())
+
+    def can_refresh(self) -> bool:
+        return bool(self.refresh_token) and (self.refresh_token_expires_at is None or self.refresh_token_expires_at > time.time())
+
+
+# --- Providers ---
+# Each provider's fetch() gets the last cached token (possibly expired) and returns a fresh one.
+
+class StaticTokenProvider:
+    """A personal access token (GITHUB_TOKEN). Never expires, so it is not cached."""
+    cache_key = None
+
+    def __init__(self, token: str):
+        self.token = token
+
+    def fetch(self, cached: Optional[GitHubToken]) -> GitHubToken:
+        return GitHubToken(token=self.token, source="static")
+
+
+class GitHubAppTokenProvider:
+    """Installation access tokens for a GitHub App, minted from the app's private key. They last one hour."""
+    def __init__(self, app_id: str, private_key: str, installation_id: str, base_url: str = None):
+        self.app_id = app_id
+        # Keys stored in .env files often have their newlines escaped.
+        self.private_key = private_key.replace("\\n", "\n")
+        self.installation_id = installation_id
+        self.base_url = base_url or os.getenv("GITHUB_API_URL", "https://api.github.com")
+        self.cache_key = f"app-{app_id}-{installation_id}"
+
+    def _app_jwt(self) -> str:
+        now = int(time.time())
+        # iat is backdated to allow for clock drift; GitHub rejects app JWTs valid for more than 10 minutes.
+        return jwt.encode({"iat": now - 60, "exp": now + 540, "iss": str(self.app_id)}, self.private_key, algorithm="RS256")
+
+    @telemetry.traced("github.app_installation_token", telemetry.CLIENT)
+    def fetch(self, cached: Optional[GitHubToken]) -> GitHubToken:
+        response = requests.post(
+            f"{self.base_url}/app/installations/{self.installation_id}/access_tokens",
+            headers={"Authorization": f"Bearer {self._app_jwt()}", "Accept": "application/vnd.github+json"},
+            timeout=30,
+        )
+        response.raise_for_status()
+        data = response.json()
+        expires_at = datetime.strptime(data["expires_at"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+        return GitHubToken(token=data["token"], expires_at=expires_at, source="github_app")
+
+
+class OAuthTokenProvider:
+    """
+    User tokens from the OAuth app. Expired tokens are renewed with the (rotating) refresh token kept in
+    the cache, or with GITHUB_REFRESH_TOKEN the first time. The interactive browser flow is the last resort.
+    """
+    def __init__(self, client_id: str, client_secret: str, refresh_token: str = None,
+                 interactive: Callable[[], dict] = None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.refresh_token = refresh_token
+        self.interactive = interactive
+        self.cache_key = f"oauth-{client_id}"
+
+    @staticmethod
+    def token_from_response(data: dict, source: str) -> GitHubToken:
+        if "access_token" not in data:
+            raise Exception(f"GitHub OAuth error: {data.get('error_description') or data.get('error') or data}")
+        now = time.time()
+        return GitHubToken(
+            token=data["access_token"],
+            expires_at=now + int(data["expires_in"]) if data.get("expires_in") else None,
+            refresh_token=data.get("refresh_token"),
+            refresh_token_expires_at=now + int(data["refresh_token_expires_in"]) if data.get("refresh_token_expires_in") else None,
+            source=source,
+        )
+
+    @telemetry.traced("github.oauth_refresh", telemetry.CLIENT)
+    def _refresh(self, refresh_token: str) -> GitHubToken:
+        response = requests.post(OAUTH_TOKEN_URL, json={
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "grant_type": "refresh_token",
+            "refresh_token": refresh_token,
+        }, headers={"Accept": "application/json"}, timeout=30)
+        response.raise_for_status()
+        return self.token_from_response(response.json(), "refresh_token")
+
+    def fetch(self, cached: Optional[GitHubToken]) -> GitHubToken:
+        for refresh_token in (cached.refresh_token if cached and cached.can_refresh() else None, self.refresh_token):
+            if refresh_token:
+                try:
+                    return self._refresh(refresh_token)
+                except Exception as e:
+                    print(f"GitHub token refresh failed: {e}")
+        if self.interactive is None:
+            raise Exception("No valid GitHub refresh token and interactive sign-in is not available.")
+        print("Falling back to interactive GitHub sign-in.")
+        return self.token_from_response(self.interactive(), "interactive")
+
+
+# --- Caches ---
+# Tokens are stored Fernet-encrypted. lock() serialises refreshes across processes, which matters
+# for OAuth because GitHub rotates the refresh token on every use.
+
+class MemoryTokenCache:
+    def __init__(self):
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[GitHubToken]:
+        return self._tokens.get(key)
+
+    def store(self, key: str, token: GitHubToken):
+        self._tokens[key] = token
+
+    @contextmanager
+    def lock(self, key: str):
+        with self._lock:
+            yield
+
+
+class EncryptedFileTokenCache:
+    """One encrypted file per token on the local disk, readable only by the current user."""
+    def __init__(self, directory: str, encryption_key: str, lock_timeout: float = 30.0):
+        self.directory = directory
+        self.fernet = Fernet(encryption_key)
+        self.lock_timeout = lock_timeout
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.token")
+
+    def load(self, key: str) -> Optional[GitHubToken]:
+        try:
+            with open(self._path(key), "rb") as token_file:
+                return GitHubToken(**json.loads(self.fernet.decrypt(token_file.read())))
+        except (FileNotFoundError, InvalidToken, ValueError, TypeError):
+            return None
+
+    def store(self, key: str, token: GitHubToken):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "wb") as token_file:
+            token_file.write(self.fernet.encrypt(json.dumps(asdict(token)).encode("utf-8")))
+        os.replace(tmp_path, path)
+
+    @contextmanager
+    def lock(self, key: str):
+        """A lock file shared by every process on this machine. Locks older than the timeout are treated as stale."""
+        lock_path = self._path(key) + ".lock"
+        deadline = time.time() + self.lock_timeout
+        while True:
+            try:
+                os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o600))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.lock_timeout:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() > deadline:
+                    raise TimeoutError(f"Timed out waiting for {lock_path}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+
+
+class FirestoreTokenCache:
+    """Encrypted tokens in a Firestore collection, shared by every worker instance."""
+    def __init__(self, encryption_key: str, db=None, collection: str = "github_tokens", lock_timeout: float = 30.0):
+        from google.cloud import firestore
+
+        self._firestore = firestore
+        self.fernet = Fernet(encryption_key)
+        self.db = db or firestore.Client()
+        self.collection = self.db.collection(collection)
+        self.lock_timeout = lock_timeout
+
+    @telemetry.traced("firestore.github_tokens.load", telemetry.CLIENT)
+    def load(self, key: str) -> Optional[GitHubToken]:
+        snapshot = self.collection.document(key).get()
+        data = snapshot.to_dict() if snapshot.exists else None
+        if not data or not data.get("ciphertext"):
+            return None
+        try:
+            return GitHubToken(**json.loads(self.fernet.decrypt(data["ciphertext"].encode("ascii"))))
+        except (InvalidToken, ValueError, TypeError):
+            return None
+
+    @telemetry.traced("firestore.github_tokens.store", telemetry.CLIENT)
+    def store(self, key: str, token: GitHubToken):
+        ciphertext = self.fernet.encrypt(json.dumps(asdict(token)).encode("utf-8")).decode("ascii")
+        self.collection.document(key).set({"ciphertext": ciphertext, "updated_at": time.time()}, merge=True)
+
+    @contextmanager
+    def lock(self, key: str):
+        """A lease on the token document (`locked_until`), taken in a transaction."""
+        ref = self.collection.document(key)
+        deadline = time.time() + self.lock_timeout
+
+        @self._firestore.transactional
+        def acquire(transaction) -> bool:
+            snapshot = ref.get(transaction=transaction)
+            now = time.time()
+            if snapshot.exists and (snapshot.to_dict() or {}).get("locked_until", 0) > now:
+                return False
+            transaction.set(ref, {"locked_until": now + self.lock_timeout}, merge=True)
+            return True
+
+        while not acquire(self.db.transaction()):
+            if time.time() > deadline:
+                raise TimeoutError(f"Timed out waiting for the GitHub token lock '{key}'")
+            time.sleep(0.25)
+        try:
+            yield
+        finally:
+            ref.set({"locked_until": 0}, merge=True)
+
+
+# --- Manager ---
+
+class GitHubTokenManager:
+    """
+    Hands out a valid token, in order: this process's copy, the shared cache, then the provider.
+    Only one process refreshes at a time; the others wait and pick up the refreshed token from the cache.
+    """
+    def __init__(self, provider, cache=None, refresh_margin: float = REFRESH_MARGIN_SECONDS):
+        self.provider = provider
+        self.cache = cache or MemoryTokenCache()
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._lock = threading.Lock()
+
+    def get_token(self) -> str:
+        token = self._token
+        if token and token.is_valid(self.refresh_margin):
+            return token.token
+        with self._lock:
+            self._token = self._load_or_refresh()
+            return self._token.token
+
+    def _load_or_refresh(self) -> GitHubToken:
+        key = self.provider.cache_key
+        if key is None:
+            return self.provider.fetch(None)
+        cached = self.cache.load(key)
+        if cached and cached.is_valid(self.refresh_margin):
+            return cached
+        with self.cache.lock(key):
+            # Another process may have refreshed while we waited for the lock.
+            cached = self.cache.load(key)
+            if cached and cached.is_valid(self.refresh_margin):
+                return cached
+            token = self.provider.fetch(cached)
+            self.cache.store(key, token)
+            print(f"Obtained a new GitHub token ({token.source}).")
+            return token
+
+
+class ManagedTokenAuth(Auth.Auth):
+    """PyGithub auth that asks the manager for the current token on every request."""
+    def __init__(self, manager: GitHubTokenManager):
+        self.manager = manager
+
+    @property
+    def token_type(self) -> str:
+        return "token"
+
+    @property
+    def token(self) -> str:
+        return self.manager.get_token()
+
+
+class ManagedTokenRequestsAuth(requests.auth.AuthBase):
+    """The same for plain `requests` sessions (used by the GraphQL transport)."""
+    def __init__(self, manager: GitHubTokenManager):
+        self.manager = manager
+
+    def __call__(self, request):
+        request.headers["Authorization"] = f"Bearer {self.manager.get_token()}"
+        return request
+
+
+def _optional_secret(secret_id: str, project_id: str = None) -> Optional[str]:
+    try:
+        return get_secret(secret_id, project_id=project_id)
+    except Exception:
+        return None
+
+
+def _token_cache(project_id: str = None):
+    """GITHUB_TOKEN_CACHE=firestore shares tokens between instances; the default is an encrypted local file."""
+    encryption_key = _optional_secret("GITHUB_TOKEN_CACHE_KEY", project_id)
+    if not encryption_key:
+        print("GITHUB_TOKEN_CACHE_KEY is not set; GitHub tokens are only cached in memory.")
+        return MemoryTokenCache()
+    if os.getenv("GITHUB_TOKEN_CACHE") == "firestore":
+        return FirestoreTokenCache(encryption_key)
+    directory = os.getenv("GITHUB_TOKEN_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".neuroflux", "tokens"))
+    return EncryptedFileTokenCache(directory, encryption_key)
+
+
+def get_token_manager(project_id: str = None, interactive: Callable[[], dict] = None) -> GitHubTokenManager:
+    """
+    Picks the first configured credential:
+    a GitHub App installation (GITHUB_APP_ID, GITHUB_APP_PRIVATE_KEY, GITHUB_APP_INSTALLATION_ID),
+    a personal access token (GITHUB_TOKEN), then the OAuth app (GITHUB_CLIENT_ID, GITHUB_CLIENT_SECRET,
+    optionally GITHUB_REFRESH_TOKEN), falling back to `interactive` sign-in when it is given.
+    """
+    app_id = _optional_secret("GITHUB_APP_ID", project_id)
+    if app_id:
+        provider = GitHubAppTokenProvider(
+            app_id,
+            get_secret("GITHUB_APP_PRIVATE_KEY", project_id=project_id),
+            get_secret("GITHUB_APP_INSTALLATION_ID", project_id=project_id),
+        )
+        return GitHubTokenManager(provider, _token_cache(project_id))
+
+    static_token = _optional_secret("GITHUB_TOKEN", project_id)
+    if static_token:
+        return GitHubTokenManager(StaticTokenProvider(static_token))
+
+    provider = OAuthTokenProvider(
+        client_id=_optional_secret("GITHUB_CLIENT_ID", project_id),
+        client_secret=_optional_secret("GITHUB_CLIENT_SECRET", project_id),
+        refresh_token=_optional_secret("GITHUB_REFRESH_TOKEN", project_id),
+        interactive=interactive,
+    )
+    return GitHubTokenManager(provider, _token_cache(project_id))
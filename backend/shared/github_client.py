@@ -1,39 +1,238 @@
+import os
+import time
+import requests
 from github import Github, Auth
 from gql import gql, Client
 from gql.transport.requests import RequestsHTTPTransport
 
+from shared.github_auth import GitHubTokenManager, ManagedTokenAuth, ManagedTokenRequestsAuth
+from shared.rate_budget import RateLimitBudget, CORE, GRAPHQL, HIGH, LOW
+from shared import telemetry
+from shared import http_fixtures
+
+# Which rate-limit resource each GitHubClient operation draws on, for budget estimates before it has been observed.
+OPERATION_RESOURCES = {
+    "get_all_repos": CORE,
+    "create_repo": CORE,
+    "create_issue": CORE,
+    "get_all_projects": GRAPHQL,
+    "create_project": GRAPHQL,
+    "add_issue_to_project": GRAPHQL,
+    "get_project_items": GRAPHQL,
+    "get_changed_project_items": GRAPHQL,
+    "update_issue_body": GRAPHQL,
+    "create_projects": GRAPHQL,
+    "create_issues": GRAPHQL,
+    "add_issues_to_projects": GRAPHQL,
+    "update_issue_bodies": GRAPHQL,
+}
+# Retries for requests sent through the plain session when GitHub answers with a secondary rate limit.
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+class BatchMutationError(Exception):
+    """
+    Some mutations of a batched GraphQL request failed. `results` lines up with the inputs and holds
+    the payload of each mutation that succeeded (None for the failed ones), so callers can keep them.
+    """
+    def __init__(self, operation: str, errors: list, results: list):
+        super().__init__(f"{operation}: {len(errors)} of {len(results)} mutation(s) failed: {errors[0].get('message')}")
+        self.errors = errors
+        self.results = results
+
+
 class GitHubClient:
-    def __init__(self, token: str):
-        self.rest_client = Github(auth=Auth.Token(token))
+    def __init__(self, token: str = None, base_url: str = None, fetch_schema: bool = True,
+                 seconds_between_requests: float = 0.25, seconds_between_writes: float = 1.0,
+                 token_manager: GitHubTokenManager = None, budget: RateLimitBudget = None):
+        """
+        `base_url` defaults to GITHUB_API_URL or the public API, so benchmarks can target a stand-in server.
+        The `seconds_between_*` throttles are PyGithub's secondary-rate-limit guards; keep the defaults against github.com.
+        Pass a `token_manager` instead of a fixed `token` to renew expiring tokens (GitHub App, OAuth) mid-run.
+        `budget` tracks the rate limits of both transports; share one between clients using the same token.
+        """
+        base_url = base_url or os.getenv("GITHUB_API_URL", "https://api.github.com")
+        # HTTP_FIXTURES_MODE records or replays this process's API traffic (profiling only).
+        http_fixtures.install_from_env()
+        self.rest_client = Github(
+            auth=ManagedTokenAuth(token_manager) if token_manager else Auth.Token(token),
+            base_url=base_url,
+            seconds_between_requests=seconds_between_requests,
+            seconds_between_writes=seconds_between_writes,
+        )
         self.user = self.rest_client.get_user()
-        
+        self.base_url = base_url
+        self.budget = budget or RateLimitBudget(min_write_interval=seconds_between_writes)
+
+        # Plain session for REST reads that benefit from conditional requests (PyGithub does not send If-None-Match).
+        self._session = requests.Session()
+        self._session.headers["Accept"] = "application/vnd.github+json"
+        if token_manager:
+            self._session.auth = ManagedTokenRequestsAuth(token_manager)
+        else:
+            self._session.headers["Authorization"] = f"Bearer {token}"
+        self._etag_cache = {}  # url -> (etag, json body, next page url)
+
         self._transport = RequestsHTTPTransport(
-            url="https://api.github.com/graphql",
-            headers={"Authorization": f"Bearer {token}"},
+            url=f"{base_url}/graphql",
+            headers=None if token_manager else {"Authorization": f"Bearer {token}"},
+            auth=ManagedTokenRequestsAuth(token_manager) if token_manager else None,
             use_json=True,
+            retries=3,
+        )
+        self.graphql_client = Client(transport=self._transport, fetch_schema_from_transport=fetch_schema)
+
+    # --- Transport helpers: every call goes through the rate-limit budget ---
+
+    def _graphql(self, operation: str, document, variables: dict, priority: str = HIGH, write: bool = False) -> dict:
+        """
+        Executes a GraphQL document, recording its cost from `rateLimit` (queries) or the response headers.
+        Each request is traced as a `github.graphql.<operation>` client span, so paginated reads count every page.
+        """
+        self.budget.before_call(GRAPHQL, priority, write=write)
+        with telemetry.span(f"github.graphql.{operation}", telemetry.CLIENT):
+            result = self.graphql_client.execute(document, variable_values=variables)
+        self.budget.update_from_headers(self._transport.response_headers, GRAPHQL)
+        rate_limit = result.pop("rateLimit", None)
+        self.budget.update_from_graphql(rate_limit)
+        self.budget.record_cost(operation, GRAPHQL, rate_limit["cost"] if rate_limit else 1)
+        return result
+
+    def _rest(self, operation: str, call, priority: str = HIGH):
+        """
+        Runs a PyGithub call (a single request) and reads the rate limit it reported. PyGithub paces
+        its own writes. Traced as a `github.rest.<operation>` client span.
+        """
+        self.budget.before_call(CORE, priority)
+        with telemetry.span(f"github.rest.{operation}", telemetry.CLIENT):
+            result = call()
+        requester = self.user._requester
+        remaining, limit = requester.rate_limiting
+        if remaining >= 0:
+            self.budget.update(CORE, remaining=remaining, limit=limit, reset_at=requester.rate_limiting_resettime or None)
+        self.budget.record_cost(operation, CORE)
+        return result
+
+    def _send(self, operation: str, method: str, url: str, resource: str, priority: str = HIGH, write: bool = False,
+              cost: float = 1, **kwargs):
+        """
+        Sends a request through the plain session, retrying GitHub's secondary rate limits. `cost` is
+        the budget the request is expected to use.
+        Traced as a `github.rest.<operation>` or `github.graphql.<operation>` client span, like NotionClient._request.
+        """
+        transport = "graphql" if resource == GRAPHQL else "rest"
+        with telemetry.span(f"github.{transport}.{operation}", telemetry.CLIENT, method=method) as span:
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                self.budget.before_call(resource, priority, write=write, cost=cost)
+                response = self._session.request(method, url, timeout=60, **kwargs)
+                self.budget.update_from_headers(response.headers, resource)
+                span.set_attribute("http.status_code", response.status_code)
+                span.set_attribute("retries", attempt)
+                if response.status_code in (403, 429) and attempt < MAX_RATE_LIMIT_RETRIES:
+                    if "Retry-After" in response.headers:
+                        # Secondary rate limit: GitHub says how long to back off.
+                        time.sleep(float(response.headers["Retry-After"]))
+                        continue
+                    if response.headers.get("X-RateLimit-Remaining") == "0":
+                        # Primary limit used up: the budget, just updated from these headers, waits for
+                        # X-RateLimit-Reset before the retry, or raises BudgetDeferred if it is too far off.
+                        continue
+                return response
+
+    def _conditional_get(self, operation: str, url: str) -> tuple:
+        """
+        GET with If-None-Match. A 304 reuses the cached body and does not count against the rate limit.
+        Returns (json body, next page url).
+        """
+        cached = self._etag_cache.get(url)
+        response = self._send(operation, "GET", url, CORE, headers={"If-None-Match": cached[0]} if cached else {})
+        if response.status_code == 304 and cached:
+            self.budget.record_cost(operation, CORE, 0)
+            return cached[1], cached[2]
+        response.raise_for_status()
+        self.budget.record_cost(operation, CORE)
+        body, next_url = response.json(), response.links.get("next", {}).get("url")
+        if response.headers.get("ETag"):
+            self._etag_cache[url] = (response.headers["ETag"], body, next_url)
+        return body, next_url
+
+    def _graphql_batch(self, operation: str, mutation: str, input_type: str, inputs: list, selection: str,
+                       extract, priority: str = HIGH) -> list:
+        """
+        Sends one aliased `mutation` per input in a single GraphQL request and returns `extract(payload)`
+        for each, in input order. Raises BatchMutationError with the partial results if any failed.
+        `operation` is the GitHubClient method name (as in OPERATION_RESOURCES); costs are recorded under
+        it, one per mutation (mutations cannot select `rateLimit`), and the GraphQL operation is named
+        after it (create_issues -> CreateIssues).
+        """
+        aliases = [f"m{i}" for i in range(len(inputs))]
+        document = "mutation %s(%s) { %s }" % (
+            "".join(part.title() for part in operation.split("_")),
+            ", ".join(f"${alias}: {input_type}!" for alias in aliases),
+            " ".join(f"{alias}: {mutation}(input: ${alias}) {selection}" for alias in aliases),
         )
-        self.graphql_client = Client(transport=self._transport, fetch_schema_from_transport=True)
+        response = self._send(operation, "POST", f"{self.base_url}/graphql", GRAPHQL, priority=priority, write=True,
+                              cost=len(inputs), json={"query": document, "variables": dict(zip(aliases, inputs))})
+        response.raise_for_status()
+        self.budget.record_cost(operation, GRAPHQL, len(inputs), units=len(inputs))
+        payload = response.json()
+        data = payload.get("data") or {}
+        results = [extract(data[alias]) if data.get(alias) else None for alias in aliases]
+        if payload.get("errors"):
+            raise BatchMutationError(operation, payload["errors"], results)
+        return results
+
+    def estimate(self, planned_calls: dict) -> dict:
+        """Predicted rate-limit cost per resource of {operation name: planned units} (see RateLimitBudget.estimate)."""
+        return self.budget.estimate(planned_calls, OPERATION_RESOURCES)
+
+    def fits_budget(self, planned_calls: dict) -> bool:
+        return self.budget.fits(planned_calls, OPERATION_RESOURCES)
+
+    # --- Operations ---
 
     def get_all_repos(self) -> list[str]:
+        return list(self.get_repo_ids())
+
+    @telemetry.traced("github.get_all_repos")
+    def get_repo_ids(self) -> dict:
+        """Maps the name of every repository of the user to its node id."""
         print("Retrieving repositories from GitHub...")
-        return [repo.name for repo in self.user.get_repos()]
+        repo_ids, url = {}, f"{self.base_url}/user/repos?per_page=100"
+        while url:
+            page, url = self._conditional_get("get_all_repos", url)
+            repo_ids.update((repo["name"], repo["node_id"]) for repo in page)
+        return repo_ids
 
+    @telemetry.traced("github.get_all_projects")
     def get_all_projects(self) -> list[dict]:
         print("Retrieving projects from GitHub...")
         query = gql("""
-            query GetUserProjects($login: String!) {
+            query GetUserProjects($login: String!, $cursor: String) {
                 user(login: $login) {
-                    projectsV2(first: 100) { nodes { id title } }
+                    projectsV2(first: 100, after: $cursor) {
+                        pageInfo { hasNextPage endCursor }
+                        nodes { id title }
+                    }
                 }
+                rateLimit { cost limit remaining resetAt }
             }
         """)
-        result = self.graphql_client.execute(query, variable_values={"login": self.user.login})
-        return result['user']['projectsV2']['nodes']
+        projects, cursor = [], None
+        while True:
+            result = self._graphql("get_all_projects", query, {"login": self.user.login, "cursor": cursor})
+            page = result['user']['projectsV2']
+            projects.extend(page['nodes'])
+            if not page['pageInfo']['hasNextPage']:
+                return projects
+            cursor = page['pageInfo']['endCursor']
 
+    @telemetry.traced("github.create_repo")
     def create_repo(self, name: str, description: str):
         print(f"Creating GitHub repository: {name}...")
-        return self.user.create_repo(name=name, description=description, private=False)
+        return self._rest("create_repo", lambda: self.user.create_repo(name=name, description=description, private=False))
 
+    @telemetry.traced("github.create_project")
     def create_project(self, title: str) -> str:
         print(f"Creating GitHub project: {title}...")
         mutation = gql("""
@@ -43,13 +242,16 @@ class GitHubClient:
                 }
             }
         """)
-        result = self.graphql_client.execute(mutation, variable_values={"ownerId": self.user.node_id, "title": title})
+        result = self._graphql("create_project", mutation, {"ownerId": self.user.node_id, "title": title}, write=True)
         return result['createProjectV2']['projectV2']['id']
-    
+
+    @telemetry.traced("github.create_issue")
     def create_issue(self, repo_name: str, title: str, body: str):
-        repo = self.user.get_repo(repo_name)
-        return repo.create_issue(title=title, body=body)
+        # A lazy repository skips the GET /repos lookup; only the POST is sent.
+        repo = self.rest_client.get_repo(f"{self.user.login}/{repo_name}", lazy=True)
+        return self._rest("create_issue", lambda: repo.create_issue(title=title, body=body))
 
+    @telemetry.traced("github.add_issue_to_project")
     def add_issue_to_project(self, project_id: str, issue_node_id: str):
         print(f"Adding issue to project {project_id}...")
         mutation = gql("""
@@ -59,6 +261,122 @@ class GitHubClient:
                 }
             }
         """)
-        self.graphql_client.execute(mutation, variable_values={"projectId": project_id, "contentId": issue_node_id})
+        self._graphql("add_issue_to_project", mutation, {"projectId": project_id, "contentId": issue_node_id}, write=True)
+
+    @telemetry.traced("github.get_project_items")
+    def get_project_items(self, project_id: str) -> list[dict]:
+        """Returns all items of a project; each item's `content` holds the issue id, title and body."""
+        print(f"Retrieving items for project {project_id}...")
+        query = gql("""
+            query GetProjectItems($projectId: ID!, $cursor: String) {
+                node(id: $projectId) {
+                    ... on ProjectV2 {
+                        items(first: 100, after: $cursor) {
+                            pageInfo { hasNextPage endCursor }
+                            nodes { id content { ... on Issue { id title body } } }
+                        }
+                    }
+                }
+                rateLimit { cost limit remaining resetAt }
+            }
+        """)
+        items, cursor = [], None
+        while True:
+            result = self._graphql("get_project_items", query, {"projectId": project_id, "cursor": cursor})
+            page = result['node']['items']
+            # Draft items and pull requests have no issue content; the sync only manages issues.
+            items.extend(item for item in page['nodes'] if item.get('content'))
+            if not page['pageInfo']['hasNextPage']:
+                return items
+            cursor = page['pageInfo']['endCursor']
+
+    @telemetry.traced("github.get_changed_project_items")
+    def get_changed_project_items(self, project_id: str, since: str = None) -> list[dict]:
+        """
+        Issue items of a board that changed after `since` (ISO 8601; every item when None): the issue
+        was edited, closed or reopened, or the item's Status field was set. GitHub cannot filter board
+        items by time, so the pages are read and filtered here. Each result has the issue `id`,
+        `title`, `state` with `state_updated_at` (the issue's last edit), the board `status` (None when
+        unset) with `status_updated_at`, and `updated_at`, the latest of those changes.
+        """
+        query = gql("""
+            query GetProjectItemChanges($projectId: ID!, $cursor: String) {
+                node(id: $projectId) {
+                    ... on ProjectV2 {
+                        items(first: 100, after: $cursor) {
+                            pageInfo { hasNextPage endCursor }
+                            nodes {
+                                updatedAt
+                                content { ... on Issue { id title state updatedAt } }
+                                fieldValueByName(name: "Status") {
+                                    ... on ProjectV2ItemFieldSingleSelectValue { name updatedAt }
+                                }
+                            }
+                        }
+                    }
+                }
+                rateLimit { cost limit remaining resetAt }
+            }
+        """)
+        changes, cursor = [], None
+        while True:
+            result = self._graphql("get_changed_project_items", query, {"projectId": project_id, "cursor": cursor})
+            page = result['node']['items']
+            for item in page['nodes']:
+                issue = item.get('content')
+                if not issue:
+                    continue
+                status = item.get('fieldValueByName') or {}
+                # ISO 8601 UTC timestamps compare correctly as strings.
+                updated_at = max(item['updatedAt'], issue['updatedAt'], status.get('updatedAt') or "")
+                if since is None or updated_at > since:
+                    changes.append({"id": issue['id'], "title": issue['title'], "state": issue['state'],
+                                    "state_updated_at": issue['updatedAt'], "status": status.get('name'),
+                                    "status_updated_at": status.get('updatedAt'), "updated_at": updated_at})
+            if not page['pageInfo']['hasNextPage']:
+                return changes
+            cursor = page['pageInfo']['endCursor']
+
+    @telemetry.traced("github.update_issue_body")
+    def update_issue_body(self, issue_id: str, body: str, priority: str = LOW):
+        """Content updates are low priority: they raise BudgetDeferred instead of spending the reserved budget."""
+        mutation = gql("""
+            mutation UpdateIssueBody($issueId: ID!, $body: String!) {
+                updateIssue(input: {id: $issueId, body: $body}) {
+                    issue { id }
+                }
+            }
+        """)
+        self._graphql("update_issue_body", mutation, {"issueId": issue_id, "body": body}, priority=priority, write=True)
+
+    # --- Batched mutations (used by the sync plan executor) ---
+
+    @telemetry.traced("github.create_projects")
+    def create_projects(self, titles: list[str]) -> list[str]:
+        print(f"Creating {len(titles)} GitHub project(s)...")
+        return self._graphql_batch("create_projects", "createProjectV2", "CreateProjectV2Input",
+                                   [{"ownerId": self.user.node_id, "title": title} for title in titles],
+                                   "{ projectV2 { id } }", lambda result: result['projectV2']['id'])
+
+    @telemetry.traced("github.create_issues")
+    def create_issues(self, issues: list[tuple]) -> list[str]:
+        """Creates issues from (repository node id, title, body) tuples and returns their node ids."""
+        print(f"Creating {len(issues)} GitHub issue(s)...")
+        return self._graphql_batch("create_issues", "createIssue", "CreateIssueInput",
+                                   [{"repositoryId": repo_id, "title": title, "body": body} for repo_id, title, body in issues],
+                                   "{ issue { id } }", lambda result: result['issue']['id'])
+
+    @telemetry.traced("github.add_issues_to_projects")
+    def add_issues_to_projects(self, pairs: list[tuple]) -> list[str]:
+        """Adds (project id, issue node id) pairs; items already on their board are returned as they are."""
+        print(f"Adding {len(pairs)} issue(s) to projects...")
+        return self._graphql_batch("add_issues_to_projects", "addProjectV2ItemById", "AddProjectV2ItemByIdInput",
+                                   [{"projectId": project_id, "contentId": issue_id} for project_id, issue_id in pairs],
+                                   "{ item { id } }", lambda result: result['item']['id'])
 
-    # ... (Add update logic here later) ...
\ No newline at end of file
+    @telemetry.traced("github.update_issue_bodies")
+    def update_issue_bodies(self, updates: list[tuple], priority: str = LOW) -> list[str]:
+        """Sets the body of (issue node id, body) pairs. Low priority, like update_issue_body."""
+        return self._graphql_batch("update_issue_bodies", "updateIssue", "UpdateIssueInput",
+                                   [{"id": issue_id, "body": body} for issue_id, body in updates],
+                                   "{ issue { id } }", lambda result: result['issue']['id'], priority=priority)
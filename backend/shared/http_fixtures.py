@@ -0,0 +1,295 @@
+"""
+Record-and-replay of NotionClient and GitHubClient HTTP traffic, for offline profiling.
+
+Both clients (requests, PyGithub and gql's requests transport) send through requests' HTTPAdapter.send,
+which is where the hook sits. Recording appends each exchange, secrets redacted, to a gzip-compressed
+JSON Lines fixture; replay serves the responses from it with their recorded latency (scaled, or none)
+and never touches the network. HTTP_FIXTURES_MODE=record|replay and HTTP_FIXTURES_PATH hook any
+process, e.g. a production sync run; see benchmarks.replay_profile for profiling from a fixture.
+Recording from the environment writes one file per process (the pid is added to the path), so the
+processes of a gunicorn server never write the same file.
+"""
+import os
+import re
+import json
+import gzip
+import time
+import base64
+import hashlib
+import threading
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+FIXTURE_VERSION = 1
+REDACTED = "[REDACTED]"
+# JSON keys and query parameters whose values are never written to a fixture.
+SECRET_NAME = re.compile(r"(token|secret|password|authorization|private_key|api_key|client_id|code_verifier)", re.IGNORECASE)
+# OAuth exchanges also carry the authorization `code`. It is only redacted there (query strings, form
+# bodies and requests to the token endpoint): elsewhere `code` is an error code fixtures must keep.
+OAUTH_SECRET_NAME = re.compile(rf"{SECRET_NAME.pattern}|^code$", re.IGNORECASE)
+OAUTH_TOKEN_PATH = "/oauth/access_token"
+# Response headers kept in fixtures; the clients read these (pagination, ETags, rate limits).
+KEPT_HEADERS = re.compile(r"^(content-type|etag|link|retry-after|x-ratelimit-.*|x-github-request-id)$", re.IGNORECASE)
+
+_original_send = HTTPAdapter.send
+_active = None  # the installed FixtureRecorder or FixtureReplayer
+_install_lock = threading.RLock()
+
+
+class FixtureMissError(requests.ConnectionError):
+    """Raised in replay for a request the fixture has no response for."""
+
+
+# --- Redaction and matching ---
+
+def _redact(value, names: re.Pattern = SECRET_NAME):
+    if isinstance(value, dict):
+        return {key: REDACTED if names.search(key) and isinstance(val, str) else _redact(val, names) for key, val in value.items()}
+    if isinstance(value, list):
+        return [_redact(item, names) for item in value]
+    return value
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = [(key, REDACTED if OAUTH_SECRET_NAME.search(key) else val) for key, val in parse_qsl(parts.query, keep_blank_values=True)]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _redact_body(body: bytes, content_type: str = "", oauth: bool = False) -> bytes:
+    """
+    Redacts secret-named keys of a JSON body, or of a form-encoded one (e.g. an OAuth token request
+    or response). `oauth` marks a request to the OAuth token endpoint, whose JSON `code` is redacted
+    too. Other bodies are kept as they are.
+    """
+    if not body:
+        return b""
+    try:
+        names = OAUTH_SECRET_NAME if oauth else SECRET_NAME
+        return json.dumps(_redact(json.loads(body), names), separators=(",", ":")).encode("utf-8")
+    except (ValueError, UnicodeDecodeError):
+        pass
+    if "x-www-form-urlencoded" not in (content_type or "").lower():
+        return body
+    try:
+        fields = parse_qsl(body.decode("utf-8"), keep_blank_values=True, strict_parsing=True)
+    except (ValueError, UnicodeDecodeError):
+        return body
+    return urlencode([(key, REDACTED if OAUTH_SECRET_NAME.search(key) else val) for key, val in fields]).encode("utf-8")
+
+
+def _request_body(request: requests.PreparedRequest) -> bytes:
+    body = request.body or b""
+    return body.encode("utf-8") if isinstance(body, str) else body
+
+
+def request_key(request: requests.PreparedRequest) -> tuple[str, str, str]:
+    """(method, redacted url, hash of the redacted body): how a replayed request finds its response."""
+    oauth = urlsplit(request.url).path.endswith(OAUTH_TOKEN_PATH)
+    body = _redact_body(_request_body(request), request.headers.get("Content-Type", ""), oauth)
+    body_hash = hashlib.sha1(body).hexdigest()[:16]
+    return request.method, redact_url(request.url), body_hash
+
+
+# --- Recording ---
+
+class FixtureRecorder:
+    """
+    Appends every exchange to a gzip JSON Lines file: a header line, then one line per response.
+    Only the process that opened the file writes to it; a child forked after that records nothing.
+    """
+    def __init__(self, path: str, context: dict = None):
+        self.path = path
+        self.count = 0
+        self._pid = os.getpid()
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, "wt", encoding="utf-8")
+        header = {"version": FIXTURE_VERSION, "recorded_at": datetime.utcnow().isoformat() + "Z", "context": context or {}}
+        self._file.write(json.dumps(header) + "\n")
+
+    def send(self, adapter: HTTPAdapter, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if os.getpid() != self._pid:
+            return _original_send(adapter, request, **kwargs)
+        started = time.monotonic()
+        response = _original_send(adapter, request, **kwargs)
+        content = response.content  # reads the body, so the entry holds the full response time
+        method, url, body_hash = request_key(request)
+        entry = {
+            "method": method,
+            "url": url,
+            "body_sha": body_hash,
+            "at_ms": round((started - self._started) * 1000, 1),
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": {name: value for name, value in response.headers.items() if KEPT_HEADERS.match(name)},
+        }
+        content_type = response.headers.get("Content-Type", "")
+        body = _redact_body(content, content_type) if "json" in content_type or "form-urlencoded" in content_type else content
+        try:
+            entry["text"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["base64"] = base64.b64encode(body).decode("ascii")
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            self.count += 1
+        return response
+
+    def close(self):
+        if os.getpid() != self._pid:
+            return  # the parent's file; closing it here would write a second gzip trailer into it
+        with self._lock:
+            self._file.close()
+
+
+# --- Replay ---
+
+def read_fixture(path: str) -> tuple[dict, list[dict]]:
+    """Returns (header, entries) of a fixture file."""
+    with gzip.open(path, "rt", encoding="utf-8") as fixture:
+        header = json.loads(fixture.readline())
+        if header.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"Unsupported fixture version {header.get('version')} in {path}")
+        return header, [json.loads(line) for line in fixture if line.strip()]
+
+
+class FixtureReplayer:
+    """
+    Serves recorded responses. Requests are matched on method, URL and body; repeats of a request get
+    the recorded responses in order, and the last one once those run out. A request whose body differs
+    from every recording (e.g. a timestamp in a filter) falls back to the responses for its method and URL.
+    """
+    def __init__(self, path: str, latency_scale: float = 1.0, strict: bool = True):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.header, self.entries = read_fixture(path)
+        self._exact = defaultdict(deque)
+        self._by_url = defaultdict(deque)
+        self._last = {}
+        self._served = set()
+        for entry in self.entries:
+            self._exact[(entry["method"], entry["url"], entry["body_sha"])].append(entry)
+            self._by_url[(entry["method"], entry["url"])].append(entry)
+        self._lock = threading.Lock()
+        self.stats = {"served": 0, "fallback": 0, "repeated": 0, "missed": 0}
+
+    def _take(self, key: tuple) -> dict:
+        method, url, _ = key
+        with self._lock:
+            for queue, stat in ((self._exact[key], None), (self._by_url[(method, url)], "fallback")):
+                # Every entry sits in both queues; skip the ones already served from the other.
+                while queue and id(queue[0]) in self._served:
+                    queue.popleft()
+                if queue:
+                    entry = queue.popleft()
+                    self._served.add(id(entry))
+                    self._last[key] = entry
+                    if stat:
+                        self.stats[stat] += 1
+                    self.stats["served"] += 1
+                    return entry
+            entry = self._last.get(key)
+            if entry is not None:
+                self.stats["repeated"] += 1
+                self.stats["served"] += 1
+                return entry
+            self.stats["missed"] += 1
+        raise FixtureMissError(f"No recorded response for {method} {url} in {self.path}")
+
+    def send(self, adapter: HTTPAdapter, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        try:
+            entry = self._take(request_key(request))
+        except FixtureMissError:
+            if self.strict:
+                raise
+            return _original_send(adapter, request, **kwargs)
+        if self.latency_scale:
+            time.sleep(entry["elapsed_ms"] / 1000 * self.latency_scale)
+        return _build_response(adapter, request, entry)
+
+
+def _build_response(adapter: HTTPAdapter, request: requests.PreparedRequest, entry: dict) -> requests.Response:
+    content = base64.b64decode(entry["base64"]) if "base64" in entry else entry.get("text", "").encode("utf-8")
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.reason = entry.get("reason")
+    response.headers = CaseInsensitiveDict({**entry["headers"], "Content-Length": str(len(content))})
+    response._content = content
+    response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+    response.url = request.url
+    response.request = request
+    response.connection = adapter
+    response.elapsed = timedelta(milliseconds=entry["elapsed_ms"])
+    return response
+
+
+# --- Installing the hook ---
+
+def _hooked_send(adapter, request, **kwargs):
+    hook = _active
+    if hook is None:
+        return _original_send(adapter, request, **kwargs)
+    return hook.send(adapter, request, **kwargs)
+
+
+def install(hook):
+    """Routes every requests call in the process through `hook` (a FixtureRecorder or FixtureReplayer)."""
+    global _active
+    with _install_lock:
+        _active = hook
+        HTTPAdapter.send = _hooked_send
+    return hook
+
+
+def uninstall():
+    """Removes the hook and closes a recorder's file."""
+    global _active
+    with _install_lock:
+        hook, _active = _active, None
+        HTTPAdapter.send = _original_send
+    if isinstance(hook, FixtureRecorder):
+        hook.close()
+    return hook
+
+
+def active():
+    return _active
+
+
+def process_path(path: str, pid: int = None) -> str:
+    """Adds a process id to a fixture path: http_fixture.jsonl.gz -> http_fixture-<pid>.jsonl.gz."""
+    directory, name = os.path.split(path)
+    stem, dot, extensions = name.partition(".")
+    return os.path.join(directory, f"{stem}-{pid or os.getpid()}{dot}{extensions}")
+
+
+def install_from_env():
+    """
+    Installs the hook described by HTTP_FIXTURES_MODE / HTTP_FIXTURES_PATH once per process.
+    Recordings go to HTTP_FIXTURES_PATH with the process id added (see process_path).
+    """
+    mode = os.getenv("HTTP_FIXTURES_MODE")
+    if not mode:
+        return None
+    path = os.getenv("HTTP_FIXTURES_PATH", "http_fixture.jsonl.gz")
+    with _install_lock:
+        if _active is not None:
+            return _active
+        if mode == "record":
+            import atexit
+
+            atexit.register(uninstall)
+            path = process_path(path)
+            print(f"Recording HTTP traffic to {path}.")
+            return install(FixtureRecorder(path))
+        if mode == "replay":
+            print(f"Replaying HTTP traffic from {path}.")
+            return install(FixtureReplayer(path, latency_scale=float(os.getenv("HTTP_FIXTURES_LATENCY_SCALE", "1"))))
+    raise ValueError(f"HTTP_FIXTURES_MODE must be 'record' or 'replay', not '{mode}'.")
@@ -0,0 +1,309 @@
+import os
+import time
+import threading
+from copy import deepcopy
+from dataclasses import dataclass, field, asdict
+from typing import Optional
+
+from . import telemetry
+from .tenants import DEFAULT_TENANT
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_LEASE_SECONDS = 300
+MAX_RETRY_DELAY_SECONDS = 300
+
+
+class LeaseLostError(Exception):
+    """Raised when a worker saves a job whose lease has expired and been taken by another worker."""
+
+
+@dataclass
+class SyncJob:
+    """
+    One project sync. `created` maps idempotency keys (e.g. "issue:<feature id>") to the GitHub
+    resources already created for them and is kept for the life of the job, so retries never create twice.
+    It is also the job's checkpoint: the worker saves it after every request of the sync plan that
+    created something, and a retry re-plans from it (steps that only update are re-diffed instead).
+    `available_at` is when the job can next be leased (None once it is done or failed for good).
+    """
+    id: str
+    payload: dict = field(default_factory=dict)
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = 5
+    created: dict = field(default_factory=dict)
+    lease_owner: Optional[str] = None
+    available_at: Optional[float] = 0.0
+    rerun: bool = False
+    last_error: str = ""
+    updated_at: float = 0.0
+
+
+def _available(job: Optional[SyncJob], now: float) -> bool:
+    return job is not None and job.available_at is not None and job.available_at <= now
+
+
+def _claim(job: SyncJob, owner: str, lease_seconds: float, now: float) -> SyncJob:
+    job.status, job.lease_owner = RUNNING, owner
+    job.attempts += 1
+    job.available_at = now + lease_seconds
+    job.updated_at = now
+    return job
+
+
+def _check_lease(stored: Optional[SyncJob], job: SyncJob):
+    if stored is None or stored.lease_owner != job.lease_owner or stored.status != RUNNING:
+        raise LeaseLostError(f"Job {job.id} is no longer leased by {job.lease_owner}.")
+
+
+def _retry_delay(attempts: int) -> float:
+    return min(MAX_RETRY_DELAY_SECONDS, 2 ** attempts)
+
+
+def _enqueue_update(job: SyncJob, payload: dict, now: float) -> SyncJob:
+    """Applies an enqueue to an existing job (shared by both stores)."""
+    job.payload = payload
+    if job.status == RUNNING:
+        # Something changed while the job was running; run it again once this attempt finishes.
+        job.rerun = True
+    elif job.status in (DONE, FAILED):
+        job.status, job.attempts, job.last_error = QUEUED, 0, ""
+        job.available_at = now
+    job.updated_at = now
+    return job
+
+
+def _finish(job: SyncJob, now: float) -> SyncJob:
+    job.lease_owner = None
+    job.updated_at = now
+    if job.rerun:
+        job.status, job.attempts, job.rerun = QUEUED, 0, False
+        job.available_at = now
+    else:
+        job.status, job.available_at = DONE, None
+    return job
+
+
+def _fail(job: SyncJob, error: str, now: float) -> SyncJob:
+    job.lease_owner = None
+    job.last_error = error
+    job.updated_at = now
+    if job.attempts >= job.max_attempts:
+        job.status, job.available_at = FAILED, None
+    else:
+        # Created resources are kept, so the next attempt reuses them instead of creating them again.
+        job.status, job.available_at = QUEUED, now + _retry_delay(job.attempts)
+    return job
+
+
+def _defer(job: SyncJob, reason: str, until: float, now: float) -> SyncJob:
+    """Puts a job back until `until` without spending one of its attempts (e.g. rate-limit budget exhausted)."""
+    job.lease_owner = None
+    job.last_error = reason
+    job.updated_at = now
+    job.status, job.available_at = QUEUED, until
+    job.attempts = max(0, job.attempts - 1)
+    return job
+
+
+class InMemoryJobStore:
+    """Process-local job store with the same semantics as FirestoreJobStore. Used for tests and local runs."""
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, job_id: str, payload: dict) -> SyncJob:
+        now = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = SyncJob(id=job_id, payload=payload, available_at=now, updated_at=now)
+            else:
+                _enqueue_update(job, payload, now)
+            return deepcopy(job)
+
+    def lease(self, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[SyncJob]:
+        """Claims the next available job: a queued one, or a running one whose lease has expired."""
+        now = time.time()
+        with self._lock:
+            available = [job for job in self._jobs.values() if _available(job, now)]
+            if not available:
+                return None
+            job = min(available, key=lambda j: j.available_at)
+            return deepcopy(_claim(job, owner, lease_seconds, now))
+
+    def lease_job(self, job_id: str, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[SyncJob]:
+        """Claims the given job if it is available (see lease); returns None if it is not."""
+        now = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return deepcopy(_claim(job, owner, lease_seconds, now)) if _available(job, now) else None
+
+    def save(self, job: SyncJob, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        """Persists created resources and renews the lease."""
+        now = time.time()
+        with self._lock:
+            stored = self._jobs.get(job.id)
+            _check_lease(stored, job)
+            stored.created = deepcopy(job.created)
+            stored.available_at = job.available_at = now + lease_seconds
+            stored.updated_at = now
+
+    def complete(self, job: SyncJob):
+        with self._lock:
+            stored = self._jobs.get(job.id)
+            _check_lease(stored, job)
+            stored.created = deepcopy(job.created)
+            _finish(stored, time.time())
+
+    def fail(self, job: SyncJob, error: str):
+        with self._lock:
+            stored = self._jobs.get(job.id)
+            _check_lease(stored, job)
+            stored.created = deepcopy(job.created)
+            _fail(stored, error, time.time())
+
+    def defer(self, job: SyncJob, reason: str, until: float):
+        with self._lock:
+            stored = self._jobs.get(job.id)
+            _check_lease(stored, job)
+            stored.created = deepcopy(job.created)
+            _defer(stored, reason, until, time.time())
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return deepcopy(job) if job else None
+
+    def list_jobs(self, status: str = None) -> list[SyncJob]:
+        with self._lock:
+            return [deepcopy(job) for job in self._jobs.values() if status is None or job.status == status]
+
+
+class FirestoreJobStore:
+    """
+    Job store backed by a Firestore collection, one document per job. Leasing and every state change
+    run in transactions, so several worker instances can drain the queue at once. Jobs are found with
+    a single-field range query on `available_at`, which needs no composite index.
+    """
+    def __init__(self, db=None, collection: str = "sync_jobs"):
+        from google.cloud import firestore
+
+        self._firestore = firestore
+        self.db = db or firestore.Client()
+        self.collection = self.db.collection(collection)
+
+    def _read(self, snapshot) -> SyncJob:
+        return SyncJob(**snapshot.to_dict())
+
+    def _transaction(self, job_id: str, update):
+        """Runs `update(current job or None) -> job to store` in a transaction and returns the stored job."""
+        ref = self.collection.document(job_id)
+
+        @self._firestore.transactional
+        def apply(transaction):
+            snapshot = ref.get(transaction=transaction)
+            job = update(self._read(snapshot) if snapshot.exists else None)
+            if job is not None:
+                transaction.set(ref, asdict(job))
+            return job
+
+        return apply(self.db.transaction())
+
+    @telemetry.traced("firestore.sync_jobs.enqueue", telemetry.CLIENT)
+    def enqueue(self, job_id: str, payload: dict) -> SyncJob:
+        now = time.time()
+        return self._transaction(job_id, lambda job: (
+            SyncJob(id=job_id, payload=payload, available_at=now, updated_at=now) if job is None
+            else _enqueue_update(job, payload, now)
+        ))
+
+    @telemetry.traced("firestore.sync_jobs.lease", telemetry.CLIENT)
+    def lease(self, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[SyncJob]:
+        now = time.time()
+        candidates = (
+            self.collection.where("available_at", "<=", now)
+            .order_by("available_at")
+            .limit(10)
+            .stream()
+        )
+
+        def claim(job):
+            # Another worker may have claimed it between the query and this transaction.
+            return _claim(job, owner, lease_seconds, now) if _available(job, now) else None
+
+        for snapshot in candidates:
+            job = self._transaction(snapshot.id, claim)
+            if job is not None:
+                return job
+        return None
+
+    @telemetry.traced("firestore.sync_jobs.lease_job", telemetry.CLIENT)
+    def lease_job(self, job_id: str, owner: str, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> Optional[SyncJob]:
+        now = time.time()
+        return self._transaction(job_id, lambda job: _claim(job, owner, lease_seconds, now) if _available(job, now) else None)
+
+    @telemetry.traced("firestore.sync_jobs.save", telemetry.CLIENT)
+    def save(self, job: SyncJob, lease_seconds: float = DEFAULT_LEASE_SECONDS):
+        now = time.time()
+
+        def renew(stored):
+            _check_lease(stored, job)
+            stored.created = job.created
+            stored.available_at = now + lease_seconds
+            stored.updated_at = now
+            return stored
+
+        job.available_at = self._transaction(job.id, renew).available_at
+
+    @telemetry.traced("firestore.sync_jobs.complete", telemetry.CLIENT)
+    def complete(self, job: SyncJob):
+        def finish(stored):
+            _check_lease(stored, job)
+            stored.created = job.created
+            return _finish(stored, time.time())
+        self._transaction(job.id, finish)
+
+    @telemetry.traced("firestore.sync_jobs.fail", telemetry.CLIENT)
+    def fail(self, job: SyncJob, error: str):
+        def fail(stored):
+            _check_lease(stored, job)
+            stored.created = job.created
+            return _fail(stored, error, time.time())
+        self._transaction(job.id, fail)
+
+    @telemetry.traced("firestore.sync_jobs.defer", telemetry.CLIENT)
+    def defer(self, job: SyncJob, reason: str, until: float):
+        def defer(stored):
+            _check_lease(stored, job)
+            stored.created = job.created
+            return _defer(stored, reason, until, time.time())
+        self._transaction(job.id, defer)
+
+    def get(self, job_id: str) -> Optional[SyncJob]:
+        snapshot = self.collection.document(job_id).get()
+        return self._read(snapshot) if snapshot.exists else None
+
+    def list_jobs(self, status: str = None) -> list[SyncJob]:
+        query = self.collection.where("status", "==", status) if status else self.collection
+        return [self._read(snapshot) for snapshot in query.stream()]
+
+
+_memory_stores = {}
+
+def get_job_store(tenant_id: str = None):
+    """
+    SYNC_JOB_STORE=memory keeps jobs in this process; anything else (the default) uses Firestore.
+    Each tenant has its own queue (the `sync_jobs_<tenant>` collection), so a worker draining one
+    tenant never leases another tenant's jobs and a large backlog only delays its own tenant.
+    """
+    collection = f"sync_jobs_{tenant_id}" if tenant_id and tenant_id != DEFAULT_TENANT else "sync_jobs"
+    if os.getenv("SYNC_JOB_STORE", "firestore") == "memory":
+        if collection not in _memory_stores:
+            _memory_stores[collection] = InMemoryJobStore()
+        return _memory_stores[collection]
+    return FirestoreJobStore(collection=collection)
@@ -0,0 +1,133 @@
+import os
+import hashlib
+import threading
+
+from . import telemetry
+from .sync_plan import project_name, repo_name
+
+
+def github_names(project_page: dict) -> list[str]:
+    """The GitHub names a project syncs to: its repository and its project board."""
+    title = project_name(project_page)
+    return [f"repo:{repo_name(title)}", f"board:{title}"]
+
+
+class InMemoryNameClaims:
+    """Process-local name registry with the same semantics as FirestoreNameClaims. Used for tests and local runs."""
+    def __init__(self):
+        self._owners = {}
+        self._lock = threading.Lock()
+
+    def claim(self, tenant_id: str, names: list[str]) -> dict:
+        """
+        Claims `names` for a tenant, all or none: returns {name: owner} for the ones another tenant
+        already owns (nothing is claimed then), or {} once the tenant owns every name.
+        """
+        with self._lock:
+            taken = {name: self._owners[name] for name in names if self._owners.get(name, tenant_id) != tenant_id}
+            if not taken:
+                self._owners.update((name, tenant_id) for name in names)
+            return taken
+
+    def owners(self, names: list[str]) -> dict:
+        """{name: owning tenant} for the names that are claimed. Claims nothing."""
+        with self._lock:
+            return {name: self._owners[name] for name in names if name in self._owners}
+
+
+class FirestoreNameClaims:
+    """
+    Name registry backed by the `github_names` collection, one document per name (keyed by its hash,
+    as names may contain '/'). Claims never change hands, so names a tenant owns are remembered in
+    this process and only new names cost a transaction.
+    """
+    def __init__(self, db=None, collection: str = "github_names"):
+        from google.cloud import firestore
+
+        self._firestore = firestore
+        self.db = db or firestore.Client()
+        self.collection = self.db.collection(collection)
+        self._owned = set()  # (tenant id, name)
+        self._lock = threading.Lock()
+
+    @telemetry.traced("firestore.github_names.claim", telemetry.CLIENT)
+    def claim(self, tenant_id: str, names: list[str]) -> dict:
+        with self._lock:
+            new = [name for name in names if (tenant_id, name) not in self._owned]
+        if not new:
+            return {}
+        refs = {name: self.collection.document(hashlib.sha1(name.encode("utf-8")).hexdigest()) for name in new}
+
+        @self._firestore.transactional
+        def apply(transaction):
+            owners = {}
+            for name, ref in refs.items():
+                snapshot = ref.get(transaction=transaction)
+                owners[name] = snapshot.to_dict().get("tenant") if snapshot.exists else None
+            taken = {name: owner for name, owner in owners.items() if owner not in (None, tenant_id)}
+            if not taken:
+                for name, owner in owners.items():
+                    if owner is None:
+                        transaction.set(refs[name], {"name": name, "tenant": tenant_id})
+            return taken
+
+        taken = apply(self.db.transaction())
+        if not taken:
+            with self._lock:
+                self._owned.update((tenant_id, name) for name in new)
+        return taken
+
+    @telemetry.traced("firestore.github_names.owners", telemetry.CLIENT)
+    def owners(self, names: list[str]) -> dict:
+        with self._lock:
+            found = {name: tenant_id for tenant_id, name in self._owned if name in names}
+        refs = [self.collection.document(hashlib.sha1(name.encode("utf-8")).hexdigest()) for name in names if name not in found]
+        for snapshot in self.db.get_all(refs) if refs else ():
+            if snapshot.exists:
+                claim = snapshot.to_dict()
+                found[claim["name"]] = claim["tenant"]
+                with self._lock:
+                    self._owned.add((claim["tenant"], claim["name"]))
+        return found
+
+
+class NameGuard:
+    """
+    Tenants that share one GitHub account would otherwise write into each other's repositories and
+    boards whenever two projects map to the same name. The first tenant to sync a name owns it; a
+    project of another tenant with that name is refused until it is renamed.
+    """
+    def __init__(self, tenant_id: str, claims=None):
+        self.tenant_id = tenant_id
+        self.claims = claims or get_name_claims()
+
+    def conflicts(self, project_pages: list[dict]) -> dict:
+        """Project page id -> why it is refused, for the pages whose names another tenant owns."""
+        refused = {}
+        for project_page in project_pages:
+            taken = self.claims.claim(self.tenant_id, github_names(project_page))
+            if taken:
+                refused[project_page['id']] = "GitHub name(s) owned by another tenant: " + ", ".join(
+                    f"{name} ({owner})" for name, owner in sorted(taken.items()))
+        return refused
+
+    def owns(self, project_page: dict) -> bool:
+        """Whether the tenant already owns every GitHub name of the project. Unlike conflicts, claims nothing."""
+        names = github_names(project_page)
+        owners = self.claims.owners(names)
+        return all(owners.get(name) == self.tenant_id for name in names)
+
+
+_memory_claims = None
+_firestore_claims = None
+_claims_lock = threading.Lock()
+
+def get_name_claims():
+    """Like get_job_store: SYNC_JOB_STORE=memory keeps claims in this process; otherwise Firestore. One per process."""
+    global _memory_claims, _firestore_claims
+    with _claims_lock:
+        if os.getenv("SYNC_JOB_STORE", "firestore") == "memory":
+            _memory_claims = _memory_claims or InMemoryNameClaims()
+            return _memory_claims
+        _firestore_claims = _firestore_claims or FirestoreNameClaims()
+        return _firestore_claims
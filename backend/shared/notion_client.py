@@ -1,34 +1,125 @@
+import os
+import time
+import threading
+import contextvars
+from types import SimpleNamespace
 import requests
-from .data_models import DashboardData, Customer, Project, Task, Stakeholder, SyncLog, Feature, QualityCharacteristic
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from .data_models import DashboardData, DashboardAggregates, Customer, Project, Task, Stakeholder, SyncLog, Feature, QualityCharacteristic
+from .aggregates import DashboardAggregator
 from shared.secrets import get_secret
+from shared import telemetry
+from shared import http_fixtures
+
+def mock_sync_logs() -> list[SyncLog]:
+    """Placeholder sync history shown on the dashboard until real sync logs are stored."""
+    return [
+        SyncLog(id="1", timestamp="2025-06-25 09:00:00", message="Created GitHub repository for project Synapse", status="success"),
+        SyncLog(id="2", timestamp="2025-06-25 09:05:00", message="Updated Notion task: Define Business Model", status="success"),
+        SyncLog(id="3", timestamp="2025-06-25 09:10:00", message="Synced status: Success", status="success"),
+        SyncLog(id="4", timestamp="2025-06-25 09:15:00", message="Error: Could not update GitHub Project", status="error"),
+    ]
+
+# Notion answers bursts with 429 + Retry-After; we wait and retry this many times before giving up.
+MAX_RATE_LIMIT_RETRIES = 5
+# Notion allows an average of three requests per second per integration; page writes are paced to it.
+DEFAULT_WRITE_RATE = 3.0
+DEFAULT_WRITE_WORKERS = 4
+# Keep-alive connections kept per thread's session; one host, so a small pool is enough.
+SESSION_POOL_SIZE = 4
+
+class _RequestPacer:
+    """Spaces calls from any number of threads at least 1/rate seconds apart."""
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
 
 class NotionClient:
-    def __init__(self, api_key: str, projects_db_id: str):
+    def __init__(self, api_key: str, projects_db_id: str, base_url: str = None, database_ids: dict = None):
         self.api_key = api_key
         self.projects_db_id = projects_db_id
-        self.base_url = "https://api.notion.com/v1"
+        # Dashboard database ids by secret name (CRM_DB_ID, ...); missing ones are read from secrets.
+        self.database_ids = database_ids or {}
+        # HTTP_FIXTURES_MODE records or replays this process's API traffic (profiling only).
+        http_fixtures.install_from_env()
+        # NOTION_API_URL lets benchmarks and local runs point the client at a stand-in server.
+        self.base_url = base_url or os.getenv("NOTION_API_URL", "https://api.notion.com/v1")
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "Notion-Version": "2022-06-28"
         }
+        # requests.Session is not documented as thread-safe, so each thread (API worker threads,
+        # update_pages' pool) gets its own session and reuses its connections across calls.
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SESSION_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        return session
+
+    def _request(self, method: str, url: str, operation: str, **kwargs) -> requests.Response:
+        """
+        Sends a request, waiting out 429 rate-limit responses as instructed by Retry-After.
+        Each call is traced as a `notion.<operation>` client span.
+        """
+        with telemetry.span(f"notion.{operation}", telemetry.CLIENT, method=method) as span:
+            for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+                response = self._session().request(method, url, **kwargs)
+                span.set_attribute("http.status_code", response.status_code)
+                span.set_attribute("retries", attempt)
+                if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                    return response
+                wait_seconds = float(response.headers.get("Retry-After", 1))
+                print(f"Notion rate limit hit. Retrying in {wait_seconds}s...")
+                time.sleep(wait_seconds)
 
     def _query_database(self, db_id: str, filter_payload: dict = None) -> dict:
         """Helper to query a database."""
         url = f"{self.base_url}/databases/{db_id}/query"
         request_body = {"filter": filter_payload} if filter_payload else {}
-        response = requests.post(url, headers=self.headers, json=request_body if filter_payload else {})
+        response = self._request("POST", url, "databases.query", json=request_body)
         response.raise_for_status()
         return response.json()
+
+    def iter_database_rows(self, db_id: str, filter_payload: dict = None, page_size: int = 100):
+        """Yields every row of a database one page at a time, following Notion's pagination cursor."""
+        url = f"{self.base_url}/databases/{db_id}/query"
+        request_body = {"page_size": page_size}
+        if filter_payload:
+            request_body["filter"] = filter_payload
+        while True:
+            response = self._request("POST", url, "databases.query", json=request_body)
+            response.raise_for_status()
+            payload = response.json()
+            yield from payload.get("results", [])
+            if not payload.get("has_more"):
+                break
+            request_body["start_cursor"] = payload.get("next_cursor")
     
     def _get_page(self, page_id: str):
-        response = requests.get(f"{self.base_url}/pages/{page_id}", headers=self.headers)
+        response = self._request("GET", f"{self.base_url}/pages/{page_id}", "pages.retrieve")
         response.raise_for_status()
         return response.json()
 
     def _get_page_content_as_markdown(self, page_id: str) -> str:
         url = f"{self.base_url}/blocks/{page_id}/children"
-        response = requests.get(url, headers=self.headers)
+        response = self._request("GET", url, "blocks.children")
         blocks = response.json().get("results", [])
         markdown_lines = []
         for block in blocks:
@@ -46,25 +137,68 @@ class NotionClient:
         print("Retrieving active projects from Notion...")
         db_id = "YOUR_PROJECTS_DB_ID" # Replace with your actual DB ID from .env
         filter_payload = {"property": "Project Status", "select": {"equals": "Active"}}
-        return self._query_database(self.projects_db_id, filter_payload).get("results", [])
+        return list(self.iter_database_rows(self.projects_db_id, filter_payload))
+
+    def iter_characteristic_pages(self, project_props: dict):
+        """Yields (quality characteristic page, [its feature pages]) for a project's properties, in relation order."""
+        for qc_ref in project_props.get("Quality Characteristic", {}).get("relation", []):
+            qc_page = self._get_page(qc_ref['id'])
+            feature_refs = qc_page.get("properties", {}).get("Features", {}).get("relation", [])
+            yield qc_page, [self._get_page(feature_ref['id']) for feature_ref in feature_refs]
+
+    @telemetry.traced("notion.get_features_for_project")
+    def get_feature_pages_for_project(self, project_page: dict) -> list[dict]:
+        """Raw feature pages linked to a project through its quality characteristics, in any status."""
+        return [page for _, feature_pages in self.iter_characteristic_pages(project_page['properties']) for page in feature_pages]
+
+    def parse_feature(self, feature_page: dict) -> Feature:
+        """Builds a Feature from its page; the page content is only fetched for active features."""
+        props = feature_page['properties']
+        status = (props['Feature Status'].get('select') or {}).get('name', '')
+        content = self._get_page_content_as_markdown(feature_page['id']) if status == 'Active' else ""
+        return Feature(id=feature_page['id'], name=props['Feature']['title'][0]['plain_text'], status=status, content=content)
 
     def get_features_for_project(self, project_page: dict) -> list[Feature]:
         print(f"Retrieving features for project: {project_page['properties']['Project Name']['title'][0]['plain_text']}...")
-        features = []
-        qc_relations = project_page['properties']['Quality Characteristic'].get('relation', [])
-        
-        for qc_ref in qc_relations:
-            qc_page = self._get_page(qc_ref['id'])
-            feature_relations = qc_page['properties']['Features'].get('relation', [])
-            for feature_ref in feature_relations:
-                feature_page = self._get_page(feature_ref['id'])
-                if feature_page['properties']['Feature Status']['select']['name'] == 'Active':
-                    title = feature_page['properties']['Feature']['title'][0]['plain_text']
-                    content = self._get_page_content_as_markdown(feature_page['id'])
-                    features.append(Feature(id=feature_page['id'], name=title, status='Active', content=content))
+        features = [feature for feature in map(self.parse_feature, self.get_feature_pages_for_project(project_page))
+                    if feature.status == 'Active']
         print(f"Found {len(features)} active features.")
         return features
+
+    def update_page(self, page_id: str, properties: dict) -> dict:
+        """PATCHes page properties and returns the updated page."""
+        response = self._request("PATCH", f"{self.base_url}/pages/{page_id}", "pages.update", json={"properties": properties})
+        response.raise_for_status()
+        return response.json()
+
+    def update_pages(self, updates: dict, max_workers: int = DEFAULT_WRITE_WORKERS, rate: float = DEFAULT_WRITE_RATE) -> dict:
+        """
+        Applies {page id: properties} with up to `max_workers` requests in flight, started no faster
+        than `rate` per second (0 disables pacing; Notion has no batch endpoint). 429s are retried by _request.
+        Returns {"updated": [page ids], "failed": {page id: error}}.
+        """
+        pacer = _RequestPacer(rate)
+
+        def update(page_id, properties):
+            pacer.wait()
+            return self.update_page(page_id, properties)
+
+        results = {"updated": [], "failed": {}}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            # Each task runs in a copy of this context, so its calls count towards the current run.
+            futures = {
+                page_id: pool.submit(contextvars.copy_context().run, update, page_id, properties)
+                for page_id, properties in updates.items()
+            }
+            for page_id, future in futures.items():
+                try:
+                    future.result()
+                    results["updated"].append(page_id)
+                except Exception as e:
+                    results["failed"][page_id] = str(e)
+        return results
     
+    @telemetry.traced("notion.relation_lookup")
     def get_relation_names(self, relation_list, property_name="Next Steps"):
         """
         Given a Notion relation list, fetch and return the plain text(s) of the given property from the related page(s).
@@ -136,123 +270,153 @@ class NotionClient:
         else:
             return str(value) if value else ""
         
+    @telemetry.traced("notion.quality_characteristics")
     def get_quality_characteristics_for_project(self, project_props):
         """
         Given a project's properties, fetch related Quality Characteristics and their features.
         Returns a list of QualityCharacteristic objects (with feature names).
         """
-        characteristics = []
-        qc_relations = project_props.get("Quality Characteristic", {}).get("relation", [])
-        for qc_ref in qc_relations:
-            qc_page = self._get_page(qc_ref['id'])
-            qc_props = qc_page.get("properties", {})
-            qc_name = ""
-            if "Name" in qc_props and "title" in qc_props["Name"]:
-                qc_name = "".join([t.get("plain_text", "") for t in qc_props["Name"]["title"]])
-            user_story = ""
-            if "User Story" in qc_props and "rich_text" in qc_props["User Story"]:
-                user_story = "".join([t.get("plain_text", "") for t in qc_props["User Story"]["rich_text"]])
-            features = []
-            feature_ids = []
-            feature_relations = qc_props.get("Features", {}).get("relation", [])
-            for feature_ref in feature_relations:
-                feature_page = self._get_page(feature_ref['id'])
-                feature_props = feature_page.get("properties", {})
-                feature_name = ""
-                if "Feature" in feature_props and "title" in feature_props["Feature"]:
-                    feature_name = "".join([t.get("plain_text", "") for t in feature_props["Feature"]["title"]])
-                if feature_name:
-                    features.append(feature_name)
-                    feature_ids.append(feature_ref['id'])
-            characteristics.append(QualityCharacteristic(
-                id=qc_ref['id'],
-                name=qc_name,
-                user_story=user_story,
-                feature_ids=feature_ids,
-                feature_names=features,
-            ))
-        return characteristics
+        return [self.parse_quality_characteristic(qc_page, feature_pages)
+                for qc_page, feature_pages in self.iter_characteristic_pages(project_props)]
+
+    def parse_quality_characteristic(self, qc_page: dict, feature_pages: list[dict]) -> QualityCharacteristic:
+        """Builds a QualityCharacteristic from its page and its feature pages; features without a name are left out."""
+        qc_props = qc_page.get("properties", {})
+        qc_name = ""
+        if "Name" in qc_props and "title" in qc_props["Name"]:
+            qc_name = "".join([t.get("plain_text", "") for t in qc_props["Name"]["title"]])
+        user_story = ""
+        if "User Story" in qc_props and "rich_text" in qc_props["User Story"]:
+            user_story = "".join([t.get("plain_text", "") for t in qc_props["User Story"]["rich_text"]])
+        features = []
+        feature_ids = []
+        for feature_page in feature_pages:
+            feature_props = feature_page.get("properties", {})
+            feature_name = ""
+            if "Feature" in feature_props and "title" in feature_props["Feature"]:
+                feature_name = "".join([t.get("plain_text", "") for t in feature_props["Feature"]["title"]])
+            if feature_name:
+                features.append(feature_name)
+                feature_ids.append(feature_page['id'])
+        return QualityCharacteristic(
+            id=qc_page['id'],
+            name=qc_name,
+            user_story=user_story,
+            feature_ids=feature_ids,
+            feature_names=features,
+        )
+
+    def _parse_customer(self, row: dict, idx: int = 0) -> Customer:
+        props = row["properties"]
+        return Customer(
+            id=row.get("id", str(idx)),
+            company_name=self.extract_notion_property_value(props.get("Company Name")),
+            crm_phase=self.extract_notion_property_value(props.get("CRM Phase")),
+            initial_project_idea=self.extract_notion_property_value(props.get("Initial Project Idea")),
+            status=self.extract_notion_property_value(props.get("Status")),
+            next_step_summary=self.extract_notion_property_value(props.get("Meeting Next Steps")),
+        )
+
+    def _parse_project(self, row: dict, idx: int = 0) -> Project:
+        props = row["properties"]
+        return Project(
+            id=row.get("id", str(idx)),
+            project_name=self.extract_notion_property_value(props.get("Project Name")),
+            description=self.extract_notion_property_value(props.get("Description")),
+            status=self.extract_notion_property_value(props.get("Project Status")),
+            stage=self.extract_notion_property_value(props.get("Stage")),
+            manager=self.extract_notion_property_value(props.get("Project Manager")),
+            customer=self.extract_notion_property_value(props.get("Customer")),
+            process_step=self.extract_notion_property_value(props.get("Process Step")),
+            characteristics=self.get_quality_characteristics_for_project(props),
+        )
+
+    def _parse_task(self, row: dict, idx: int = 0) -> Task:
+        props = row["properties"]
+        return Task(
+            id=row.get("id", str(idx)),
+            title=self.extract_notion_property_value(props.get("Title")),
+            type=self.extract_notion_property_value(props.get("Task Type")),
+            status=self.extract_notion_property_value(props.get("Status")),
+            entity_name=self.extract_notion_property_value(props.get("Project")),
+            responsible_name=self.extract_notion_property_value(props.get("Responsible")),
+            important=self.extract_notion_property_value(props.get("Importance")),
+            priority=self.extract_notion_property_value(props.get("Priority")),
+            planned_end_date=self.extract_notion_property_value(props.get("Planned_End")),
+        )
 
+    def _parse_stakeholder(self, row: dict, idx: int = 0) -> Stakeholder:
+        props = row["properties"]
+        return Stakeholder(
+            id=row.get("id", str(idx)),
+            stakeholder_name=self.extract_notion_property_value(props.get("Stakeholder Name")),
+            stakeholder_phase=self.extract_notion_property_value(props.get("Stakeholder Phase")),
+            purpose=self.extract_notion_property_value(props.get("Purpose")),
+            next_step_summary=self.extract_notion_property_value(props.get("Next Steps")),
+            status=self.extract_notion_property_value(props.get("Status")),
+        )
+
+    # Dashboard section -> (secret holding the database id, row parser)
+    _DASHBOARD_SECTIONS = {
+        "customers": ("CRM_DB_ID", _parse_customer),
+        "projects": ("PROJECTS_DB_ID", _parse_project),
+        "tasks": ("TASKS_DB_ID", _parse_task),
+        "stakeholders": ("STAKEHOLDER_DB_ID", _parse_stakeholder),
+    }
+
+    # Dashboard section -> {row attribute the summary counts: Notion property}. None of them is a relation,
+    # so a summary reads only the database queries: no related pages, quality characteristics or features.
+    _SUMMARY_PROPERTIES = {
+        "customers": {"crm_phase": "CRM Phase"},
+        "projects": {"status": "Project Status", "stage": "Stage"},
+        "tasks": {"status": "Status", "responsible_name": "Responsible", "planned_end_date": "Planned_End"},
+        "stakeholders": {"stakeholder_phase": "Stakeholder Phase"},
+    }
+
+    def _dashboard_db_id(self, section: str) -> str:
+        secret_id = self._DASHBOARD_SECTIONS[section][0]
+        return self.database_ids.get(secret_id) or get_secret(secret_id)
+
+    def iter_dashboard_pages(self, section: str, filter_payload: dict = None, page_size: int = 100):
+        """Like iter_dashboard_rows, but yields (raw_page, parsed_row) pairs and accepts a query filter."""
+        parser = self._DASHBOARD_SECTIONS[section][1]
+        for idx, row in enumerate(self.iter_database_rows(self._dashboard_db_id(section), filter_payload, page_size)):
+            yield row, parser(self, row, idx)
+
+    def iter_dashboard_rows(self, section: str, page_size: int = 100):
+        """
+        Lazily yields parsed rows (Customer, Project, Task or Stakeholder) for one dashboard section.
+        Only one page of raw Notion results is held in memory at a time.
+        """
+        for _, parsed in self.iter_dashboard_pages(section, page_size=page_size):
+            yield parsed
+
+    @telemetry.traced("notion.get_all_dashboard_data")
     def get_all_dashboard_data(self) -> DashboardData:
-        """Fetches all data needed for the dashboard and transforms it."""
-
-        # Fetch from Notion
-        customer_data = self._query_database(get_secret("CRM_DB_ID"))
-        project_data = self._query_database(get_secret("PROJECTS_DB_ID"))
-        task_data = self._query_database(get_secret("TASKS_DB_ID"))
-        stakeholder_data = self._query_database(get_secret("STAKEHOLDER_DB_ID"))
-
-        # Customers
-        customers = []
-        for idx, row in enumerate(customer_data.get("results", [])):
-            props = row["properties"]
-            customers.append(Customer(
-                id=row.get("id", str(idx)),
-                company_name=self.extract_notion_property_value(props.get("Company Name")),
-                crm_phase=self.extract_notion_property_value(props.get("CRM Phase")),
-                initial_project_idea=self.extract_notion_property_value(props.get("Initial Project Idea")),
-                status=self.extract_notion_property_value(props.get("Status")),
-                next_step_summary=self.extract_notion_property_value(props.get("Meeting Next Steps")),
-            ))
-
-        # Projects
-        projects = []
-        for idx, row in enumerate(project_data.get("results", [])):
-            props = row["properties"]
-            projects.append(Project(
-                id=row.get("id", str(idx)),
-                project_name=self.extract_notion_property_value(props.get("Project Name")),
-                description=self.extract_notion_property_value(props.get("Description")),
-                status=self.extract_notion_property_value(props.get("Project Status")),
-                stage=self.extract_notion_property_value(props.get("Stage")),
-                manager=self.extract_notion_property_value(props.get("Project Manager")),
-                customer=self.extract_notion_property_value(props.get("Customer")),
-                process_step=self.extract_notion_property_value(props.get("Process Step")),
-                characteristics=self.get_quality_characteristics_for_project(props),
-            ))
-
-        # Tasks
-        tasks = []
-        for idx, row in enumerate(task_data.get("results", [])):
-            props = row["properties"]
-            # for key, prop in props.items():
-                # print(key, prop)
-            tasks.append(Task(
-                id=row.get("id", str(idx)),
-                title=self.extract_notion_property_value(props.get("Title")),
-                type=self.extract_notion_property_value(props.get("Task Type")),
-                status=self.extract_notion_property_value(props.get("Status")),
-                entity_name=self.extract_notion_property_value(props.get("Project")),
-                responsible_name=self.extract_notion_property_value(props.get("Responsible")),
-                important=self.extract_notion_property_value(props.get("Importance")),
-                priority=self.extract_notion_property_value(props.get("Priority")),
-                planned_end_date=self.extract_notion_property_value(props.get("Planned_End")),
-            ))
-
-        # Stakeholders
-        stakeholders = []
-        for idx, row in enumerate(stakeholder_data.get("results", [])):
-            props = row["properties"]
-            stakeholders.append(Stakeholder(
-                id=row.get("id", str(idx)),
-                stakeholder_name=self.extract_notion_property_value(props.get("Stakeholder Name")),
-                stakeholder_phase=self.extract_notion_property_value(props.get("Stakeholder Phase")),
-                purpose=self.extract_notion_property_value(props.get("Purpose")),
-                next_step_summary=self.extract_notion_property_value(props.get("Next Steps")),
-                status=self.extract_notion_property_value(props.get("Status")),
-            ))
-        
-        mock_sync_logs = [
-            SyncLog(id="1", timestamp="2025-06-25 09:00:00", message="Created GitHub repository for project Synapse", status="success"),
-            SyncLog(id="2", timestamp="2025-06-25 09:05:00", message="Updated Notion task: Define Business Model", status="success"),
-            SyncLog(id="3", timestamp="2025-06-25 09:10:00", message="Synced status: Success", status="success"),
-            SyncLog(id="4", timestamp="2025-06-25 09:15:00", message="Error: Could not update GitHub Project", status="error"),
-        ]
+        """Fetches all data needed for the dashboard and transforms it. Aggregates are counted as rows arrive."""
+        aggregator = DashboardAggregator()
+        customers = list(aggregator.tap("customers", self.iter_dashboard_rows("customers")))
+        projects = list(aggregator.tap("projects", self.iter_dashboard_rows("projects")))
+        tasks = list(aggregator.tap("tasks", self.iter_dashboard_rows("tasks")))
+        stakeholders = list(aggregator.tap("stakeholders", self.iter_dashboard_rows("stakeholders")))
 
         return DashboardData(
             customers=customers,
             projects=projects,
             tasks=tasks,
             stakeholders=stakeholders,
-            sync_logs=mock_sync_logs,
-        )
\ No newline at end of file
+            sync_logs=mock_sync_logs(),
+            aggregates=aggregator.result(),
+        )
+
+    @telemetry.traced("notion.get_dashboard_summary")
+    def get_dashboard_summary(self) -> DashboardAggregates:
+        """Counts every dashboard section without keeping the rows, reading only the properties it counts."""
+        aggregator = DashboardAggregator()
+        for section, properties in self._SUMMARY_PROPERTIES.items():
+            for row in self.iter_database_rows(self._dashboard_db_id(section)):
+                props = row["properties"]
+                aggregator.add(section, SimpleNamespace(**{
+                    attribute: self.extract_notion_property_value(props.get(name)) for attribute, name in properties.items()
+                }))
+        return aggregator.result()
\ No newline at end of file
@@ -0,0 +1,361 @@
+import os
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from .data_models import DashboardData, DashboardAggregates, Customer, Project, Task, Stakeholder, Feature, QualityCharacteristic
+from .notion_client import NotionClient, mock_sync_logs
+from .aggregates import DashboardAggregator, GROUPINGS, UNSPECIFIED
+from . import telemetry
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS customers (
+    id TEXT PRIMARY KEY, company_name TEXT, crm_phase TEXT, initial_project_idea TEXT,
+    next_step_summary TEXT, status TEXT, last_edited_time TEXT
+);
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY, project_name TEXT, description TEXT, status TEXT, stage TEXT, manager TEXT,
+    customer TEXT, process_step TEXT, last_edited_time TEXT, raw TEXT
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY, title TEXT, type TEXT, status TEXT, entity_name TEXT, responsible_name TEXT,
+    important TEXT, priority TEXT, planned_end_date TEXT, last_edited_time TEXT
+);
+CREATE TABLE IF NOT EXISTS stakeholders (
+    id TEXT PRIMARY KEY, stakeholder_name TEXT, stakeholder_phase TEXT, purpose TEXT,
+    next_step_summary TEXT, status TEXT, last_edited_time TEXT
+);
+CREATE TABLE IF NOT EXISTS quality_characteristics (id TEXT PRIMARY KEY, name TEXT, user_story TEXT);
+CREATE TABLE IF NOT EXISTS features (id TEXT PRIMARY KEY, name TEXT, status TEXT, content TEXT, last_edited_time TEXT);
+-- kind is 'project_qc' (project -> quality characteristic) or 'qc_feature' (quality characteristic -> feature)
+CREATE TABLE IF NOT EXISTS relations (
+    from_id TEXT NOT NULL, to_id TEXT NOT NULL, kind TEXT NOT NULL, position INTEGER NOT NULL,
+    PRIMARY KEY (from_id, kind, to_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (section TEXT PRIMARY KEY, cursor TEXT, refreshed_at TEXT);
+-- Summary counts rebuilt at the end of each refresh (see shared.aggregates)
+CREATE TABLE IF NOT EXISTS rollups (name TEXT PRIMARY KEY, data TEXT, refreshed_at TEXT);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+CREATE INDEX IF NOT EXISTS idx_tasks_responsible ON tasks(responsible_name);
+CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
+CREATE INDEX IF NOT EXISTS idx_customers_crm_phase ON customers(crm_phase);
+CREATE INDEX IF NOT EXISTS idx_features_status ON features(status);
+CREATE INDEX IF NOT EXISTS idx_relations_to ON relations(to_id, kind);
+"""
+
+COMMIT_EVERY = 100
+
+# Section -> (table, dataclass, columns mirrored from the dataclass)
+SECTIONS = {
+    "customers": ("customers", Customer, ["id", "company_name", "crm_phase", "initial_project_idea", "next_step_summary", "status"]),
+    "projects": ("projects", Project, ["id", "project_name", "description", "status", "stage", "manager", "customer", "process_step"]),
+    "tasks": ("tasks", Task, ["id", "title", "type", "status", "entity_name", "responsible_name", "important", "priority", "planned_end_date"]),
+    "stakeholders": ("stakeholders", Stakeholder, ["id", "stakeholder_name", "stakeholder_phase", "purpose", "next_step_summary", "status"]),
+}
+
+
+def get_mirror(tenant_id: str = None):
+    """
+    Returns the NotionMirror configured by NOTION_MIRROR_PATH, or None when the mirror is disabled.
+    Each tenant other than the default one gets its own database file next to it (mirror-<tenant>.db).
+    """
+    from .tenants import DEFAULT_TENANT, tenant_path
+
+    path = os.getenv("NOTION_MIRROR_PATH")
+    return NotionMirror(tenant_path(path, tenant_id or DEFAULT_TENANT)) if path else None
+
+
+class NotionMirror:
+    """
+    Local SQLite copy of the Notion workspace used by the dashboard, reports and sync worker.
+    refresh() pulls only pages edited since the last refresh; reads are indexed SQL queries.
+    Reads mirror NotionClient's method names (iter_dashboard_rows, get_all_dashboard_data,
+    get_active_projects, get_features_for_project) so callers can use either interchangeably.
+
+    Quality characteristics and features are not in a database the mirror can query, and editing
+    them does not touch their project page, so every refresh re-reads them for all active projects
+    (page content only for features edited since they were stored).
+
+    Other values derived from related pages (e.g. a task's project name) are resolved when the row
+    itself changes, so a full refresh should still be scheduled periodically (e.g. nightly)
+    to pick up edits to related pages and archived rows.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self._write_lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    # --- Refresh ---
+
+    @telemetry.traced("notion_mirror.refresh")
+    def refresh(self, notion: NotionClient, full: bool = False) -> dict:
+        """
+        Upserts pages edited since the last refresh (or all pages when `full` or on first run), then
+        the features of every active project. A full refresh also removes rows that no longer exist
+        in Notion. The summary rollup is rebuilt whenever a dashboard section changed. Returns the
+        number of pages written per section (and features).
+        """
+        written = {}
+        with self._write_lock:
+            for section in SECTIONS:
+                written[section] = self._refresh_section(notion, section, full)
+            written["features"] = self._refresh_features(notion, full)
+            if full or any(written[section] for section in SECTIONS) or self._load_rollup() is None:
+                self._store_rollup(self._build_rollup())
+        print(f"Notion mirror refreshed ({'full' if full else 'incremental'}): {written}")
+        return written
+
+    def _refresh_section(self, notion: NotionClient, section: str, full: bool) -> int:
+        table, _, columns = SECTIONS[section]
+        with self._connect() as conn:
+            state = conn.execute("SELECT cursor FROM sync_state WHERE section = ?", (section,)).fetchone()
+        cursor = state["cursor"] if state else None
+        full = full or cursor is None
+
+        # Notion timestamps are minute-granular, so the cursor is inclusive; re-writing a page is harmless.
+        filter_payload = None if full else {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}}
+        seen_ids, newest, count = set(), cursor, 0
+        placeholders = ", ".join("?" for _ in columns + ["last_edited_time"])
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns[1:] + ["last_edited_time"])
+
+        with self._connect() as conn:
+            for raw, parsed in notion.iter_dashboard_pages(section, filter_payload):
+                edited = raw.get("last_edited_time", "")
+                values = [getattr(parsed, column) for column in columns] + [edited]
+                conn.execute(
+                    f"INSERT INTO {table} ({', '.join(columns)}, last_edited_time) VALUES ({placeholders}) "
+                    f"ON CONFLICT(id) DO UPDATE SET {updates}",
+                    values,
+                )
+                if section == "projects":
+                    conn.execute("UPDATE projects SET raw = ? WHERE id = ?", (json.dumps(raw), parsed.id))
+                    self._store_characteristics(conn, parsed)
+                seen_ids.add(parsed.id)
+                newest = max(newest or "", edited)
+                count += 1
+                # Commit in batches so readers see progress during long refreshes.
+                if count % COMMIT_EVERY == 0:
+                    conn.commit()
+
+            if full:
+                existing = {row["id"] for row in conn.execute(f"SELECT id FROM {table}")}
+                stale = [(row_id,) for row_id in existing - seen_ids]
+                conn.executemany(f"DELETE FROM {table} WHERE id = ?", stale)
+                if section == "projects":
+                    conn.executemany("DELETE FROM relations WHERE from_id = ? AND kind = 'project_qc'", stale)
+            conn.execute(
+                "INSERT INTO sync_state (section, cursor, refreshed_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(section) DO UPDATE SET cursor = excluded.cursor, refreshed_at = excluded.refreshed_at",
+                (section, newest, datetime.utcnow().isoformat() + "Z"),
+            )
+        return count
+
+    def _build_rollup(self) -> DashboardAggregator:
+        """Fills a DashboardAggregator from GROUP BY queries, without loading the rows."""
+        aggregator = DashboardAggregator()
+        with self._connect() as conn:
+            for section, groupings in GROUPINGS.items():
+                table = SECTIONS[section][0]
+                aggregator.totals[section] = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for name, column in groupings:
+                    for value, count in conn.execute(f"SELECT {column}, COUNT(*) FROM {table} GROUP BY {column}"):
+                        aggregator.counts[name][value or UNSPECIFIED] += count
+            open_tasks = conn.execute(
+                "SELECT responsible_name, planned_end_date, COUNT(*) FROM tasks "
+                "WHERE status IS NOT 'Done' GROUP BY responsible_name, planned_end_date"
+            )
+            for assignee, planned_end_date, count in open_tasks:
+                aggregator.add_open_tasks(assignee, planned_end_date, count)
+        return aggregator
+
+    def _store_rollup(self, aggregator: DashboardAggregator):
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO rollups (name, data, refreshed_at) VALUES ('dashboard', ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, refreshed_at = excluded.refreshed_at",
+                (json.dumps(aggregator.to_dict()), datetime.utcnow().isoformat() + "Z"),
+            )
+
+    def _load_rollup(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT data FROM rollups WHERE name = 'dashboard'").fetchone()
+        return DashboardAggregator.from_dict(json.loads(row["data"])) if row else None
+
+    def _refresh_features(self, notion: NotionClient, full: bool) -> int:
+        """
+        Re-reads the quality characteristics and feature pages of every active project, rewriting
+        their relations, and stores features edited since they were last stored (all when `full`).
+        Returns the number of features written.
+        """
+        with self._connect() as conn:
+            projects = [json.loads(row["raw"]) for row in conn.execute(
+                "SELECT raw FROM projects WHERE status = 'Active' AND raw IS NOT NULL ORDER BY rowid")]
+            stored = {row["id"]: row["last_edited_time"] for row in conn.execute("SELECT id, last_edited_time FROM features")}
+
+        count = 0
+        with self._connect() as conn:
+            for project_page in projects:
+                for qc_page, feature_pages in notion.iter_characteristic_pages(project_page["properties"]):
+                    self._store_characteristic(conn, notion.parse_quality_characteristic(qc_page, feature_pages))
+                    for feature_page in feature_pages:
+                        edited = feature_page.get("last_edited_time")
+                        if not full and edited and stored.get(feature_page["id"]) == edited:
+                            continue
+                        feature = notion.parse_feature(feature_page)
+                        conn.execute(
+                            "INSERT INTO features (id, name, status, content, last_edited_time) VALUES (?, ?, ?, ?, ?) "
+                            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, status = excluded.status, "
+                            "content = excluded.content, last_edited_time = excluded.last_edited_time",
+                            (feature.id, feature.name, feature.status, feature.content, edited),
+                        )
+                        stored[feature.id] = edited
+                        count += 1
+                        if count % COMMIT_EVERY == 0:
+                            conn.commit()
+        return count
+
+    def _store_characteristics(self, conn, project: Project):
+        conn.execute("DELETE FROM relations WHERE from_id = ? AND kind = 'project_qc'", (project.id,))
+        for position, qc in enumerate(project.characteristics):
+            conn.execute("INSERT OR REPLACE INTO relations VALUES (?, ?, 'project_qc', ?)", (project.id, qc.id, position))
+            self._store_characteristic(conn, qc)
+
+    def _store_characteristic(self, conn, qc: QualityCharacteristic):
+        conn.execute(
+            "INSERT INTO quality_characteristics (id, name, user_story) VALUES (?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET name = excluded.name, user_story = excluded.user_story",
+            (qc.id, qc.name, qc.user_story),
+        )
+        conn.execute("DELETE FROM relations WHERE from_id = ? AND kind = 'qc_feature'", (qc.id,))
+        for feature_position, (feature_id, feature_name) in enumerate(zip(qc.feature_ids, qc.feature_names)):
+            conn.execute(
+                "INSERT INTO features (id, name) VALUES (?, ?) ON CONFLICT(id) DO UPDATE SET name = excluded.name",
+                (feature_id, feature_name),
+            )
+            conn.execute("INSERT OR REPLACE INTO relations VALUES (?, ?, 'qc_feature', ?)", (qc.id, feature_id, feature_position))
+
+    # --- Reads ---
+
+    def _characteristics_by_project(self, conn) -> dict:
+        """Builds every project's QualityCharacteristic list with two queries instead of one per project."""
+        features_by_qc = {}
+        for row in conn.execute(
+            "SELECT r.from_id AS qc_id, f.id, f.name FROM relations r JOIN features f ON f.id = r.to_id "
+            "WHERE r.kind = 'qc_feature' ORDER BY r.from_id, r.position"
+        ):
+            features_by_qc.setdefault(row["qc_id"], []).append((row["id"], row["name"]))
+
+        by_project = {}
+        for row in conn.execute(
+            "SELECT r.from_id AS project_id, q.id, q.name, q.user_story FROM relations r "
+            "JOIN quality_characteristics q ON q.id = r.to_id WHERE r.kind = 'project_qc' ORDER BY r.from_id, r.position"
+        ):
+            features = features_by_qc.get(row["id"], [])
+            by_project.setdefault(row["project_id"], []).append(QualityCharacteristic(
+                id=row["id"],
+                name=row["name"],
+                user_story=row["user_story"],
+                feature_ids=[feature_id for feature_id, _ in features],
+                feature_names=[name for _, name in features],
+            ))
+        return by_project
+
+    def iter_dashboard_rows(self, section: str, page_size: int = 500, where: str = "", params: tuple = ()):
+        """Yields dataclass rows for a dashboard section in Notion's order, fetching `page_size` rows at a time."""
+        table, model, columns = SECTIONS[section]
+        with self._connect() as conn:
+            characteristics = self._characteristics_by_project(conn) if section == "projects" else None
+            cursor = conn.execute(f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY rowid", params)
+            while True:
+                rows = cursor.fetchmany(page_size)
+                if not rows:
+                    break
+                for row in rows:
+                    values = dict(row)
+                    if characteristics is not None:
+                        values["characteristics"] = characteristics.get(values["id"], [])
+                    yield model(**values)
+
+    @telemetry.traced("notion_mirror.get_all_dashboard_data")
+    def get_all_dashboard_data(self) -> DashboardData:
+        return DashboardData(
+            customers=list(self.iter_dashboard_rows("customers")),
+            projects=list(self.iter_dashboard_rows("projects")),
+            tasks=list(self.iter_dashboard_rows("tasks")),
+            stakeholders=list(self.iter_dashboard_rows("stakeholders")),
+            sync_logs=mock_sync_logs(),
+            aggregates=self.get_dashboard_summary(),
+        )
+
+    @telemetry.traced("notion_mirror.get_dashboard_summary")
+    def get_dashboard_summary(self) -> DashboardAggregates:
+        """Served from the rollup stored by the last refresh; overdue counts are worked out for today."""
+        aggregator = self._load_rollup() or self._build_rollup()
+        return aggregator.result()
+
+    def get_tasks(self, status: str = None, assignee: str = None) -> list[Task]:
+        """Indexed lookup of tasks by status and/or assignee."""
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if assignee is not None:
+            clauses.append("responsible_name = ?")
+            params.append(assignee)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return list(self.iter_dashboard_rows("tasks", where=where, params=tuple(params)))
+
+    def get_active_projects(self) -> list:
+        """Raw Notion pages of active projects, as NotionClient.get_active_projects returns them."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT raw FROM projects WHERE status = 'Active' AND raw IS NOT NULL ORDER BY rowid").fetchall()
+        return [json.loads(row["raw"]) for row in rows]
+
+    def get_project_ids_for_page(self, page_id: str):
+        """
+        Ids of the projects a page belongs to: the project itself, or the projects linked to it as a
+        quality characteristic or feature. Returns None when the page is not in the mirror at all.
+        """
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM projects WHERE id = ?", (page_id,)).fetchone():
+                return [page_id]
+            rows = conn.execute(
+                "SELECT from_id FROM relations WHERE kind = 'project_qc' AND to_id = ? "
+                "UNION SELECT pq.from_id FROM relations qf "
+                "JOIN relations pq ON pq.to_id = qf.from_id AND pq.kind = 'project_qc' "
+                "WHERE qf.kind = 'qc_feature' AND qf.to_id = ?",
+                (page_id, page_id),
+            ).fetchall()
+            if rows:
+                return [row["from_id"] for row in rows]
+            for table in ("customers", "tasks", "stakeholders", "quality_characteristics", "features"):
+                if conn.execute(f"SELECT 1 FROM {table} WHERE id = ?", (page_id,)).fetchone():
+                    return []
+        return None
+
+    def get_features_for_project(self, project_page: dict) -> list[Feature]:
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT f.id, f.name, f.status, f.content FROM relations pq "
+                "JOIN relations qf ON qf.from_id = pq.to_id AND qf.kind = 'qc_feature' "
+                "JOIN features f ON f.id = qf.to_id "
+                "WHERE pq.from_id = ? AND pq.kind = 'project_qc' AND f.status = 'Active' "
+                "ORDER BY pq.position, qf.position",
+                (project_page["id"],),
+            ).fetchall()
+        return [Feature(id=row["id"], name=row["name"], status=row["status"], content=row["content"] or "") for row in rows]
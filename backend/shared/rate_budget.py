@@ -0,0 +1,192 @@
+import time
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+
+# GitHub's primary limits are tracked per resource: "core" (REST) and "graphql" (points).
+CORE = "core"
+GRAPHQL = "graphql"
+
+HIGH = "high"
+LOW = "low"
+
+# Fraction of each resource's hourly limit kept for high-priority calls (creates). Low-priority calls
+# (content updates) are deferred rather than spend it, and high-priority calls made from it are spread
+# evenly over the time left until the reset.
+DEFAULT_RESERVE_FRACTION = 0.1
+# Longest a high-priority call waits for a reset before giving up.
+DEFAULT_MAX_WAIT_SECONDS = 900
+
+
+class BudgetDeferred(Exception):
+    """Raised for a low-priority call that would eat into the reserve. Retry after `retry_at` (epoch seconds)."""
+    def __init__(self, resource: str, retry_at: float):
+        super().__init__(f"GitHub {resource} budget is low; deferred until {datetime.utcfromtimestamp(retry_at).isoformat()}Z")
+        self.resource = resource
+        self.retry_at = retry_at
+
+
+class _Bucket:
+    def __init__(self):
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.used = 0
+
+
+class RateLimitBudget:
+    """
+    Tracks GitHub's primary rate limits for both transports from what the API reports back:
+    X-RateLimit-* headers (REST and GraphQL) and the GraphQL `rateLimit { cost remaining resetAt }`
+    field. Records the observed cost per operation, predicts whether a planned set of calls fits in
+    what is left, and paces or defers calls as the budget runs low. Thread-safe; share one instance
+    per token.
+    """
+    def __init__(self, reserve_fraction: float = DEFAULT_RESERVE_FRACTION, max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS,
+                 min_write_interval: float = 0.0):
+        self.reserve_fraction = reserve_fraction
+        self.max_wait_seconds = max_wait_seconds
+        # GitHub's secondary limits ask for about a second between content-creating requests
+        # (per mutation: a batch of n mutations is followed by n intervals).
+        self.min_write_interval = min_write_interval
+        self._buckets = defaultdict(_Bucket)
+        self._costs = defaultdict(lambda: [0, 0, 0])  # operation -> [calls, total cost, units]
+        self._resources = {}                        # operation -> resource
+        self._next_write = 0.0
+        self._deferred = 0
+        self._lock = threading.Lock()
+
+    # --- Observations ---
+
+    def update_from_headers(self, headers, default_resource: str = CORE):
+        """Reads X-RateLimit-Limit/Remaining/Reset/Resource from a response (header names are case-insensitive)."""
+        if not headers:
+            return
+        lowered = {key.lower(): value for key, value in dict(headers).items()}
+        if "x-ratelimit-remaining" not in lowered:
+            return
+        self.update(
+            lowered.get("x-ratelimit-resource", default_resource),
+            remaining=int(lowered["x-ratelimit-remaining"]),
+            limit=int(lowered["x-ratelimit-limit"]) if "x-ratelimit-limit" in lowered else None,
+            reset_at=float(lowered["x-ratelimit-reset"]) if "x-ratelimit-reset" in lowered else None,
+        )
+
+    def update_from_graphql(self, rate_limit: dict):
+        """Reads a GraphQL `rateLimit { cost limit remaining resetAt }` selection."""
+        if not rate_limit:
+            return
+        reset_at = None
+        if rate_limit.get("resetAt"):
+            reset_at = datetime.strptime(rate_limit["resetAt"], "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+        self.update(GRAPHQL, remaining=rate_limit.get("remaining"), limit=rate_limit.get("limit"), reset_at=reset_at)
+
+    def update(self, resource: str, remaining: int = None, limit: int = None, reset_at: float = None):
+        with self._lock:
+            bucket = self._buckets[resource]
+            if remaining is not None:
+                bucket.remaining = remaining
+            if limit is not None:
+                bucket.limit = limit
+            if reset_at is not None:
+                bucket.reset_at = reset_at
+
+    def record_cost(self, operation: str, resource: str, cost: float = 1, units: int = 1):
+        """
+        Records one call. GraphQL query costs come from `rateLimit.cost` and REST calls cost 1.
+        A batched mutation request is `units` mutations costing one each, so its cost is averaged per mutation.
+        """
+        with self._lock:
+            stats = self._costs[operation]
+            stats[0] += 1
+            stats[1] += cost
+            stats[2] += units
+            self._resources[operation] = resource
+            self._buckets[resource].used += cost
+
+    # --- Prediction ---
+
+    def average_cost(self, operation: str, default: float = 1) -> float:
+        with self._lock:
+            _, total, units = self._costs.get(operation, (0, 0, 0))
+        return total / units if units else default
+
+    def estimate(self, planned_calls: dict, resources: dict = None) -> dict:
+        """
+        Predicted cost per resource of {operation: planned units} (calls, or mutations for batched
+        operations; see SyncPlan.operation_units), using the average cost observed so far.
+        `resources` maps operations not seen yet to their resource (defaults to GraphQL).
+        """
+        totals = defaultdict(float)
+        for operation, count in planned_calls.items():
+            resource = self._resources.get(operation) or (resources or {}).get(operation, GRAPHQL)
+            totals[resource] += count * self.average_cost(operation)
+        return dict(totals)
+
+    def fits(self, planned_calls: dict, resources: dict = None) -> bool:
+        """Whether the planned calls fit in what is left of every resource, without touching the reserve."""
+        for resource, cost in self.estimate(planned_calls, resources).items():
+            available = self.available(resource)
+            if available is not None and cost > available:
+                return False
+        return True
+
+    def available(self, resource: str) -> Optional[float]:
+        """Remaining budget above the reserve, or None while the limit has not been observed."""
+        with self._lock:
+            bucket = self._buckets[resource]
+            if bucket.remaining is None:
+                return None
+            if bucket.reset_at is not None and bucket.reset_at <= time.time():
+                return None  # the window has reset since we last heard
+            reserve = (bucket.limit or 0) * self.reserve_fraction
+            return bucket.remaining - reserve
+
+    # --- Pacing ---
+
+    def before_call(self, resource: str, priority: str = HIGH, write: bool = False, cost: float = 1):
+        """
+        Called before each request. Defers low-priority calls that would dip into the reserve, spreads
+        high-priority calls made from the reserve over the rest of the window, and waits for the reset
+        when the budget is exhausted. `cost` is what the request is expected to use (e.g. the number
+        of mutations in a batched GraphQL request).
+        """
+        delay = 0.0
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets[resource]
+            window_open = bucket.remaining is not None and bucket.reset_at is not None and bucket.reset_at > now
+            if window_open:
+                until_reset = bucket.reset_at - now
+                reserve = (bucket.limit or 0) * self.reserve_fraction
+                if priority == LOW and bucket.remaining - cost < reserve:
+                    self._deferred += 1
+                    raise BudgetDeferred(resource, bucket.reset_at)
+                if bucket.remaining < cost:
+                    if until_reset > self.max_wait_seconds:
+                        raise BudgetDeferred(resource, bucket.reset_at)
+                    delay = until_reset
+                elif bucket.remaining - cost < reserve:
+                    delay = until_reset / max(bucket.remaining, 1)
+                # Assume the call goes through until the response tells us otherwise.
+                bucket.remaining -= cost
+            if write and self.min_write_interval:
+                delay = max(delay, self._next_write - now)
+                self._next_write = now + max(delay, 0) + self.min_write_interval * cost
+        if delay > 0:
+            time.sleep(delay)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "resources": {
+                    name: {"limit": b.limit, "remaining": b.remaining, "reset_at": b.reset_at, "used": b.used}
+                    for name, b in self._buckets.items()
+                },
+                "operations": {
+                    operation: {"calls": calls, "average_cost": round(total / units, 2) if units else 0}
+                    for operation, (calls, total, units) in self._costs.items()
+                },
+                "deferred": self._deferred,
+            }
@@ -0,0 +1,281 @@
+import os
+import json
+import time
+import base64
+import shutil
+import hashlib
+import tempfile
+from dataclasses import asdict
+from types import SimpleNamespace
+from typing import Optional, Tuple
+
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
+
+TEMPLATE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'templates'))
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "neuroflux_report_cache")
+# Roughly one printed page of list rows; large sections are split into fragments of this size.
+ROWS_PER_FRAGMENT = 40
+# Spooled files stay in memory up to this size and then roll over to disk.
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+# Must be a multiple of 3 so each chunk base64-encodes without padding.
+BASE64_CHUNK_BYTES = 3 * 64 * 1024
+# Cached reports are evicted once unused for this long, and least recently used first beyond this size.
+DEFAULT_CACHE_MAX_AGE_DAYS = 30
+DEFAULT_CACHE_MAX_MB = 500
+# Temporary files older than this are leftovers of an interrupted write.
+STALE_TEMP_SECONDS = 3600
+ENTRY_EXTENSIONS = ("pdf", "b64")
+# The dashboard sections the report template lists; the cache key covers these and nothing else.
+REPORT_SECTIONS = ("projects", "customers", "tasks")
+
+
+def encode_base64_stream(source, target, chunk_size: int = BASE64_CHUNK_BYTES):
+    """Base64-encodes a binary file object into another one chunk by chunk."""
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        target.write(base64.b64encode(chunk))
+
+
+class ReportCache:
+    """
+    Content-addressed store for rendered reports.
+    Each entry is a pair of files named after the cache key: the raw PDF and its base64 encoding.
+    Hits refresh an entry's modification time; every store prunes entries unused for `max_age_days`
+    and then the least recently used ones until the cache fits in `max_mb`.
+    """
+    def __init__(self, cache_dir: str = None, max_age_days: float = None, max_mb: float = None):
+        self.cache_dir = cache_dir or os.getenv("REPORT_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_age_seconds = 86400 * float(max_age_days if max_age_days is not None
+                                             else os.getenv("REPORT_CACHE_MAX_AGE_DAYS", DEFAULT_CACHE_MAX_AGE_DAYS))
+        self.max_bytes = 1024 * 1024 * float(max_mb if max_mb is not None else os.getenv("REPORT_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB))
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.{extension}")
+
+    def _touch(self, *paths: str):
+        for path in paths:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[Tuple[bytes, str]]:
+        """Returns (pdf_bytes, encoded_pdf) for a cached report, or None on a miss."""
+        pdf_path, b64_path = self._path(key, "pdf"), self._path(key, "b64")
+        if not (os.path.exists(pdf_path) and os.path.exists(b64_path)):
+            return None
+        self._touch(pdf_path, b64_path)
+        with open(pdf_path, 'rb') as pdf_file, open(b64_path, 'r') as b64_file:
+            return pdf_file.read(), b64_file.read()
+
+    def get_encoded_path(self, key: str) -> Optional[str]:
+        """Returns the path of a cached report's base64 encoding, without reading it, or None on a miss."""
+        b64_path = self._path(key, "b64")
+        if not os.path.exists(b64_path):
+            return None
+        self._touch(b64_path, self._path(key, "pdf"))
+        return b64_path
+
+    def put(self, key: str, pdf_bytes: bytes, encoded_pdf: str):
+        """Stores a rendered report. Files are written atomically so readers never see a partial entry."""
+        self._write_atomic(self._path(key, "pdf"), pdf_bytes, 'wb')
+        self._write_atomic(self._path(key, "b64"), encoded_pdf, 'w')
+        self.prune(keep=key)
+
+    def put_files(self, key: str, pdf_file, b64_file):
+        """Stores a rendered report from binary file objects without reading them into memory."""
+        self._copy_atomic(self._path(key, "pdf"), pdf_file)
+        self._copy_atomic(self._path(key, "b64"), b64_file)
+        self.prune(keep=key)
+
+    def prune(self, keep: str = None) -> int:
+        """Evicts expired entries, then the least recently used ones over the size limit. Returns how many were removed."""
+        now = time.time()
+        entries = {}  # key -> [last used, size, paths]
+        for entry in os.scandir(self.cache_dir):
+            if not entry.is_file():
+                continue  # the Jinja bytecode cache lives in a subdirectory
+            stat = entry.stat()
+            key, _, extension = entry.name.rpartition(".")
+            if extension not in ENTRY_EXTENSIONS:
+                if now - stat.st_mtime > STALE_TEMP_SECONDS:
+                    self._remove(entry.path)
+                continue
+            used, size, paths = entries.setdefault(key, [0.0, 0, []])
+            entries[key] = [max(used, stat.st_mtime), size + stat.st_size, paths + [entry.path]]
+
+        removed = 0
+        total = sum(size for _, size, _ in entries.values())
+        for key, (used, size, paths) in sorted(entries.items(), key=lambda item: item[1][0]):
+            if key == keep:
+                continue
+            if now - used <= self.max_age_seconds and total <= self.max_bytes:
+                break
+            for path in paths:
+                self._remove(path)
+            total -= size
+            removed += 1
+        if removed:
+            print(f"Report cache evicted {removed} entr{'y' if removed == 1 else 'ies'}.")
+        return removed
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _write_atomic(self, path: str, content, mode: str):
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, mode) as tmp_file:
+            tmp_file.write(content)
+        os.replace(tmp_path, path)
+
+    def _copy_atomic(self, path: str, source):
+        source.seek(0)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        with os.fdopen(fd, 'wb') as tmp_file:
+            shutil.copyfileobj(source, tmp_file)
+        os.replace(tmp_path, path)
+
+
+def _row_bytes(row) -> bytes:
+    return json.dumps(asdict(row), sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+class _HashedSection:
+    """
+    Feeds one section's streamed rows to the template, hashing each row for the cache key as it
+    passes. Aggregates tapped from the same stream are only complete if the template reads it to
+    the end, so render_pdf_streamed checks `exhausted` once the template has rendered.
+    """
+    def __init__(self, rows):
+        self.rows = rows
+        self.digest = hashlib.sha256()
+        self.exhausted = False
+
+    def __iter__(self):
+        for row in self.rows:
+            self.digest.update(_row_bytes(row))
+            yield row
+        self.exhausted = True
+
+
+class ReportRenderer:
+    """
+    Renders the weekly PDF report.
+    The Jinja environment is built once (with an on-disk bytecode cache) and PDFs are
+    reused from the ReportCache whenever the report's rows are unchanged.
+    """
+    def __init__(self, template_dir: str = TEMPLATE_DIR, template_name: str = 'report_template.html', cache_dir: str = None,
+                 rows_per_fragment: int = ROWS_PER_FRAGMENT):
+        self.cache = ReportCache(cache_dir)
+        self.rows_per_fragment = rows_per_fragment
+        bytecode_dir = os.path.join(self.cache.cache_dir, "jinja")
+        os.makedirs(bytecode_dir, exist_ok=True)
+
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=FileSystemBytecodeCache(bytecode_dir),
+            auto_reload=False,
+        )
+        self.template = self.env.get_template(template_name)
+        source, _, _ = self.env.loader.get_source(self.env, template_name)
+        version = f"{source}\n{rows_per_fragment}"
+        self.template_version = hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+
+    def _key(self, section_digests: dict) -> str:
+        digest = hashlib.sha256(self.template_version.encode('utf-8'))
+        for section in REPORT_SECTIONS:
+            digest.update(section_digests[section].digest())
+        return digest.hexdigest()
+
+    def cache_key(self, data) -> str:
+        """
+        Hashes the normalized rows of the report sections together with the template version.
+        The report carries no date, so an unchanged week reuses last week's PDF.
+        """
+        digests = {}
+        for section in REPORT_SECTIONS:
+            digests[section] = hashlib.sha256()
+            for row in getattr(data, section):
+                digests[section].update(_row_bytes(row))
+        return self._key(digests)
+
+    def render_html(self, data) -> str:
+        return self.template.render(data=data, rows_per_fragment=self.rows_per_fragment)
+
+    def render_pdf(self, data) -> Tuple[bytes, str]:
+        """
+        Returns (pdf_bytes, encoded_pdf), rendering only on a cache miss. Holds the whole report in
+        memory; the reporting worker uses render_pdf_streamed, and this in-memory path is kept as the
+        baseline for benchmarks.report_render_benchmark and benchmarks.report_memory_benchmark.
+        """
+        key = self.cache_key(data)
+        cached = self.cache.get(key)
+        if cached:
+            print(f"Report cache hit ({key[:12]}). Reusing rendered PDF.")
+            return cached
+
+        from weasyprint import HTML  # only needed on a miss; it loads Pango and friends
+
+        print(f"Report cache miss ({key[:12]}). Rendering PDF...")
+        html_out = self.render_html(data)
+        pdf_bytes = HTML(string=html_out).write_pdf()
+        # We must base64 encode the bytes for the Brevo API attachment
+        encoded_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
+        self.cache.put(key, pdf_bytes, encoded_pdf)
+        return pdf_bytes, encoded_pdf
+
+    def render_pdf_streamed(self, data) -> str:
+        """
+        Memory-bounded variant of render_pdf for large reports; returns the path of the base64-encoded
+        PDF in the cache, for EmailClient.send_email_with_attachment_file to stream from.
+        `data` only needs `projects`, `customers` and `tasks` iterables, so sections can be fed
+        straight from NotionClient.iter_dashboard_rows. The HTML, PDF and base64 copies are all
+        spooled to temporary files instead of being held in memory at the same time.
+        The cache key is the same data hash as render_pdf's, taken as the rows stream through the template.
+        Raises RuntimeError if the template leaves a section unread, as its key and tapped aggregates would be incomplete.
+        """
+        sections = {section: _HashedSection(getattr(data, section)) for section in REPORT_SECTIONS}
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as html_file:
+            for fragment in self.template.generate(data=SimpleNamespace(**sections), rows_per_fragment=self.rows_per_fragment):
+                html_file.write(fragment.encode('utf-8'))
+
+            unread = [name for name, section in sections.items() if not section.exhausted]
+            if unread:
+                raise RuntimeError(f"Report template did not read every row of: {', '.join(unread)}")
+
+            key = self._key({name: section.digest for name, section in sections.items()})
+            cached = self.cache.get_encoded_path(key)
+            if cached is not None:
+                print(f"Report cache hit ({key[:12]}). Reusing rendered PDF.")
+                return cached
+
+            from weasyprint import HTML  # only needed on a miss; it loads Pango and friends
+
+            print(f"Report cache miss ({key[:12]}). Rendering PDF...")
+            html_file.seek(0)
+            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as pdf_file, \
+                    tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as b64_file:
+                HTML(file_obj=html_file, encoding='utf-8').write_pdf(target=pdf_file)
+                # Drop the HTML spool before encoding; WeasyPrint has finished with it.
+                html_file.truncate(0)
+                pdf_file.seek(0)
+                encode_base64_stream(pdf_file, b64_file)
+                self.cache.put_files(key, pdf_file, b64_file)
+        return self.cache.get_encoded_path(key)
+
+
+_renderer = None
+
+def get_report_renderer() -> ReportRenderer:
+    """Returns the process-wide renderer so the template is only compiled once."""
+    global _renderer
+    if _renderer is None:
+        _renderer = ReportRenderer()
+    return _renderer
@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from cachetools import TTLCache
+
+
+class _Load:
+    """One in-flight load that other threads asking for the same key wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """
+    TTLCache guarded by a lock, so it can be shared by the threads of a gthread/gevent worker.
+    get_or_load() runs one load per key at a time: concurrent misses for the same key wait for
+    the first one and share its result instead of all crawling Notion at once.
+    """
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> _Load
+        # Bumped by pop() and clear(), so a load that started before an invalidation is not stored.
+        self._generation = 0
+        self.stats = {"hits": 0, "misses": 0, "joined": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            self._generation += 1
+            return self._cache.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._cache.clear()
+
+    def get_or_load(self, key, loader: Callable[[], object]) -> tuple[object, bool]:
+        """Returns (value, hit). `hit` is False for the caller that loaded and for callers that waited on it."""
+        with self._lock:
+            value = self._cache.get(key)
+            if value is not None:
+                self.stats["hits"] += 1
+                return value, True
+            load = self._loading.get(key)
+            leader = load is None
+            generation = self._generation
+            if leader:
+                load = self._loading[key] = _Load()
+                self.stats["misses"] += 1
+            else:
+                self.stats["joined"] += 1
+
+        if not leader:
+            load.done.wait()
+            if load.error is not None:
+                raise load.error
+            return load.value, False
+
+        try:
+            load.value = loader()
+            with self._lock:
+                if self._generation == generation:
+                    self._cache[key] = load.value
+        except Exception as e:
+            load.error = e
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+            load.done.set()
+        return load.value, False
+
+
+class TenantCache:
+    """
+    One ResponseCache partition per tenant. Entries are only ever evicted by their own tenant's
+    entries (each partition holds `maxsize_per_tenant`), so a tenant with many keys or frequent
+    reloads cannot push another tenant's dashboard out. At most `max_tenants` partitions are
+    kept; the least recently used tenant's partition is dropped to make room for a new one.
+    """
+    def __init__(self, maxsize_per_tenant: int, ttl: float, max_tenants: int = 64):
+        self.maxsize_per_tenant = maxsize_per_tenant
+        self.ttl = ttl
+        self.max_tenants = max_tenants
+        self._partitions = OrderedDict()  # tenant id -> ResponseCache, least recently used first
+        self._lock = threading.Lock()
+        self.evicted_tenants = 0
+
+    def partition(self, tenant_id: str) -> ResponseCache:
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+            if partition is None:
+                if len(self._partitions) >= self.max_tenants:
+                    self._partitions.popitem(last=False)
+                    self.evicted_tenants += 1
+                partition = self._partitions[tenant_id] = ResponseCache(self.maxsize_per_tenant, self.ttl)
+            else:
+                self._partitions.move_to_end(tenant_id)
+            return partition
+
+    def get(self, tenant_id: str, key, default=None):
+        return self.partition(tenant_id).get(key, default)
+
+    def get_or_load(self, tenant_id: str, key, loader: Callable[[], object]) -> tuple[object, bool]:
+        return self.partition(tenant_id).get_or_load(key, loader)
+
+    def pop(self, tenant_id: str, key, default=None):
+        with self._lock:
+            partition = self._partitions.get(tenant_id)
+        return partition.pop(key, default) if partition else default
+
+    def clear(self, tenant_id: str = None):
+        with self._lock:
+            partitions = list(self._partitions.values()) if tenant_id is None else [self._partitions.get(tenant_id)]
+        for partition in partitions:
+            if partition:
+                partition.clear()
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            partitions = dict(self._partitions)
+        return {"tenants": {tenant_id: partition.stats for tenant_id, partition in partitions.items()},
+                "evicted_tenants": self.evicted_tenants}
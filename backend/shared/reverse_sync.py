@@ -0,0 +1,188 @@
+import os
+import json
+import tempfile
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from shared.sync_plan import project_name
+from shared.notion_client import DEFAULT_WRITE_RATE, DEFAULT_WRITE_WORKERS
+from shared.tenants import DEFAULT_TENANT, tenant_path
+from shared import telemetry
+
+# Feature page properties written back from GitHub. The board Status is only written to pages
+# whose database has the property, so it can be added to the Features database when wanted.
+FEATURE_STATUS_PROPERTY = "Feature Status"
+BOARD_STATUS_PROPERTY = "GitHub Status"
+CLOSED_FEATURE_STATUS = "Done"
+REOPENED_FEATURE_STATUS = "Active"
+
+DEFAULT_CURSOR_PATH = os.path.join(tempfile.gettempdir(), "neuroflux_reverse_sync.json")
+# The next run re-reads changes from slightly before the cursor; re-applying an update is harmless.
+CURSOR_OVERLAP = timedelta(minutes=1)
+GITHUB_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _parse_time(timestamp: str) -> datetime:
+    """Parses GitHub ("...:00Z") and Notion ("...:00.000Z") timestamps."""
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+
+def _select_name(page: dict, property_name: str):
+    prop = page['properties'].get(property_name) or {}
+    return (prop.get('select') or prop.get('status') or {}).get('name')
+
+
+def _property_value(page: dict, property_name: str, name: str) -> dict:
+    """A Notion property value setting `name`, in the property's own type (status, select or text)."""
+    prop_type = (page['properties'].get(property_name) or {}).get('type', 'select')
+    if prop_type in ('rich_text', 'title'):
+        return {prop_type: [{"type": "text", "text": {"content": name}}]}
+    return {'status' if prop_type == 'status' else 'select': {"name": name}}
+
+
+@dataclass
+class FeatureUpdate:
+    page_id: str
+    title: str
+    properties: dict
+    github_updated_at: str
+
+
+class ReverseSyncCursor:
+    """The time up to which GitHub changes were applied to Notion, kept in a small JSON file (local runs)."""
+    def __init__(self, path: str = None):
+        self.path = path or os.getenv("REVERSE_SYNC_STATE_PATH", DEFAULT_CURSOR_PATH)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, 'r') as state_file:
+                return json.load(state_file).get("since")
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable reverse sync state at {self.path}: {e}")
+            return None
+
+    def save(self, since: str):
+        with open(self.path, 'w') as state_file:
+            json.dump({"since": since}, state_file)
+
+
+class FirestoreReverseSyncCursor:
+    """
+    The reverse sync cursor as a document of the `sync_state` collection, next to the tenant's job
+    queue, so it outlives the worker's container and every worker instance sees the same one.
+    """
+    def __init__(self, tenant_id: str = None, db=None, collection: str = "sync_state"):
+        from google.cloud import firestore
+
+        self.db = db or firestore.Client()
+        document = f"reverse_sync_{tenant_id}" if tenant_id and tenant_id != DEFAULT_TENANT else "reverse_sync"
+        self.ref = self.db.collection(collection).document(document)
+
+    @telemetry.traced("firestore.sync_state.load", telemetry.CLIENT)
+    def load(self):
+        snapshot = self.ref.get()
+        return snapshot.to_dict().get("since") if snapshot.exists else None
+
+    @telemetry.traced("firestore.sync_state.save", telemetry.CLIENT)
+    def save(self, since: str):
+        self.ref.set({"since": since})
+
+
+def get_reverse_sync_cursor(tenant_id: str = None):
+    """
+    Stored in Firestore unless REVERSE_SYNC_STATE_PATH names a JSON file (one per tenant, see
+    tenant_path) or jobs are kept in memory (SYNC_JOB_STORE=memory), as in local runs.
+    """
+    path = os.getenv("REVERSE_SYNC_STATE_PATH")
+    if path or os.getenv("SYNC_JOB_STORE", "firestore") == "memory":
+        return ReverseSyncCursor(tenant_path(path or DEFAULT_CURSOR_PATH, tenant_id or DEFAULT_TENANT))
+    return FirestoreReverseSyncCursor(tenant_id)
+
+
+def plan_feature_updates(changes: list[dict], feature_pages: list[dict]) -> tuple[list[FeatureUpdate], list[dict]]:
+    """
+    Maps changed GitHub items to their Notion feature pages by title (the push sync names issues
+    after features) and works out the property updates. Conflicts are decided per page, not per
+    property: Notion only reports when the page as a whole was last edited, to the minute. When that
+    is after the GitHub change (any edit of the page in a later minute), Notion is kept and the change
+    is reported as a conflict; an edit in the same minute loses to GitHub. The cursor still moves past
+    conflicting changes, so they are not retried; run again with an earlier `since` to re-apply them.
+    Returns (updates, conflicts).
+    """
+    pages_by_title = {page['properties']['Feature']['title'][0]['plain_text']: page for page in feature_pages}
+    updates, conflicts = [], []
+    for change in changes:
+        page = pages_by_title.get(change['title'])
+        if not page:
+            continue
+        notion_edited_at = _parse_time(page['last_edited_time'])
+        candidates = []  # (property, value, GitHub change time)
+        feature_status = _select_name(page, FEATURE_STATUS_PROPERTY)
+        if change['state'] == "CLOSED" and feature_status != CLOSED_FEATURE_STATUS:
+            candidates.append((FEATURE_STATUS_PROPERTY, CLOSED_FEATURE_STATUS, change['state_updated_at']))
+        elif change['state'] == "OPEN" and feature_status == CLOSED_FEATURE_STATUS:
+            candidates.append((FEATURE_STATUS_PROPERTY, REOPENED_FEATURE_STATUS, change['state_updated_at']))
+        if (change['status'] and BOARD_STATUS_PROPERTY in page['properties']
+                and _select_name(page, BOARD_STATUS_PROPERTY) != change['status']):
+            candidates.append((BOARD_STATUS_PROPERTY, change['status'], change['status_updated_at']))
+
+        properties = {}
+        for name, value, changed_at in candidates:
+            if notion_edited_at > _parse_time(changed_at):
+                conflicts.append({"page_id": page['id'], "title": change['title'], "property": name,
+                                  "notion_edited_at": page['last_edited_time'], "github_updated_at": changed_at})
+            else:
+                properties[name] = _property_value(page, name, value)
+        if properties:
+            updates.append(FeatureUpdate(page['id'], change['title'], properties, change['updated_at']))
+    return updates, conflicts
+
+
+@telemetry.traced("reverse_sync.run")
+def run_reverse_sync(notion, github, since: str = None, cursor: ReverseSyncCursor = None,
+                     max_workers: int = DEFAULT_WRITE_WORKERS, rate: float = DEFAULT_WRITE_RATE,
+                     project_filter=None) -> dict:
+    """
+    Applies GitHub issue state and board Status changes made since `since` (default: the stored
+    cursor; everything on the first run) to the Notion feature pages of active projects.
+    `notion` must be a NotionClient, since the mirror is read-only. The cursor only advances when
+    every write succeeded, so failed pages are retried on the next run (conflicts are not, see
+    plan_feature_updates). `project_filter(project_page)`, when given, skips projects it returns False for
+    (e.g. ones whose board belongs to another tenant sharing the GitHub account).
+    """
+    cursor = cursor or get_reverse_sync_cursor()
+    since = since or cursor.load()
+    started = datetime.now(timezone.utc)
+    boards = {board['title']: board['id'] for board in github.get_all_projects()}
+    stats = {"since": since, "boards": 0, "changed_items": 0, "updates": 0, "conflicts": 0, "failed": 0}
+    updates, conflicts = [], []
+
+    for project_page in notion.get_active_projects():
+        board_id = boards.get(project_name(project_page))
+        if not board_id or (project_filter and not project_filter(project_page)):
+            continue
+        stats["boards"] += 1
+        changes = github.get_changed_project_items(board_id, since)
+        if not changes:
+            continue
+        stats["changed_items"] += len(changes)
+        # Feature pages are only read for boards that changed.
+        project_updates, project_conflicts = plan_feature_updates(changes, notion.get_feature_pages_for_project(project_page))
+        updates += project_updates
+        conflicts += project_conflicts
+
+    for conflict in conflicts:
+        print(f"  - Kept Notion's {conflict['property']} for '{conflict['title']}': edited {conflict['notion_edited_at']}, "
+              f"after GitHub {conflict['github_updated_at']}.")
+    # One PATCH per page, however many of its properties changed.
+    merged = {}
+    for update in updates:
+        merged.setdefault(update.page_id, {}).update(update.properties)
+    results = notion.update_pages(merged, max_workers=max_workers, rate=rate) if merged else {"updated": [], "failed": {}}
+
+    stats.update(updates=len(results["updated"]), conflicts=len(conflicts), failed=len(results["failed"]))
+    if not results["failed"]:
+        cursor.save((started - CURSOR_OVERLAP).strftime(GITHUB_TIME_FORMAT))
+    return stats
@@ -2,6 +2,8 @@ import os
 from dotenv import load_dotenv
 from google.cloud import secretmanager
 
+from . import telemetry
+
 load_dotenv(dotenv_path=r"C:\Users\User-02\Documents\Pycharm\Nueroflux Operations\.env")
 
 print("Loaded .env from: C:\\Users\\User-02\\Documents\\Pycharm\\Nueroflux Operations\\.env")
@@ -20,9 +22,10 @@ def get_secret(secret_id: str, project_id: str = None) -> str:
         raise ValueError("GCP Project ID is required when running in a non-local environment.")
 
     try:
-        client = secretmanager.SecretManagerServiceClient()
-        name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
-        response = client.access_secret_version(request={"name": name})
+        with telemetry.span("secrets.access_secret_version", telemetry.CLIENT, secret_id=secret_id):
+            client = secretmanager.SecretManagerServiceClient()
+            name = f"projects/{project_id}/secrets/{secret_id}/versions/latest"
+            response = client.access_secret_version(request={"name": name})
         print(f"Loaded secret '{secret_id}' from Google Secret Manager.")
         return response.payload.data.decode("UTF-8")
     except Exception as e:
@@ -0,0 +1,250 @@
+import math
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from shared.github_client import BatchMutationError
+from shared import telemetry
+
+# Mutations sent per GraphQL request by the executor. GitHub runs the aliased mutations of one
+# request in order; keep batches small enough that a failed request is cheap to redo.
+DEFAULT_BATCH_SIZE = 20
+
+
+def project_name(project_page: dict) -> str:
+    return project_page['properties']['Project Name']['title'][0]['plain_text']
+
+
+def repo_name(name: str) -> str:
+    return name.replace(" ", "-").lower()
+
+
+# --- Plan operations ---
+# Every operation carries the Notion project page it belongs to, so results can be recorded
+# against that project's sync job.
+
+@dataclass
+class CreateRepo:
+    page_id: str
+    repo_name: str
+    description: str
+
+@dataclass
+class CreateProject:
+    page_id: str
+    title: str
+
+@dataclass
+class CreateIssue:
+    page_id: str
+    feature_id: str
+    repo_name: str
+    title: str
+    body: str
+
+@dataclass
+class UpdateIssue:
+    page_id: str
+    feature_id: str
+    issue_id: str
+    title: str
+    body: str
+
+@dataclass
+class AddItem:
+    """Puts an issue on a project board. Ids are None when they come from a create earlier in the plan."""
+    page_id: str
+    feature_id: str
+    title: str
+    project_id: Optional[str] = None
+    issue_id: Optional[str] = None
+
+
+@dataclass
+class GitHubSnapshot:
+    """The GitHub state a plan is diffed against."""
+    repo_ids: dict = field(default_factory=dict)     # repo name -> node id
+    project_ids: dict = field(default_factory=dict)  # board title -> project id
+    items: dict = field(default_factory=dict)        # project id -> {issue title: issue content}
+
+
+@dataclass
+class SyncPlan:
+    """The writes needed to bring GitHub in line with the planned Notion projects, in execution order."""
+    repos: list[CreateRepo] = field(default_factory=list)
+    projects: list[CreateProject] = field(default_factory=list)
+    issues: list[CreateIssue] = field(default_factory=list)
+    items: list[AddItem] = field(default_factory=list)
+    updates: list[UpdateIssue] = field(default_factory=list)
+    unchanged: int = 0
+    repo_ids: dict = field(default_factory=dict)   # repo name -> node id, filled in as repos are created
+    board_ids: dict = field(default_factory=dict)  # project page id -> board id, filled in as boards are created
+
+    def is_empty(self) -> bool:
+        return not (self.repos or self.projects or self.issues or self.items or self.updates)
+
+    def counts(self) -> dict:
+        return {
+            "repos_to_create": len(self.repos),
+            "projects_to_create": len(self.projects),
+            "issues_to_create": len(self.issues),
+            "items_to_add": len(self.items),
+            "issues_to_update": len(self.updates),
+            "unchanged": self.unchanged,
+        }
+
+    def operation_counts(self, batch_size: int = DEFAULT_BATCH_SIZE) -> dict:
+        """API calls the executor will make, by GitHubClient operation."""
+        batches = lambda operations: math.ceil(len(operations) / batch_size)
+        calls = {
+            "create_repo": len(self.repos),
+            "create_projects": batches(self.projects),
+            "create_issues": batches(self.issues),
+            "add_issues_to_projects": batches(self.items),
+            "update_issue_bodies": batches(self.updates),
+        }
+        return {operation: count for operation, count in calls.items() if count}
+
+    def operation_units(self) -> dict:
+        """Rate-limit units by GitHubClient operation: one per REST call and one per batched mutation."""
+        return self.operation_counts(batch_size=1)
+
+    def describe(self) -> list[str]:
+        """One line per planned write, for dry runs."""
+        return (
+            [f"+ repo {op.repo_name}" for op in self.repos]
+            + [f"+ project board '{op.title}'" for op in self.projects]
+            + [f"+ issue '{op.title}' in {op.repo_name}" for op in self.issues]
+            + [f"+ board item '{op.title}'" for op in self.items]
+            + [f"~ issue body '{op.title}'" for op in self.updates]
+        )
+
+
+# --- Planning ---
+
+@telemetry.traced("sync_plan.snapshot_github")
+def snapshot_github(github, board_titles) -> GitHubSnapshot:
+    """Reads the repos, boards and the items of the boards named in `board_titles`."""
+    snapshot = GitHubSnapshot(repo_ids=github.get_repo_ids(), project_ids={p['title']: p['id'] for p in github.get_all_projects()})
+    for title in set(board_titles):
+        project_id = snapshot.project_ids.get(title)
+        if project_id:
+            snapshot.items[project_id] = {item['content']['title']: item['content'] for item in github.get_project_items(project_id)}
+    return snapshot
+
+
+def build_plan(project_pages: list[dict], features: dict, snapshot: GitHubSnapshot, created: dict = None) -> SyncPlan:
+    """
+    Diffs Notion projects against a GitHub snapshot without any I/O.
+    `features` maps project page ids to their active features. `created` maps project page ids to
+    what an earlier, interrupted run already created for them (a sync job's `created`: "repo",
+    "project", "issue:<feature id>"), so those resources are reused rather than created again.
+    Recorded ids are only trusted while GitHub still has them: repos are always taken from the
+    snapshot, which has the node ids issues are created with, a recorded board must still be in the
+    snapshot, and recorded issues are dropped when their repo is created again.
+    """
+    plan = SyncPlan(repo_ids=dict(snapshot.repo_ids))
+    created = created or {}
+    for project_page in project_pages:
+        page_id, name = project_page['id'], project_name(project_page)
+        repo = repo_name(name)
+        done = created.get(page_id, {})
+
+        # A repo an earlier run recorded but the snapshot lacks was deleted or renamed since; create it
+        # again, and its issues with it.
+        repo_gone = repo not in snapshot.repo_ids
+        if repo_gone:
+            plan.repos.append(CreateRepo(page_id, repo, f"Repo for {name}"))
+
+        project_id = done.get("project")
+        if project_id not in snapshot.project_ids.values():
+            project_id = snapshot.project_ids.get(name)
+        if project_id:
+            plan.board_ids[page_id] = project_id
+        else:
+            plan.projects.append(CreateProject(page_id, name))
+        existing_items = snapshot.items.get(project_id, {})
+
+        for feature in features.get(page_id, []):
+            existing = existing_items.get(feature.name)
+            if existing:
+                if existing['body'] != feature.content:
+                    plan.updates.append(UpdateIssue(page_id, feature.id, existing['id'], feature.name, feature.content))
+                else:
+                    plan.unchanged += 1
+                continue
+            issue_id = None if repo_gone else done.get(f"issue:{feature.id}")
+            if not issue_id:
+                plan.issues.append(CreateIssue(page_id, feature.id, repo, feature.name, feature.content))
+            plan.items.append(AddItem(page_id, feature.id, feature.name, project_id, issue_id))
+    return plan
+
+
+@telemetry.traced("sync_plan.plan_sync")
+def plan_sync(notion, github, project_pages: list[dict], created: dict = None) -> SyncPlan:
+    """Reads Notion features and the GitHub snapshot for `project_pages`, then builds the plan."""
+    features = {page['id']: notion.get_features_for_project(page) for page in project_pages}
+    snapshot = snapshot_github(github, [project_name(page) for page in project_pages])
+    return build_plan(project_pages, features, snapshot, created)
+
+
+# --- Execution ---
+
+def _batches(operations: list, size: int):
+    for start in range(0, len(operations), size):
+        yield operations[start:start + size]
+
+
+def execute_plan(plan: SyncPlan, github, batch_size: int = DEFAULT_BATCH_SIZE,
+                 record: Callable[[str, str, str], None] = None, checkpoint: Callable[[], None] = None) -> dict:
+    """
+    Applies a plan in dependency order: repos, boards, issues, board items, then body updates.
+    Everything but repo creation (REST only) is sent as batched GraphQL mutations.
+    `record(page_id, key, value)` is called for every created resource, under the same keys
+    build_plan reads back from `created`, and `checkpoint()` after every request that created
+    something, so an interrupted run can be re-planned without creating anything twice.
+    """
+    record = record or (lambda page_id, key, value: None)
+    checkpoint = checkpoint or (lambda: None)
+    issue_ids = {}
+
+    def apply(operations, send, on_result):
+        for batch in _batches(operations, batch_size):
+            try:
+                results = send(batch)
+            except BatchMutationError as e:
+                # Keep what succeeded before the error so the retry does not repeat it.
+                results = e.results
+                for op, result in zip(batch, results):
+                    if result is not None:
+                        on_result(op, result)
+                checkpoint()
+                raise
+            for op, result in zip(batch, results):
+                on_result(op, result)
+            checkpoint()
+
+    for op in plan.repos:
+        repo = github.create_repo(op.repo_name, op.description)
+        plan.repo_ids[op.repo_name] = repo.node_id
+        record(op.page_id, "repo", repo.full_name)
+        checkpoint()
+
+    def board_created(op, project_id):
+        plan.board_ids[op.page_id] = project_id
+        record(op.page_id, "project", project_id)
+    apply(plan.projects, lambda batch: github.create_projects([op.title for op in batch]), board_created)
+
+    def issue_created(op, issue_id):
+        issue_ids[op.feature_id] = issue_id
+        record(op.page_id, f"issue:{op.feature_id}", issue_id)
+    apply(plan.issues, lambda batch: github.create_issues(
+        [(plan.repo_ids[op.repo_name], op.title, op.body) for op in batch]), issue_created)
+
+    apply(plan.items, lambda batch: github.add_issues_to_projects(
+        [(op.project_id or plan.board_ids[op.page_id], op.issue_id or issue_ids[op.feature_id]) for op in batch]),
+        lambda op, item_id: None)
+
+    # Updates are low priority and may raise BudgetDeferred; everything created above is already recorded.
+    apply(plan.updates, lambda batch: github.update_issue_bodies([(op.issue_id, op.body) for op in batch]),
+          lambda op, issue_id: None)
+    return plan.counts()
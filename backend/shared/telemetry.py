@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import secrets
+import threading
+import functools
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+# Span kinds, named as in OpenTelemetry. CLIENT spans are outbound calls and are counted per request/run.
+INTERNAL = "INTERNAL"
+SERVER = "SERVER"
+CLIENT = "CLIENT"
+
+# Latency samples kept per span name for percentile reporting.
+MAX_SAMPLES_PER_SPAN = 1024
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+_call_counts: ContextVar[Optional[Counter]] = ContextVar("call_counts", default=None)
+
+
+class JsonSpanExporter:
+    """Writes finished spans as one JSON object per line, using OpenTelemetry's field names."""
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: "Span"):
+        record = {
+            "traceId": span.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_span_id,
+            "name": span.name,
+            "kind": span.kind,
+            "startTimeUnixNano": span.start_time_ns,
+            "endTimeUnixNano": span.end_time_ns,
+            "attributes": span.attributes,
+            "status": {"code": span.status, "message": span.status_message},
+        }
+        with self._lock:
+            self.stream.write(json.dumps(record, default=str) + "\n")
+            self.stream.flush()
+
+
+def _exporter_from_env() -> Optional[JsonSpanExporter]:
+    """TELEMETRY_EXPORT=stdout prints spans; any other value is treated as a file path to append to."""
+    target = os.getenv("TELEMETRY_EXPORT")
+    if not target:
+        return None
+    if target == "stdout":
+        return JsonSpanExporter(sys.stdout)
+    return JsonSpanExporter(open(target, "a"))
+
+
+class LatencyRecorder:
+    """Keeps a bounded window of recent durations per span name and reports percentiles."""
+    def __init__(self, max_samples: int = MAX_SAMPLES_PER_SPAN):
+        self._samples = defaultdict(lambda: deque(maxlen=max_samples))
+        self._counts = Counter()
+        self._errors = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, duration_ms: float, error: bool = False):
+        with self._lock:
+            self._samples[name].append(duration_ms)
+            self._counts[name] += 1
+            if error:
+                self._errors[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            counts, errors = dict(self._counts), dict(self._errors)
+        return {
+            name: {
+                "count": counts[name],
+                "errors": errors.get(name, 0),
+                "p50_ms": _percentile(values, 50),
+                "p90_ms": _percentile(values, 90),
+                "p99_ms": _percentile(values, 99),
+                "max_ms": round(values[-1], 3),
+            }
+            for name, values in samples.items() if values
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
+
+
+def _percentile(sorted_values: list, percentile: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(percentile / 100 * len(sorted_values)) - 1))
+    return round(sorted_values[index], 3)
+
+
+exporter = _exporter_from_env()
+latencies = LatencyRecorder()
+
+
+class Span:
+    """A timed operation. Use span() or traced() rather than creating these directly."""
+    def __init__(self, name: str, kind: str = INTERNAL, attributes: dict = None):
+        parent = _current_span.get()
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.status = "UNSET"
+        self.status_message = ""
+        self.start_time_ns = time.time_ns()
+        self.end_time_ns = None
+        self._start = time.perf_counter()
+        self._token = _current_span.set(self)
+
+        counts = _call_counts.get()
+        if kind == CLIENT and counts is not None:
+            counts[name] += 1
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def end(self, error: BaseException = None):
+        if self.end_time_ns is not None:
+            return
+        self.end_time_ns = time.time_ns()
+        duration_ms = (time.perf_counter() - self._start) * 1000
+        self.attributes["duration_ms"] = round(duration_ms, 3)
+        if error is not None:
+            self.status, self.status_message = "ERROR", str(error)
+        elif self.status == "UNSET":
+            self.status = "OK"
+        _current_span.reset(self._token)
+        latencies.record(self.name, duration_ms, error=error is not None)
+        if exporter:
+            exporter.export(self)
+
+
+def start_span(name: str, kind: str = INTERNAL, **attributes) -> Span:
+    """Starts a span that becomes the parent of spans opened until end() is called (in the same context)."""
+    return Span(name, kind, attributes)
+
+
+@contextmanager
+def span(name: str, kind: str = INTERNAL, **attributes):
+    current = start_span(name, kind, **attributes)
+    try:
+        yield current
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    current.end()
+
+
+def traced(name: str, kind: str = INTERNAL):
+    """Decorator that wraps every call of the function in a span."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_call_accounting():
+    """Starts counting outbound (CLIENT) calls for the current request or worker run. Returns a reset token."""
+    return _call_counts.set(Counter())
+
+
+def current_call_counts() -> dict:
+    counts = _call_counts.get()
+    return dict(counts) if counts is not None else {}
+
+
+def stop_call_accounting(token) -> dict:
+    """Stops counting and returns {span name: outbound call count}."""
+    counts = current_call_counts()
+    _call_counts.reset(token)
+    return counts
+
+
+def metrics_snapshot() -> dict:
+    return {"spans": latencies.snapshot()}
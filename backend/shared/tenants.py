@@ -0,0 +1,135 @@
+import os
+import re
+import json
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional
+
+from shared.secrets import get_secret
+from shared.notion_client import NotionClient
+
+# The tenant of a single-workspace deployment. It reads the deployment-wide secrets, so a
+# deployment without a TENANTS setting behaves exactly as before.
+DEFAULT_TENANT = "default"
+# Notion databases a tenant's dashboard and sync read, named like the single-workspace secrets.
+DATABASE_KEYS = ("PROJECTS_DB_ID", "CRM_DB_ID", "TASKS_DB_ID", "STAKEHOLDER_DB_ID")
+DASHBOARD_ONLY_DATABASE_KEYS = ("CRM_DB_ID", "TASKS_DB_ID", "STAKEHOLDER_DB_ID")
+
+_TENANT_ID = re.compile(r"^[a-z0-9][a-z0-9_-]*$")
+
+
+@dataclass
+class TenantConfig:
+    """
+    One client team's Notion workspace. `databases` maps DATABASE_KEYS to database ids and `secrets`
+    maps secret names (NOTION_API_KEY, NOTION_WEBHOOK_SECRET, ...) to the secret ids holding this
+    tenant's values. Anything not listed is read from `<TENANT ID>_<NAME>` (e.g. ACME_NOTION_API_KEY);
+    the default tenant reads the unprefixed deployment-wide secrets.
+    """
+    id: str
+    name: str = ""
+    databases: dict = field(default_factory=dict)
+    secrets: dict = field(default_factory=dict)
+
+    def secret_id(self, name: str) -> str:
+        if name in self.secrets:
+            return self.secrets[name]
+        if self.id == DEFAULT_TENANT:
+            return name
+        return f"{self.id.upper().replace('-', '_')}_{name}"
+
+    def secret(self, name: str, project_id: str = None) -> str:
+        return get_secret(self.secret_id(name), project_id=project_id)
+
+    def optional_secret(self, name: str, project_id: str = None) -> Optional[str]:
+        try:
+            return self.secret(name, project_id)
+        except Exception:
+            return None
+
+    def database_id(self, key: str, project_id: str = None) -> str:
+        return self.databases.get(key) or self.secret(key, project_id)
+
+    def dashboard_only_database_ids(self, project_id: str = None) -> set:
+        """Ids of the databases that only feed the dashboard (never GitHub), for webhook routing."""
+        ids = set()
+        for key in DASHBOARD_ONLY_DATABASE_KEYS:
+            try:
+                ids.add(self.database_id(key, project_id))
+            except Exception:
+                continue
+        return ids
+
+    def notion_client(self, project_id: str = None) -> NotionClient:
+        # The default tenant resolves database ids lazily from the shared secrets, as before.
+        database_ids = None if self.id == DEFAULT_TENANT and not self.databases else {
+            key: self.database_id(key, project_id) for key in DATABASE_KEYS
+        }
+        return NotionClient(
+            api_key=self.secret("NOTION_API_KEY", project_id),
+            projects_db_id=self.database_id("PROJECTS_DB_ID", project_id),
+            database_ids=database_ids,
+        )
+
+
+def _parse_tenants(raw: str) -> dict:
+    """TENANTS is either a comma-separated list of tenant ids or a JSON list of TenantConfig fields."""
+    raw = raw.strip()
+    entries = json.loads(raw) if raw.startswith("[") else [item.strip() for item in raw.split(",") if item.strip()]
+    tenants = {}
+    for entry in entries:
+        tenant = TenantConfig(id=entry) if isinstance(entry, str) else TenantConfig(**entry)
+        if not _TENANT_ID.match(tenant.id):
+            raise ValueError(f"Invalid tenant id '{tenant.id}': use lowercase letters, digits, '-' and '_'.")
+        tenants[tenant.id] = tenant
+    return tenants
+
+
+def load_tenants(project_id: str = None) -> dict:
+    """Reads the TENANTS secret (tenant id -> TenantConfig). Without it there is one, default tenant."""
+    try:
+        raw = get_secret("TENANTS", project_id=project_id)
+    except Exception:
+        raw = None
+    if not raw:
+        return {DEFAULT_TENANT: TenantConfig(DEFAULT_TENANT)}
+    return _parse_tenants(raw)
+
+
+def tenant_path(path: str, tenant_id: str) -> str:
+    """Per-tenant variant of a state file path: mirror.db -> mirror-acme.db. The default tenant keeps `path`."""
+    if tenant_id == DEFAULT_TENANT:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{tenant_id}{ext}"
+
+
+# --- Sharding ---
+
+def shard_of(tenant_id: str, shards: int) -> int:
+    """Stable shard assignment; adding or removing a tenant never moves the others."""
+    return zlib.crc32(tenant_id.encode("utf-8")) % shards
+
+
+def select_tenants(tenants: dict, tenant_ids: list[str] = None, shard: int = 0, shards: int = 1) -> list[TenantConfig]:
+    """The tenants one worker handles: the named ones (all by default) that fall in its shard."""
+    if not 0 <= shard < shards:
+        raise ValueError(f"Shard {shard} is outside 0..{shards - 1}.")
+    unknown = set(tenant_ids or []) - set(tenants)
+    if unknown:
+        raise ValueError(f"Unknown tenant(s): {sorted(unknown)}")
+    selected = [tenants[tenant_id] for tenant_id in (tenant_ids or tenants)]
+    return [tenant for tenant in selected if shard_of(tenant.id, shards) == shard]
+
+
+# --- Queue keys ---
+# Webhook queue keys (see shared.webhooks) are prefixed with their tenant, so one queue can carry
+# events for every tenant and the handler can sync each tenant's keys against its own workspace.
+
+def scope_key(tenant_id: str, key: str) -> str:
+    return f"{tenant_id}/{key}"
+
+
+def split_scoped_key(scoped_key: str) -> tuple[str, str]:
+    tenant_id, _, key = scoped_key.partition("/")
+    return tenant_id, key
@@ -0,0 +1,60 @@
+import hmac
+import hashlib
+
+# Queue keys produced from webhook events. The sync worker resolves them to Notion projects.
+NOTION_PAGE = "notion_page"          # a project, quality characteristic or feature page changed
+NOTION_DATA = "notion_data"          # a dashboard-only database (tasks, CRM, stakeholders) changed
+GITHUB_REPO = "repo"                 # an issue changed in this repository
+GITHUB_PROJECT = "github_project"    # an item changed in this Projects V2 board
+
+GITHUB_EVENTS = {"issues", "projects_v2_item"}
+
+
+def make_key(kind: str, value: str) -> str:
+    return f"{kind}:{value}"
+
+
+def split_key(key: str) -> tuple[str, str]:
+    kind, _, value = key.partition(":")
+    return kind, value
+
+
+def verify_signature(secret: str, body: bytes, signature_header: str) -> bool:
+    """
+    Checks a `sha256=<hex hmac>` signature header over the raw request body.
+    GitHub (X-Hub-Signature-256) and Notion (X-Notion-Signature) both sign this way.
+    """
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header[len("sha256="):])
+
+
+def keys_from_github_event(event_name: str, payload: dict) -> list[str]:
+    """Maps an `issues` or `projects_v2_item` webhook to queue keys. Other events are ignored."""
+    if event_name == "issues":
+        repo_name = (payload.get("repository") or {}).get("name")
+        return [make_key(GITHUB_REPO, repo_name)] if repo_name else []
+    if event_name == "projects_v2_item":
+        project_node_id = (payload.get("projects_v2_item") or {}).get("project_node_id")
+        return [make_key(GITHUB_PROJECT, project_node_id)] if project_node_id else []
+    return []
+
+
+def keys_from_notion_event(payload: dict, dashboard_only_db_ids: set) -> list[str]:
+    """
+    Maps a Notion page event (page.created, page.properties_updated, page.content_updated, ...)
+    to queue keys. Pages in `dashboard_only_db_ids` never affect GitHub, so they only mark data as changed.
+    """
+    entity = payload.get("entity") or {}
+    if not payload.get("type", "").startswith("page.") or entity.get("type") != "page":
+        return []
+    parent_id = ((payload.get("data") or {}).get("parent") or {}).get("id")
+    if parent_id and _normalize_id(parent_id) in {_normalize_id(db_id) for db_id in dashboard_only_db_ids}:
+        return [make_key(NOTION_DATA, parent_id)]
+    return [make_key(NOTION_PAGE, entity["id"])]
+
+
+def _normalize_id(notion_id: str) -> str:
+    """Notion ids appear both with and without dashes."""
+    return notion_id.replace("-", "")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the backend packages (shared, workers, benchmarks) the same way the workers do.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,99 @@
+"""
+In-memory stand-in for the part of google.cloud.firestore the stores use: documents, transactions,
+single-field queries and get_all. Writes inside a transaction apply at once, which is enough for
+tests that run one transaction at a time. Stores that call `self._firestore.transactional` get
+this module assigned as `_firestore`.
+"""
+import operator
+from copy import deepcopy
+
+_OPERATORS = {"==": operator.eq, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+
+
+def transactional(func):
+    return func
+
+
+class FakeSnapshot:
+    def __init__(self, doc_id: str, data):
+        self.id, self._data = doc_id, data
+        self.exists = data is not None
+
+    def to_dict(self):
+        return deepcopy(self._data)
+
+
+class FakeDocument:
+    def __init__(self, collection, doc_id: str):
+        self.collection, self.id = collection, doc_id
+
+    def get(self, transaction=None):
+        return FakeSnapshot(self.id, self.collection.documents.get(self.id))
+
+    def set(self, data: dict, merge: bool = False):
+        current = self.collection.documents.get(self.id) if merge else None
+        self.collection.documents[self.id] = dict(current or {}, **deepcopy(data))
+
+    def update(self, data: dict):
+        self.set(data, merge=True)
+
+    def delete(self):
+        self.collection.documents.pop(self.id, None)
+
+
+class FakeQuery:
+    def __init__(self, collection, filters=(), order=None, count=None):
+        self._collection, self._filters, self._order, self._count = collection, filters, order, count
+
+    def where(self, field: str, op: str, value):
+        return FakeQuery(self._collection, self._filters + ((field, op, value),), self._order, self._count)
+
+    def order_by(self, field: str):
+        return FakeQuery(self._collection, self._filters, field, self._count)
+
+    def limit(self, count: int):
+        return FakeQuery(self._collection, self._filters, self._order, count)
+
+    def stream(self):
+        matches = []
+        for doc_id, data in list(self._collection.documents.items()):
+            # Like Firestore, documents without a (non-null) value never match a filter on the field.
+            if all(data.get(field) is not None and _OPERATORS[op](data[field], value) for field, op, value in self._filters):
+                matches.append(FakeSnapshot(doc_id, data))
+        if self._order:
+            matches = sorted((m for m in matches if m._data.get(self._order) is not None), key=lambda m: m._data[self._order])
+        return iter(matches[:self._count] if self._count is not None else matches)
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self):
+        super().__init__(self)
+        self.documents = {}
+
+    def document(self, doc_id: str) -> FakeDocument:
+        return FakeDocument(self, doc_id)
+
+
+class FakeTransaction:
+    def set(self, ref: FakeDocument, data: dict, merge: bool = False):
+        ref.set(data, merge=merge)
+
+    def update(self, ref: FakeDocument, data: dict):
+        ref.update(data)
+
+    def delete(self, ref: FakeDocument):
+        ref.delete()
+
+
+class FakeFirestoreClient:
+    def __init__(self):
+        self.collections = {}
+
+    def collection(self, name: str) -> FakeCollection:
+        return self.collections.setdefault(name, FakeCollection())
+
+    def transaction(self) -> FakeTransaction:
+        return FakeTransaction()
+
+    def get_all(self, refs):
+        return [ref.get() for ref in refs]
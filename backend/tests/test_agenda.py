@@ -0,0 +1,72 @@
+import time
+from datetime import date
+
+from shared.agenda import AgendaPromptBuilder, FakeGenerativeModel, PromptCache, build_agenda_prompt, estimate_tokens
+from shared.data_models import DashboardData, Project, Task
+from shared.generative_ai_client import GenerativeAIClient
+
+
+def _dashboard(task_count: int = 3) -> DashboardData:
+    return DashboardData(
+        projects=[Project(id="p1", project_name="Synapse", description="", status="Active", stage="Build", manager="",
+                          customer="", process_step="", characteristics=[])],
+        tasks=[Task(id=f"t{i}", title=f"Task {i}", type="Development", status="Open", priority="High" if i == 0 else "Low")
+               for i in range(task_count)],
+    )
+
+
+def test_identical_prompts_are_answered_from_the_cache(tmp_path):
+    model = FakeGenerativeModel()
+    client = GenerativeAIClient(model=model, cache=PromptCache(str(tmp_path / "agenda.json")))
+    prompt = build_agenda_prompt(_dashboard(), today=date(2025, 6, 2))
+
+    first = client.generate_meeting_agenda(prompt)
+    second = client.generate_meeting_agenda(prompt)
+
+    assert first == second
+    assert "- Synapse: Status is Active" in first
+    assert model.calls == 1
+    stats = client.cache.stats
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+    assert stats["tokens_saved"] == estimate_tokens(prompt) + estimate_tokens(first)
+
+
+def test_cache_survives_a_restart_and_only_writes_on_put(tmp_path):
+    path = tmp_path / "agenda.json"
+    cache = PromptCache(str(path))
+    cache.put("week-1", "agenda one")
+    written = path.stat().st_mtime_ns
+
+    assert cache.get("week-1", "prompt") == "agenda one"
+    assert cache.get("week-2", "prompt") is None
+    assert path.stat().st_mtime_ns == written
+
+    assert PromptCache(str(path)).get("week-1", "prompt") == "agenda one"
+
+
+def test_cache_evicts_least_recently_used_and_expired_entries(tmp_path):
+    cache = PromptCache(str(tmp_path / "agenda.json"), max_entries=2)
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.get("a", "prompt")
+    cache.put("c", "C")
+    assert (cache.get("a", "p"), cache.get("b", "p"), cache.get("c", "p")) == ("A", None, "C")
+
+    expiring = PromptCache(str(tmp_path / "expiring.json"), max_age_days=1)
+    expiring.put("old", "stale agenda")
+    expiring._data["entries"]["old"]["stored_at"] = time.time() - 2 * 86400
+    assert expiring.get("old", "prompt") is None
+    assert len(expiring) == 0
+
+
+def test_builder_trims_lowest_scoring_items_to_the_budget():
+    builder = AgendaPromptBuilder(max_tokens=150)
+    builder.add_section("Tasks")
+    for i in range(50):
+        builder.add_item(f"Low priority task number {i}", score=1.0)
+    builder.add_item("Urgent task", score=9.0)
+
+    prompt = builder.build()
+    assert "- Urgent task" in prompt
+    assert "lower-priority items omitted" in prompt
+    assert estimate_tokens(prompt) <= builder.max_tokens
@@ -0,0 +1,86 @@
+from shared.calendar_client import KEY_PROPERTY, CalendarClient
+
+
+class _Request:
+    def __init__(self, service, method, **kwargs):
+        self.service, self.method, self.kwargs = service, method, kwargs
+
+    def execute(self):
+        self.service.round_trips += 1
+        return self.service.respond(self)
+
+
+class _Batch:
+    def __init__(self, service, callback):
+        self.service, self.callback, self.requests = service, callback, []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.service.round_trips += 1
+        for request_id, request in self.requests:
+            self.callback(request_id, self.service.respond(request), None)
+
+
+class _Events:
+    def __init__(self, service):
+        self.service = service
+
+    def insert(self, **kwargs):
+        return _Request(self.service, "insert", **kwargs)
+
+    def patch(self, **kwargs):
+        return _Request(self.service, "patch", **kwargs)
+
+    def list(self, **kwargs):
+        return _Request(self.service, "list", **kwargs)
+
+
+class FakeCalendarService:
+    """Stands in for the discovery-built service: keeps events in a dict and counts round trips."""
+    def __init__(self):
+        self.events_by_id = {}
+        self.round_trips = 0
+
+    def events(self):
+        return _Events(self)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+    def respond(self, request):
+        if request.method == "list":
+            return {"items": list(self.events_by_id.values())}
+        if request.method == "insert":
+            event = dict(request.kwargs["body"], id=f"event-{len(self.events_by_id) + 1}")
+        else:
+            event = dict(self.events_by_id[request.kwargs["eventId"]], **request.kwargs["body"])
+        self.events_by_id[event["id"]] = event
+        return event
+
+
+def _client(service) -> CalendarClient:
+    client = CalendarClient.__new__(CalendarClient)
+    client.service = service
+    return client
+
+
+def _meeting(key: str, description: str = "Agenda") -> dict:
+    return {"key": key, "summary": key, "description": description, "start_time": "2025-03-03T09:00:00Z",
+            "end_time": "2025-03-03T10:00:00Z", "attendees": ["a@example.com"]}
+
+
+def test_rerun_updates_the_scheduled_meetings_in_one_batch():
+    service = FakeCalendarService()
+    calendar = _client(service)
+    calendar.schedule_events([_meeting("weekly"), _meeting("project-1"), _meeting("project-2")])
+    assert service.round_trips == 2  # the lookup, then one batch of inserts
+
+    service.round_trips = 0
+    results = calendar.schedule_events([_meeting("weekly", "New agenda"), _meeting("project-1"), _meeting("project-3")])
+
+    assert service.round_trips == 3  # the lookup, one batch of patches, one lone insert
+    assert [event["extendedProperties"]["private"][KEY_PROPERTY] for event in results] == ["weekly", "project-1", "project-3"]
+    assert len(service.events_by_id) == 4
+    assert service.events_by_id["event-1"]["description"] == "New agenda"
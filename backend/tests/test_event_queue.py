@@ -0,0 +1,54 @@
+import threading
+import time
+
+from shared.event_queue import CoalescingQueue
+
+
+def _queue(**kwargs):
+    batches, flushed = [], threading.Event()
+
+    def handler(batch):
+        batches.append(sorted(batch))
+        flushed.set()
+
+    return CoalescingQueue(handler, **kwargs), batches, flushed
+
+
+def test_repeated_keys_coalesce_and_each_key_flushes_once_quiet():
+    queue, batches, _ = _queue(debounce_seconds=0.3, max_delay_seconds=5)
+    queue.submit(["project:a", "project:b"])
+    time.sleep(0.15)
+    queue.submit(["project:a", "project:a"])
+    time.sleep(0.6)
+
+    # project:b went quiet first; the repeats of project:a only postponed project:a, and ran once.
+    assert batches == [["project:b"], ["project:a"]]
+    assert (queue.stats["submitted"], queue.stats["coalesced"]) == (4, 2)
+    queue.stop(timeout=1)
+
+
+def test_a_steady_stream_of_edits_is_flushed_at_the_max_delay():
+    queue, batches, flushed = _queue(debounce_seconds=0.3, max_delay_seconds=0.5)
+    started = time.monotonic()
+    while not flushed.is_set() and time.monotonic() - started < 2:
+        queue.submit(["project:a"])
+        time.sleep(0.05)
+
+    assert flushed.is_set() and time.monotonic() - started < 1
+    assert batches[0] == ["project:a"]
+    queue.stop(timeout=1)
+
+
+def test_stop_flushes_what_is_pending_and_reports_what_it_could_not():
+    queue, batches, _ = _queue(debounce_seconds=60, max_delay_seconds=60)
+    queue.submit(["project:a"])
+    assert queue.stop(timeout=2) == []
+    assert batches == [["project:a"]]
+
+    release = threading.Event()
+    slow = CoalescingQueue(lambda batch: release.wait(5), debounce_seconds=0, max_delay_seconds=0)
+    slow.submit(["project:a"])
+    time.sleep(0.1)  # the first batch is now running and blocks
+    slow.submit(["project:b"])
+    assert slow.stop(timeout=0.2) == ["project:b"]
+    release.set()
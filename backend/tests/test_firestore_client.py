@@ -0,0 +1,22 @@
+import fake_firestore
+from shared import firestore_client
+from shared.firestore_client import FirestoreClient
+
+
+def _client(monkeypatch) -> FirestoreClient:
+    monkeypatch.setattr(firestore_client.firestore, "transactional", fake_firestore.transactional)
+    client = FirestoreClient.__new__(FirestoreClient)
+    client.db = fake_firestore.FakeFirestoreClient()
+    client.webhook_verifications = client.db.collection("webhook_verifications")
+    return client
+
+
+def test_first_verification_token_wins_and_is_handed_out_once(monkeypatch):
+    client = _client(monkeypatch)
+
+    assert client.save_webhook_verification("acme", "notion", "secret_from_notion")
+    # An unauthenticated handshake posted later cannot replace it, before or after it is claimed.
+    assert not client.save_webhook_verification("acme", "notion", "secret_from_attacker")
+    assert client.pop_webhook_verification("acme", "notion") == "secret_from_notion"
+    assert not client.save_webhook_verification("acme", "notion", "secret_from_attacker")
+    assert client.pop_webhook_verification("acme", "notion") is None
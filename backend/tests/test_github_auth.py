@@ -0,0 +1,114 @@
+import os
+import stat
+import threading
+import time
+
+import pytest
+from cryptography.fernet import Fernet
+
+import fake_firestore
+from shared.github_auth import (EncryptedFileTokenCache, FirestoreTokenCache, GitHubToken, GitHubTokenManager,
+                                MemoryTokenCache, OAuthTokenProvider)
+
+
+class CountingProvider:
+    """Hands out a new token per fetch, slowly, so concurrent refreshes would overlap."""
+    cache_key = "app-1-2"
+
+    def __init__(self, lifetime: float = 3600):
+        self.lifetime = lifetime
+        self.fetches = 0
+
+    def fetch(self, cached):
+        time.sleep(0.05)
+        self.fetches += 1
+        return GitHubToken(token=f"token-{self.fetches}", expires_at=time.time() + self.lifetime, source="test")
+
+
+def test_token_is_reused_until_it_nears_expiry():
+    provider = CountingProvider()
+    manager = GitHubTokenManager(provider, MemoryTokenCache(), refresh_margin=600)
+
+    assert manager.get_token() == manager.get_token() == "token-1"
+    # Ten minutes from expiry the token is renewed, before a sync job could outlive it.
+    manager._token.expires_at = time.time() + 599
+    assert manager.get_token() == "token-2"
+    assert provider.fetches == 2
+
+
+def test_concurrent_workers_refresh_once_and_share_the_token(tmp_path):
+    key = Fernet.generate_key().decode("ascii")
+    provider = CountingProvider()
+    managers = [GitHubTokenManager(provider, EncryptedFileTokenCache(str(tmp_path), key)) for _ in range(4)]
+    tokens = []
+    threads = [threading.Thread(target=lambda m=m: tokens.append(m.get_token())) for m in managers for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert provider.fetches == 1
+    assert set(tokens) == {"token-1"}
+
+
+def test_file_cache_round_trips_encrypted_and_private(tmp_path):
+    key = Fernet.generate_key().decode("ascii")
+    cache = EncryptedFileTokenCache(str(tmp_path), key)
+    token = GitHubToken(token="ghu_secret", expires_at=time.time() + 60, refresh_token="ghr_secret", source="refresh_token")
+    cache.store("oauth-client", token)
+
+    path = os.path.join(str(tmp_path), "oauth-client.token")
+    assert b"ghu_secret" not in open(path, "rb").read()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert cache.load("oauth-client") == token
+    # A different key (e.g. after rotation) reads nothing instead of failing.
+    assert EncryptedFileTokenCache(str(tmp_path), Fernet.generate_key().decode("ascii")).load("oauth-client") is None
+
+
+def _firestore_cache(db, key: str, lock_timeout: float = 30.0) -> FirestoreTokenCache:
+    cache = FirestoreTokenCache(key, db=db, lock_timeout=lock_timeout)
+    cache._firestore = fake_firestore
+    return cache
+
+
+def test_firestore_cache_round_trips_and_leases_the_refresh_lock():
+    db, key = fake_firestore.FakeFirestoreClient(), Fernet.generate_key().decode("ascii")
+    holder, waiter = _firestore_cache(db, key), _firestore_cache(db, key, lock_timeout=0.3)
+    token = GitHubToken(token="ghs_secret", expires_at=time.time() + 3600, source="github_app")
+    holder.store("app-1-2", token)
+
+    assert "ghs_secret" not in str(db.collection("github_tokens").documents)
+    assert waiter.load("app-1-2") == token
+    with holder.lock("app-1-2"):
+        with pytest.raises(TimeoutError):
+            with waiter.lock("app-1-2"):
+                pass
+    with waiter.lock("app-1-2"):
+        assert waiter.load("app-1-2") == token
+
+
+def test_firestore_lock_left_by_a_crashed_worker_expires():
+    db, key = fake_firestore.FakeFirestoreClient(), Fernet.generate_key().decode("ascii")
+    crashed = _firestore_cache(db, key, lock_timeout=0.1)
+    crashed.lock("app-1-2").__enter__()  # never released
+
+    with _firestore_cache(db, key, lock_timeout=2).lock("app-1-2"):
+        pass
+
+
+def test_oauth_refresh_uses_the_rotated_refresh_token_from_the_cache(monkeypatch):
+    provider = OAuthTokenProvider("client", "secret", refresh_token="ghr_initial")
+    used = []
+
+    def refresh(refresh_token):
+        used.append(refresh_token)
+        return GitHubToken(token=f"ghu_{len(used)}", expires_at=time.time() + 28800, refresh_token=f"ghr_{len(used)}")
+
+    monkeypatch.setattr(provider, "_refresh", refresh)
+    manager = GitHubTokenManager(provider, MemoryTokenCache())
+    manager.get_token()
+    manager._token.expires_at = time.time()
+    manager.cache.load(provider.cache_key).expires_at = time.time()
+
+    assert manager.get_token() == "ghu_2"
+    assert used == ["ghr_initial", "ghr_1"]
@@ -0,0 +1,74 @@
+import time
+
+import pytest
+
+from benchmarks.fake_servers import FakeGitHubServer
+from benchmarks.fake_workspace import GitHubState
+from shared.github_client import GitHubClient, OPERATION_RESOURCES
+from shared.rate_budget import GRAPHQL, LOW, BudgetDeferred, RateLimitBudget
+
+
+@pytest.fixture
+def github_server():
+    with FakeGitHubServer(state=GitHubState()) as server:
+        yield server
+
+
+def _client(server: FakeGitHubServer) -> GitHubClient:
+    return GitHubClient(token="test-github-token", base_url=server.api_url, fetch_schema=False,
+                        seconds_between_requests=0, seconds_between_writes=0)
+
+
+def test_batch_costs_are_recorded_under_the_planned_operation_names(github_server):
+    github = _client(github_server)
+    repo_id = github.create_repo("synapse-test", "Test repository").node_id
+    project_ids = github.create_projects(["Board A", "Board B"])
+    issue_ids = github.create_issues([(repo_id, "Issue 1", "Body"), (repo_id, "Issue 2", "Body")])
+    github.add_issues_to_projects([(project_ids[0], issue_id) for issue_id in issue_ids])
+    github.update_issue_bodies([(issue_ids[0], "New body")])
+
+    operations = github.budget.snapshot()["operations"]
+    for operation in ("create_projects", "create_issues", "add_issues_to_projects", "update_issue_bodies"):
+        assert operation in OPERATION_RESOURCES
+        assert operations[operation]["calls"] == 1
+
+
+def test_exhausted_rate_limit_defers_until_the_reset_instead_of_sleeping(github_server):
+    github = _client(github_server)
+    github.create_repo("synapse-test", "Test repository")
+    # The window's REST calls are used up and it resets in an hour, past the budget's longest wait.
+    github_server.rate_limit = github_server.rate_limit_used["core"]
+
+    started = time.monotonic()
+    with pytest.raises(BudgetDeferred) as deferred:
+        github.get_all_repos()
+    assert time.monotonic() - started < 5
+    assert deferred.value.retry_at == github_server.rate_limit_reset
+
+
+def test_batched_mutations_are_charged_one_each(github_server):
+    github = _client(github_server)
+    repo_id = github.create_repo("synapse-test", "Test repository").node_id
+    used = github.budget.snapshot()["resources"].get("graphql", {}).get("used", 0)
+    issue_ids = github.create_issues([(repo_id, f"Issue {i}", "Body") for i in range(5)])
+
+    snapshot = github.budget.snapshot()
+    assert snapshot["resources"]["graphql"]["used"] - used == len(issue_ids) == 5
+    assert snapshot["operations"]["create_issues"] == {"calls": 1, "average_cost": 1.0}
+    # A plan is predicted per mutation, so 20 planned issues cost 20 whatever the batch size.
+    assert github.estimate({"create_issues": 20}) == {"graphql": 20}
+
+
+def test_a_batch_is_paced_and_reserved_for_all_its_mutations():
+    budget = RateLimitBudget(reserve_fraction=0.1)
+    budget.update(GRAPHQL, remaining=120, limit=1000, reset_at=time.time() + 3600)
+    # A single low-priority call would fit above the 100-point reserve; a batch of 25 would not.
+    with pytest.raises(BudgetDeferred):
+        budget.before_call(GRAPHQL, LOW, cost=25)
+    budget.before_call(GRAPHQL, LOW, cost=1)
+
+    paced = RateLimitBudget(min_write_interval=0.05)
+    paced.before_call(GRAPHQL, write=True, cost=4)
+    started = time.monotonic()
+    paced.before_call(GRAPHQL, write=True)
+    assert time.monotonic() - started >= 0.15
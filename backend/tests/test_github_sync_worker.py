@@ -0,0 +1,78 @@
+from shared.job_store import InMemoryJobStore, DONE, QUEUED
+from shared.name_claims import InMemoryNameClaims, NameGuard
+from workers import github_sync_worker
+
+
+def _store(*page_ids) -> InMemoryJobStore:
+    store = InMemoryJobStore()
+    for page_id in page_ids:
+        github_sync_worker.enqueue_projects(store, [{"id": page_id}])
+    return store
+
+
+def test_targeted_drain_leaves_the_rest_of_the_queue(monkeypatch):
+    store = _store("project-a", "project-b", "project-c")
+    synced = []
+    monkeypatch.setattr(github_sync_worker, "sync_jobs", lambda notion, github, jobs, *args: synced.extend(j.id for j in jobs))
+
+    results = github_sync_worker.drain(store, None, None, job_ids=["project-b", "project-x"])
+
+    assert synced == ["project-b"] and results["done"] == 1
+    assert {job.id: job.status for job in store.list_jobs()} == {"project-a": QUEUED, "project-b": DONE, "project-c": QUEUED}
+
+
+def test_targeted_drain_reruns_a_job_changed_while_it_ran(monkeypatch):
+    store = _store("project-a")
+    batches = []
+
+    def sync_jobs(notion, github, jobs, *args):
+        batches.append([job.payload["project_page"].get("edit") for job in jobs])
+        if len(batches) == 1:
+            # Another API worker process queues a newer version of the project mid-sync.
+            github_sync_worker.enqueue_projects(store, [{"id": "project-a", "edit": 2}])
+
+    monkeypatch.setattr(github_sync_worker, "sync_jobs", sync_jobs)
+    github_sync_worker.drain(store, None, None, job_ids=["project-a"])
+
+    assert batches == [[None], [2]]
+    assert store.get("project-a").status == DONE
+
+
+def test_drain_refuses_projects_named_like_another_tenants(monkeypatch):
+    claims = InMemoryNameClaims()
+    claims.claim("acme", ["repo:website", "board:Website"])
+    store = InMemoryJobStore()
+    github_sync_worker.enqueue_projects(store, [
+        {"id": "project-a", "properties": {"Project Name": {"title": [{"plain_text": "Website"}]}}},
+        {"id": "project-b", "properties": {"Project Name": {"title": [{"plain_text": "Mobile App"}]}}},
+    ])
+    synced = []
+    monkeypatch.setattr(github_sync_worker, "sync_jobs", lambda notion, github, jobs, *args: synced.extend(j.id for j in jobs))
+
+    results = github_sync_worker.drain(store, None, None, guard=NameGuard("globex", claims))
+
+    assert synced == ["project-b"]
+    assert (results["done"], results["refused"]) == (1, 1)
+    assert "owned by another tenant" in store.get("project-a").last_error
+
+
+def test_targeted_sync_uses_the_tenants_workspace_and_queue(monkeypatch):
+    built = {}
+
+    def build_clients(notion, github, tenant=None):
+        built["tenant"] = tenant
+        return None, None
+
+    def get_job_store(tenant_id=None):
+        built["store"] = tenant_id
+        return InMemoryJobStore()
+
+    monkeypatch.setattr(github_sync_worker, "load_tenants", lambda project_id=None: {})
+    monkeypatch.setattr(github_sync_worker, "_build_clients", build_clients)
+    monkeypatch.setattr(github_sync_worker, "get_job_store", get_job_store)
+    monkeypatch.setattr(github_sync_worker, "resolve_projects", lambda notion, github, keys: [])
+    monkeypatch.setattr(github_sync_worker, "log_action", lambda *args: None)
+
+    github_sync_worker.sync_targets(["page-1"], tenant_id="acme", drain_now=False)
+
+    assert (built["tenant"].id, built["store"]) == ("acme", "acme")
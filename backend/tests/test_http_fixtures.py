@@ -0,0 +1,50 @@
+import os
+
+import requests
+
+from shared import http_fixtures
+
+
+def test_form_encoded_bodies_are_redacted():
+    body = b"access_token=gho_secret&scope=repo&refresh_token=ghr_secret"
+    redacted = http_fixtures._redact_body(body, "application/x-www-form-urlencoded; charset=utf-8")
+
+    assert b"secret" not in redacted
+    assert b"scope=repo" in redacted
+    # Bodies of other types are left alone.
+    assert http_fixtures._redact_body(body, "text/plain") == body
+
+
+def test_request_key_ignores_form_encoded_secrets():
+    def token_request(code: str) -> requests.PreparedRequest:
+        return requests.Request("POST", "https://github.com/login/oauth/access_token",
+                                data={"client_id": "id", "code": code, "grant_type": "authorization_code"}).prepare()
+
+    assert http_fixtures.request_key(token_request("first")) == http_fixtures.request_key(token_request("second"))
+
+
+def test_recording_from_the_environment_writes_one_file_per_process(monkeypatch, tmp_path):
+    monkeypatch.setenv("HTTP_FIXTURES_MODE", "record")
+    monkeypatch.setenv("HTTP_FIXTURES_PATH", str(tmp_path / "traffic.jsonl.gz"))
+    try:
+        recorder = http_fixtures.install_from_env()
+    finally:
+        http_fixtures.uninstall()
+
+    assert recorder.path == str(tmp_path / f"traffic-{os.getpid()}.jsonl.gz")
+    assert http_fixtures.read_fixture(recorder.path)[1] == []
+
+
+def test_error_codes_are_kept_and_oauth_codes_redacted():
+    error = b'{"object":"error","status":404,"code":"object_not_found","errors":[{"extensions":{"code":"NOT_FOUND"}}]}'
+    assert http_fixtures._redact_body(error, "application/json") == error
+
+    exchange = b'{"client_id":"id","client_secret":"secret","code":"oauth-code"}'
+    assert b"oauth-code" not in http_fixtures._redact_body(exchange, "application/json", oauth=True)
+    assert "oauth-code" not in http_fixtures.redact_url("https://example.com/callback?code=oauth-code&state=1")
+
+    def json_exchange(code: str) -> requests.PreparedRequest:
+        return requests.Request("POST", "https://github.com/login/oauth/access_token",
+                                json={"client_id": "id", "code": code}).prepare()
+
+    assert http_fixtures.request_key(json_exchange("first")) == http_fixtures.request_key(json_exchange("second"))
@@ -0,0 +1,69 @@
+import time
+
+import pytest
+
+import fake_firestore
+from shared.job_store import DONE, QUEUED, RUNNING, FirestoreJobStore, LeaseLostError
+
+
+def _store(db) -> FirestoreJobStore:
+    store = FirestoreJobStore(db=db)
+    store._firestore = fake_firestore
+    return store
+
+
+def test_a_leased_job_is_not_leased_again_until_finished():
+    store = _store(fake_firestore.FakeFirestoreClient())
+    store.enqueue("project-a", {"n": 1})
+    store.enqueue("project-b", {"n": 2})
+
+    first, second = store.lease("worker-1"), store.lease("worker-2")
+    assert {first.id, second.id} == {"project-a", "project-b"}
+    assert store.lease("worker-3") is None
+
+    first.created["repo"] = "acme/website"
+    store.complete(first)
+    done = store.get(first.id)
+    assert (done.status, done.created, done.available_at) == (DONE, {"repo": "acme/website"}, None)
+    assert store.get(second.id).status == RUNNING
+
+
+def test_an_expired_lease_is_taken_over_and_the_old_owner_loses_it():
+    db = fake_firestore.FakeFirestoreClient()
+    first_worker, second_worker = _store(db), _store(db)
+    first_worker.enqueue("project-a", {})
+    stale = first_worker.lease("worker-1", lease_seconds=0)
+
+    taken = second_worker.lease("worker-2")
+    assert (taken.id, taken.lease_owner, taken.attempts) == ("project-a", "worker-2", 2)
+    with pytest.raises(LeaseLostError):
+        first_worker.save(stale)
+    with pytest.raises(LeaseLostError):
+        first_worker.complete(stale)
+    second_worker.complete(taken)
+    assert second_worker.get("project-a").status == DONE
+
+
+def test_a_deferred_job_keeps_its_attempt_and_waits():
+    store = _store(fake_firestore.FakeFirestoreClient())
+    store.enqueue("project-a", {})
+    job = store.lease("worker-1")
+    job.created["project"] = "PVT_1"
+
+    store.defer(job, "rate limit budget exhausted", until=time.time() + 60)
+
+    deferred = store.get("project-a")
+    assert (deferred.status, deferred.attempts, deferred.created) == (QUEUED, 0, {"project": "PVT_1"})
+    assert store.lease("worker-1") is None and store.lease_job("project-a", "worker-1") is None
+
+
+def test_a_changed_running_job_is_queued_again_when_it_finishes():
+    store = _store(fake_firestore.FakeFirestoreClient())
+    store.enqueue("project-a", {"edit": 1})
+    job = store.lease_job("project-a", "worker-1")
+    store.enqueue("project-a", {"edit": 2})
+
+    store.complete(job)
+
+    rerun = store.lease("worker-1")
+    assert (rerun.payload, rerun.attempts) == ({"edit": 2}, 1)
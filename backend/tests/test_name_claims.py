@@ -0,0 +1,37 @@
+from shared.name_claims import InMemoryNameClaims, NameGuard
+
+
+def _project(page_id: str, name: str) -> dict:
+    return {"id": page_id, "properties": {"Project Name": {"title": [{"plain_text": name}]}}}
+
+
+def test_first_tenant_to_sync_a_name_owns_it():
+    claims = InMemoryNameClaims()
+    acme, globex = NameGuard("acme", claims), NameGuard("globex", claims)
+
+    assert acme.conflicts([_project("a-1", "Website")]) == {}
+    assert acme.conflicts([_project("a-1", "Website")]) == {}
+    refused = globex.conflicts([_project("g-1", "Website"), _project("g-2", "Mobile App")])
+
+    assert list(refused) == ["g-1"]
+    assert "repo:website (acme)" in refused["g-1"] and "board:Website (acme)" in refused["g-1"]
+
+
+def test_a_refused_project_claims_nothing():
+    claims = InMemoryNameClaims()
+    NameGuard("acme", claims).conflicts([_project("a-1", "Website")])
+    # Same repo name, different board title: the free board name must stay free.
+    assert NameGuard("globex", claims).conflicts([_project("g-1", "website")])
+    assert NameGuard("initech", claims).conflicts([_project("i-1", "WEBSITE 2")]) == {}
+    assert claims.claim("acme", ["board:website"]) == {}
+
+
+def test_ownership_check_claims_nothing():
+    claims = InMemoryNameClaims()
+    acme = NameGuard("acme", claims)
+
+    assert not acme.owns(_project("a-1", "Website"))
+    assert claims.owners(["repo:website", "board:Website"]) == {}
+    acme.conflicts([_project("a-1", "Website")])
+    assert acme.owns(_project("a-1", "Website"))
+    assert not NameGuard("globex", claims).owns(_project("g-1", "Website"))
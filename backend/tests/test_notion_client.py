@@ -0,0 +1,14 @@
+from benchmarks.fake_servers import FakeNotionServer
+from benchmarks.fake_workspace import DATABASE_IDS, make_notion_workspace
+from shared.notion_client import NotionClient
+
+
+def test_dashboard_summary_matches_the_full_dashboard_from_database_queries_alone():
+    with FakeNotionServer(workspace=make_notion_workspace(40)) as server:
+        notion = NotionClient(api_key="test-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"],
+                              base_url=server.api_url, database_ids=DATABASE_IDS)
+        expected = notion.get_all_dashboard_data().aggregates
+        server.reset_counts()
+
+        assert notion.get_dashboard_summary() == expected
+        assert set(server.request_counts) == {"POST /databases/query"}
@@ -0,0 +1,89 @@
+import pytest
+
+from benchmarks.fake_servers import FakeNotionServer
+from benchmarks.fake_workspace import DATABASE_IDS, make_notion_workspace, select, relation, title, _text
+from shared.notion_client import NotionClient
+from shared.notion_mirror import NotionMirror
+from shared import webhooks
+from workers.github_sync_worker import resolve_projects
+
+
+@pytest.fixture
+def notion_server():
+    with FakeNotionServer(workspace=make_notion_workspace(20)) as server:
+        # Project 0 (with features 0-0-0 and 0-1-0 active) and project 1 (all features active), see make_notion_workspace.
+        for project_id in ("project-0", "project-1"):
+            server.workspace.pages[project_id]["properties"]["Project Status"] = select("Active")
+        yield server
+
+
+@pytest.fixture
+def notion(notion_server):
+    return NotionClient(api_key="test-notion-key", projects_db_id=DATABASE_IDS["PROJECTS_DB_ID"],
+                        base_url=notion_server.api_url, database_ids=DATABASE_IDS)
+
+
+def _edit(workspace, page_id: str, minute: int):
+    """Bumps a page's last_edited_time the way any Notion edit does."""
+    workspace.pages[page_id]["last_edited_time"] = f"2025-02-01T00:{minute:02d}:00.000Z"
+
+
+def _features(mirror: NotionMirror, workspace, project_id: str) -> dict:
+    return {feature.id: feature for feature in mirror.get_features_for_project(workspace.pages[project_id])}
+
+
+def test_feature_content_edit_reaches_the_mirror_without_touching_the_project(tmp_path, notion_server, notion):
+    workspace = notion_server.workspace
+    mirror = NotionMirror(str(tmp_path / "mirror.db"))
+    mirror.refresh(notion)
+    assert "Acceptance criteria" in _features(mirror, workspace, "project-0")["feature-0-0-0"].content
+
+    # Project 0 is not the newest page, so the incremental projects query does not return it again.
+    workspace.blocks["feature-0-0-0"] = [{"type": "paragraph", "paragraph": {"rich_text": _text("Rewritten scope.")}}]
+    _edit(workspace, "feature-0-0-0", 1)
+    written = mirror.refresh(notion)
+
+    assert written["features"] == 1
+    assert _features(mirror, workspace, "project-0")["feature-0-0-0"].content == "Rewritten scope."
+
+
+def test_feature_status_and_new_features_reach_the_mirror(tmp_path, notion_server, notion):
+    workspace = notion_server.workspace
+    mirror = NotionMirror(str(tmp_path / "mirror.db"))
+    mirror.refresh(notion)
+
+    workspace.pages["feature-1-0-1"]["properties"]["Feature Status"] = select("Backlog")
+    _edit(workspace, "feature-1-0-1", 1)
+    workspace.add_page("feature-1-0-2", {"Feature": title("Feature 1.0.2"), "Feature Status": select("Active")})
+    workspace.pages["qc-1-0"]["properties"]["Features"] = relation(["feature-1-0-0", "feature-1-0-1", "feature-1-0-2"])
+    _edit(workspace, "qc-1-0", 1)
+    mirror.refresh(notion)
+
+    features = _features(mirror, workspace, "project-1")
+    assert "feature-1-0-1" not in features
+    assert features["feature-1-0-2"].name == "Feature 1.0.2"
+    assert mirror.get_project_ids_for_page("feature-1-0-2") == ["project-1"]
+
+
+def test_unchanged_features_are_not_read_again(tmp_path, notion_server, notion):
+    mirror = NotionMirror(str(tmp_path / "mirror.db"))
+    mirror.refresh(notion)
+    notion_server.reset_counts()
+
+    assert mirror.refresh(notion)["features"] == 0
+    assert notion_server.request_counts["GET /blocks/children"] == 0
+
+
+def test_feature_webhook_resolves_to_its_project_after_refresh(tmp_path, notion_server, notion):
+    workspace = notion_server.workspace
+    mirror = NotionMirror(str(tmp_path / "mirror.db"))
+    mirror.refresh(notion)
+
+    # What the API does for a Notion page.content_updated event on a feature page.
+    workspace.blocks["feature-0-0-0"] = [{"type": "paragraph", "paragraph": {"rich_text": _text("Rewritten scope.")}}]
+    _edit(workspace, "feature-0-0-0", 1)
+    mirror.refresh(notion)
+    projects = resolve_projects(mirror, None, [webhooks.make_key(webhooks.NOTION_PAGE, "feature-0-0-0")])
+
+    assert [project["id"] for project in projects] == ["project-0"]
+    assert _features(mirror, workspace, "project-0")["feature-0-0-0"].content == "Rewritten scope."
@@ -0,0 +1,53 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from benchmarks.synthetic_data import iter_customers, iter_projects, iter_tasks, make_dashboard_data
+from shared.email_client import EmailClient
+from shared.report_renderer import ReportRenderer
+
+
+def _sections(rows: int) -> SimpleNamespace:
+    return SimpleNamespace(projects=iter_projects(rows), customers=iter_customers(rows), tasks=iter_tasks(rows))
+
+
+def test_streamed_report_is_cached_under_the_data_hash(tmp_path):
+    renderer = ReportRenderer(cache_dir=str(tmp_path))
+    key = renderer.cache_key(make_dashboard_data(20))
+    # A report rendered from the same rows on another day: no PDF rendering needed.
+    renderer.cache.put(key, b"%PDF-cached", "JVBERi1jYWNoZWQ=")
+
+    with open(renderer.render_pdf_streamed(_sections(20))) as encoded_file:
+        assert encoded_file.read() == "JVBERi1jYWNoZWQ="
+    assert renderer.cache_key(make_dashboard_data(21)) != key
+
+
+def test_template_that_skips_a_section_is_refused(tmp_path):
+    (tmp_path / "report.html").write_text("{% for p in data.projects %}{{ p.project_name }}{% endfor %}"
+                                          "{% for c in data.customers %}{{ c.company_name }}{% endfor %}")
+    renderer = ReportRenderer(template_dir=str(tmp_path), template_name="report.html", cache_dir=str(tmp_path / "cache"))
+
+    with pytest.raises(RuntimeError, match="tasks"):
+        renderer.render_pdf_streamed(_sections(5))
+
+
+def test_email_attachment_is_streamed_from_the_encoded_file(monkeypatch, tmp_path):
+    encoded_path = tmp_path / "report.b64"
+    encoded_path.write_bytes(b"JVBERi0xLjc=" * 50000)
+    sent = {}
+
+    def post(url, data, **kwargs):
+        sent["chunks"] = list(data)
+        response = requests.Response()
+        response.status_code, response._content = 201, b'{"messageId": "<1@brevo>"}'
+        return response
+
+    monkeypatch.setattr(requests, "post", post)
+    EmailClient("brevo-key", "reports@example.com").send_email_with_attachment_file(
+        "a@example.com", "Weekly report", str(encoded_path), "report.pdf")
+
+    assert len(sent["chunks"]) > 3
+    attachment = json.loads(b"".join(sent["chunks"]))["attachment"][0]
+    assert attachment == {"name": "report.pdf", "content": encoded_path.read_text()}
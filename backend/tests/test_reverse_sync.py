@@ -0,0 +1,43 @@
+from benchmarks.fake_workspace import select, status, title
+from shared.reverse_sync import (BOARD_STATUS_PROPERTY, FEATURE_STATUS_PROPERTY, ReverseSyncCursor,
+                                 get_reverse_sync_cursor, plan_feature_updates)
+
+
+def _feature_page(board_status: dict, edited_at: str = "2025-03-01T10:00:00.000Z") -> dict:
+    return {"id": "feature-1", "last_edited_time": edited_at, "properties": {
+        "Feature": title("Login"), FEATURE_STATUS_PROPERTY: select("Active"), BOARD_STATUS_PROPERTY: board_status,
+    }}
+
+
+def _change(state: str = "CLOSED", at: str = "2025-03-01T12:00:00Z") -> dict:
+    return {"title": "Login", "state": state, "status": "Done", "state_updated_at": at, "status_updated_at": at, "updated_at": at}
+
+
+def test_properties_are_written_in_their_own_type():
+    updates, conflicts = plan_feature_updates([_change()], [_feature_page(status("In Progress"))])
+    assert conflicts == []
+    assert updates[0].properties == {
+        FEATURE_STATUS_PROPERTY: {"select": {"name": "Done"}},
+        BOARD_STATUS_PROPERTY: {"status": {"name": "Done"}},
+    }
+
+    updates, _ = plan_feature_updates([_change()], [_feature_page(select("In Progress"))])
+    assert updates[0].properties[BOARD_STATUS_PROPERTY] == {"select": {"name": "Done"}}
+
+
+def test_a_later_edit_anywhere_on_the_page_keeps_notion():
+    # The page was edited after the GitHub change; Notion only says when, not which property.
+    page = _feature_page(status("In Progress"), edited_at="2025-03-01T12:05:00.000Z")
+    updates, conflicts = plan_feature_updates([_change()], [page])
+    assert updates == []
+    assert {conflict["property"] for conflict in conflicts} == {FEATURE_STATUS_PROPERTY, BOARD_STATUS_PROPERTY}
+
+
+def test_local_runs_keep_a_cursor_file_per_tenant(monkeypatch, tmp_path):
+    monkeypatch.setenv("REVERSE_SYNC_STATE_PATH", str(tmp_path / "cursor.json"))
+    cursor = get_reverse_sync_cursor("acme")
+    cursor.save("2025-03-01T12:00:00Z")
+
+    assert cursor.path == str(tmp_path / "cursor-acme.json")
+    assert ReverseSyncCursor(str(tmp_path / "cursor-acme.json")).load() == "2025-03-01T12:00:00Z"
+    assert get_reverse_sync_cursor().load() is None
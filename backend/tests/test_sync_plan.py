@@ -0,0 +1,67 @@
+import pytest
+
+from benchmarks.fake_servers import FakeGitHubServer
+from benchmarks.fake_workspace import GitHubState
+from shared.data_models import Feature
+from shared.github_client import GitHubClient
+from shared.sync_plan import GitHubSnapshot, build_plan, execute_plan
+
+PAGE = {"id": "page-1", "properties": {"Project Name": {"title": [{"plain_text": "Project One"}]}}}
+FEATURES = {"page-1": [Feature(id="feature-1", name="Login", status="Active", content="Users can sign in.")]}
+
+EMPTY = GitHubSnapshot()
+SYNCED = GitHubSnapshot(
+    repo_ids={"project-one": "R_1"},
+    project_ids={"Project One": "PVT_1"},
+    items={"PVT_1": {"Login": {"id": "I_1", "title": "Login", "body": "Users can sign in."}}},
+)
+EDITED = GitHubSnapshot(
+    repo_ids={"project-one": "R_1"},
+    project_ids={"Project One": "PVT_1"},
+    items={"PVT_1": {"Login": {"id": "I_1", "title": "Login", "body": "Old text."}}},
+)
+# An interrupted run created the repo, board and issue, but had not put the issue on the board yet.
+PARTIAL = GitHubSnapshot(repo_ids={"project-one": "R_1"}, project_ids={"Project One": "PVT_1"}, items={"PVT_1": {}})
+CREATED = {"page-1": {"repo": "bench-user/project-one", "project": "PVT_1", "issue:feature-1": "I_1"}}
+
+
+@pytest.mark.parametrize("snapshot, created, expected", [
+    pytest.param(EMPTY, None, {"repos_to_create": 1, "projects_to_create": 1, "issues_to_create": 1,
+                               "items_to_add": 1, "issues_to_update": 0, "unchanged": 0}, id="create"),
+    pytest.param(EDITED, None, {"repos_to_create": 0, "projects_to_create": 0, "issues_to_create": 0,
+                                "items_to_add": 0, "issues_to_update": 1, "unchanged": 0}, id="update"),
+    pytest.param(SYNCED, None, {"repos_to_create": 0, "projects_to_create": 0, "issues_to_create": 0,
+                                "items_to_add": 0, "issues_to_update": 0, "unchanged": 1}, id="unchanged"),
+    pytest.param(PARTIAL, CREATED, {"repos_to_create": 0, "projects_to_create": 0, "issues_to_create": 0,
+                                    "items_to_add": 1, "issues_to_update": 0, "unchanged": 0}, id="resume-from-created"),
+    pytest.param(EMPTY, CREATED, {"repos_to_create": 1, "projects_to_create": 1, "issues_to_create": 1,
+                                  "items_to_add": 1, "issues_to_update": 0, "unchanged": 0}, id="resume-repo-gone"),
+    pytest.param(GitHubSnapshot(repo_ids={"project-one": "R_1"}), CREATED,
+                 {"repos_to_create": 0, "projects_to_create": 1, "issues_to_create": 0,
+                  "items_to_add": 1, "issues_to_update": 0, "unchanged": 0}, id="resume-board-gone"),
+])
+def test_build_plan(snapshot, created, expected):
+    assert build_plan([PAGE], FEATURES, snapshot, created).counts() == expected
+
+
+def test_resumed_item_reuses_the_recorded_board_and_issue():
+    plan = build_plan([PAGE], FEATURES, PARTIAL, CREATED)
+    assert (plan.items[0].project_id, plan.items[0].issue_id) == ("PVT_1", "I_1")
+
+
+def test_resumed_item_with_the_repo_gone_uses_the_new_board_and_issue():
+    plan = build_plan([PAGE], FEATURES, EMPTY, CREATED)
+    assert (plan.items[0].project_id, plan.items[0].issue_id) == (None, None)
+
+
+def test_recorded_repo_missing_from_github_is_created_again():
+    # The job recorded the repo, but it is gone from GitHub, so the new issue needs a new repo.
+    created = {"page-1": {"repo": "bench-user/project-one"}}
+    with FakeGitHubServer(state=GitHubState()) as server:
+        github = GitHubClient(token="test-github-token", base_url=server.api_url, fetch_schema=False,
+                              seconds_between_requests=0, seconds_between_writes=0)
+        plan = build_plan([PAGE], FEATURES, GitHubSnapshot(), created)
+        counts = execute_plan(plan, github)
+
+        assert counts["repos_to_create"] == 1 and counts["issues_to_create"] == 1
+        assert [issue["repo"] for issue in server.state.issues.values()] == ["project-one"]
@@ -13,6 +13,14 @@ def get_github_token():
     Orchestrates the OAuth2 flow to get a user token for the GitHub API.
     This requires manual user interaction in a browser.
     """
+    return run_oauth_flow().get("access_token")
+
+def run_oauth_flow() -> dict:
+    """
+    Interactive sign-in returning GitHub's full token response, including `refresh_token` and
+    `expires_in` when the app issues expiring tokens. Unattended runs use shared.github_auth instead;
+    this is only its last-resort fallback.
+    """
     auth_url = f"https://github.com/login/oauth/authorize?client_id={CLIENT_ID}&scope=repo,project&redirect_uri={REDIRECT_URI}"
     
     print("Your browser will now open to authorize this application.")
@@ -52,4 +60,4 @@ def get_github_token():
     headers = {"Accept": "application/json"}
     response = requests.post(token_url, json=payload, headers=headers)
     
-    return response.json().get("access_token")
\ No newline at end of file
+    return response.json()
\ No newline at end of file
@@ -1,30 +1,53 @@
 import os
 import sys
 import json
+import time
+import uuid
+import socket
 import logging
+import argparse
+import contextvars
 from datetime import datetime
 from github import Github
-from .github_oauth_handler import get_github_token
+from .github_oauth_handler import run_oauth_flow
 
 # Add parent directory to path to import shared modules
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from shared.secrets import get_secret
 from shared.notion_client import NotionClient
+from shared.notion_mirror import get_mirror
 from shared.github_client import GitHubClient
-from shared.data_models import Feature
+from shared.github_auth import get_token_manager
+from shared.rate_budget import BudgetDeferred
+from shared.sync_plan import SyncPlan, DEFAULT_BATCH_SIZE, project_name, repo_name, plan_sync, execute_plan
+from shared.reverse_sync import get_reverse_sync_cursor, run_reverse_sync
+from shared.tenants import DEFAULT_TENANT, TenantConfig, load_tenants, select_tenants
+from shared.job_store import SyncJob, LeaseLostError, DEFAULT_LEASE_SECONDS, get_job_store
+from shared.name_claims import NameGuard
+from shared import webhooks
+from shared import telemetry
+
+# Jobs leased and planned together; their writes share batched requests.
+DEFAULT_JOBS_PER_BATCH = 25
+
+# Tenant whose sync is running, recorded on every log entry so the API can show each tenant only its own logs.
+_log_tenant = contextvars.ContextVar("log_tenant", default=DEFAULT_TENANT)
 
 # --- Structured Logging Setup ---
 def log_action(service: str, action: str, status: str, details: str):
     """Creates a structured log entry as a JSON string."""
+    tenant_id = _log_tenant.get()
     log_entry = {
         "timestamp": datetime.utcnow().isoformat() + "Z",
         "service": service,
+        "tenant": tenant_id,
         "action": action,
         "status": status,
         "details": details,
         # This payload structure is what the GCP Logging client will look for
         "jsonPayload": {
             "service": service,
+            "tenant": tenant_id,
             "action": action,
             "status": status,
             "details": details
@@ -33,92 +56,366 @@ def log_action(service: str, action: str, status: str, details: str):
     # Print the JSON string to stdout, which Cloud Logging will pick up
     print(json.dumps(log_entry))
 
-def _create_and_add_feature_to_project(github_client: GitHubClient, repo_name: str, project_id: str, feature: Feature):
-    """Helper function to create a GitHub issue and add it to a project."""
-    log_action("GitHub Sync Worker", "CREATE_ISSUE", "INFO", f"Creating issue for feature: '{feature.name}'")
-    issue = github_client.create_issue(repo_name, feature.name, feature.content)
-    github_client.add_issue_to_project(project_id, issue.node_id)
-    log_action("GitHub Sync Worker", "ADD_TO_PROJECT", "SUCCESS", f"Successfully added '{feature.name}' to project.")
+def _build_clients(notion=None, github: GitHubClient = None, tenant: TenantConfig = None):
+    """Builds the tenant's Notion source and the GitHub client from secrets unless they were injected."""
+    if github is None:
+        github = _build_github_client()
+
+    if notion is None:
+        # Project and feature reads come from the local mirror when NOTION_MIRROR_PATH is set.
+        notion = get_mirror(tenant.id if tenant else None)
+
+    if notion is None:
+        notion = _build_notion_client(tenant)
+    return notion, github
+
+def _build_github_client() -> GitHubClient:
+    # Cached, auto-refreshing token (GitHub App or refresh token); the browser flow is only a fallback.
+    return GitHubClient(token_manager=get_token_manager(os.getenv("GCP_PROJECT_ID"), interactive=run_oauth_flow))
+
+def _build_notion_client(tenant: TenantConfig = None) -> NotionClient:
+    gcp_project_id = os.getenv("GCP_PROJECT_ID")
+    if tenant is not None:
+        return tenant.notion_client(gcp_project_id)
+    # Fetch the new secret
+    projects_db_id = get_secret("PROJECTS_DB_ID", project_id=gcp_project_id)
+
+    return NotionClient(
+        api_key=get_secret("NOTION_API_KEY", project_id=gcp_project_id),
+        projects_db_id=projects_db_id
+    )
+
+def reverse_sync(notion, github: GitHubClient, since: str = None, tenant: TenantConfig = None,
+                 guard: NameGuard = None) -> dict:
+    """
+    GitHub -> Notion stage: writes issue closures, reopenings and board Status changes back to the
+    feature pages. Writes need the Notion API, so a live client is used when `notion` is the mirror.
+    With a `guard`, only boards the tenant owns are read back; the reverse sync never claims a name.
+    """
+    if not isinstance(notion, NotionClient):
+        notion = _build_notion_client(tenant)
+    # Each tenant keeps its own cursor.
+    cursor = get_reverse_sync_cursor(tenant.id if tenant else None)
+    stats = run_reverse_sync(notion, github, since=since, cursor=cursor, project_filter=guard.owns if guard else None)
+    status = "WARNING" if stats["failed"] else "SUCCESS"
+    log_action("GitHub Sync Worker", "REVERSE_SYNC", status, json.dumps(stats))
+    return stats
+
+def _log_plan(github: GitHubClient, plan: SyncPlan, batch_size: int):
+    """Logs the planned writes and whether their predicted cost fits in the remaining GitHub rate limit."""
+    calls, units = plan.operation_counts(batch_size), plan.operation_units()
+    status = "INFO" if github.fits_budget(units) else "WARNING"
+    log_action("GitHub Sync Worker", "SYNC_PLAN", status,
+               f"{json.dumps(plan.counts())}; {sum(calls.values())} API call(s) {json.dumps(calls)}; "
+               f"predicted cost {json.dumps(github.estimate(units))}; budget {json.dumps(github.budget.snapshot()['resources'])}")
+
+def sync_jobs(notion, github: GitHubClient, jobs: list[SyncJob], store, batch_size: int = DEFAULT_BATCH_SIZE,
+              lease_seconds: float = DEFAULT_LEASE_SECONDS) -> SyncPlan:
+    """
+    Plans and applies the sync of a batch of leased jobs (one per active Notion project) together,
+    so creates and updates across projects share batched requests. Resources created for a project
+    are saved on its job as they are created; a retried job is re-planned against GitHub and reuses them.
+    """
+    jobs_by_page = {job.id: job for job in jobs}
+    plan = plan_sync(notion, github, [job.payload["project_page"] for job in jobs],
+                     created={job.id: job.created for job in jobs})
+    _log_plan(github, plan, batch_size)
+    changed = set()
+    renewed_at = time.time()
 
-def run():
-    """Main function for the GitHub Sync Worker."""
+    def record(page_id: str, key: str, value: str):
+        jobs_by_page[page_id].created[key] = value
+        changed.add(page_id)
+
+    def checkpoint():
+        # Saving renews the lease, so every job is saved now and then, not only the ones that changed.
+        nonlocal renewed_at
+        renew_all = time.time() - renewed_at > lease_seconds / 3
+        for job in jobs if renew_all else [jobs_by_page[page_id] for page_id in changed]:
+            store.save(job, lease_seconds)
+        if renew_all:
+            renewed_at = time.time()
+        changed.clear()
+
+    execute_plan(plan, github, batch_size, record=record, checkpoint=checkpoint)
+    return plan
+
+def enqueue_projects(store, project_pages: list[dict]) -> int:
+    """Enqueues one job per project page, keyed by page id so repeated enqueues collapse into one job."""
+    for project_page in project_pages:
+        store.enqueue(project_page['id'], {"project_page": project_page})
+    return len(project_pages)
+
+def _settle(store, jobs: list[SyncJob], outcome: str, *args) -> int:
+    """Completes, fails or defers every job of a batch. Returns how many had lost their lease to another worker."""
+    lost = 0
+    for job in jobs:
+        try:
+            getattr(store, outcome)(job, *args)
+        except LeaseLostError as e:
+            log_action("GitHub Sync Worker", "JOB_LEASE_LOST", "WARNING", str(e))
+            lost += 1
+    return lost
+
+def drain(store, notion, github: GitHubClient, worker_id: str = None, lease_seconds: float = DEFAULT_LEASE_SECONDS,
+          jobs_per_batch: int = DEFAULT_JOBS_PER_BATCH, batch_size: int = DEFAULT_BATCH_SIZE, max_jobs: int = None,
+          job_ids: list[str] = None, guard: NameGuard = None) -> dict:
+    """
+    Leases and runs jobs, up to `jobs_per_batch` at a time, until none is available or `max_jobs`
+    have been leased (results["more"] is then True). Safe to run in several processes at once: each
+    job is leased by one worker at a time, and a job whose worker died is picked up when its lease expires.
+    With `job_ids`, only those jobs are tried; any that are not available right away (running
+    elsewhere, or waiting for a retry) are left to the next full drain. Completed ones are tried once
+    more, so a change queued while they ran (e.g. by another API worker process) is synced right away.
+    With a `guard`, jobs for projects whose GitHub names another tenant owns fail without syncing.
+    """
     service_name = "GitHub Sync Worker"
-    log_action(service_name, "WORKER_START", "INFO", "GitHub Sync Worker process started.")
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    results = {"done": 0, "failed": 0, "lost": 0, "deferred": 0, "refused": 0, "more": False}
+    leased = 0
+    untried = list(job_ids) if job_ids is not None else None
+
+    def lease():
+        if untried is None:
+            return store.lease(worker_id, lease_seconds)
+        while untried:
+            job = store.lease_job(untried.pop(0), worker_id, lease_seconds)
+            if job is not None:
+                return job
+        return None
+
+    while True:
+        if max_jobs is not None and leased >= max_jobs:
+            results["more"] = True
+            break
+        jobs = []
+        limit = jobs_per_batch if max_jobs is None else min(jobs_per_batch, max_jobs - leased)
+        while len(jobs) < limit:
+            job = lease()
+            if job is None:
+                break
+            jobs.append(job)
+        if not jobs:
+            break
+        leased += len(jobs)
+        if guard:
+            refused = guard.conflicts([job.payload["project_page"] for job in jobs])
+            for job in [job for job in jobs if job.id in refused]:
+                log_action(service_name, "JOB_REFUSED", "FAILED", f"{job.id}: {refused[job.id]}")
+                results["lost"] += _settle(store, [job], "fail", refused[job.id])
+                results["refused"] += 1
+            jobs = [job for job in jobs if job.id not in refused]
+            if not jobs:
+                continue
+        try:
+            with telemetry.span("github_sync_worker.jobs", jobs=len(jobs)):
+                sync_jobs(notion, github, jobs, store, batch_size, lease_seconds)
+            lost = _settle(store, jobs, "complete")
+            results["done"] += len(jobs) - lost
+            if untried is not None:
+                untried.extend(job.id for job in jobs)
+        except LeaseLostError as e:
+            # Another worker owns one of the jobs now; it re-plans that project, and the rest are retried.
+            log_action(service_name, "JOB_LEASE_LOST", "WARNING", str(e))
+            lost = _settle(store, jobs, "fail", str(e))
+            results["lost"] += lost
+            results["failed"] += len(jobs) - lost
+        except BudgetDeferred as e:
+            # Created resources stay recorded on the jobs; they are re-planned after the rate limit resets.
+            lost = _settle(store, jobs, "defer", str(e), e.retry_at)
+            log_action(service_name, "JOB_DEFERRED", "WARNING", f"{len(jobs) - lost} job(s): {e}")
+            results["deferred"] += len(jobs) - lost
+            results["lost"] += lost
+        except Exception as e:
+            lost = _settle(store, jobs, "fail", str(e))
+            log_action(service_name, "JOB_FAILED", "FAILED",
+                       f"{len(jobs) - lost} job(s) failed (attempts {sorted({job.attempts for job in jobs})}): {e}")
+            results["failed"] += len(jobs) - lost
+            results["lost"] += lost
+    return results
+
+def dry_run(notion, github: GitHubClient, batch_size: int = DEFAULT_BATCH_SIZE) -> SyncPlan:
+    """Plans a sync of every active project and prints it without writing anything or queueing jobs."""
+    plan = plan_sync(notion, github, notion.get_active_projects())
+    _log_plan(github, plan, batch_size)
+    for line in plan.describe():
+        print(line)
+    return plan
+
+def run(notion: NotionClient = None, github: GitHubClient = None, store=None, drain_only: bool = False,
+        plan_only: bool = False, batch_size: int = DEFAULT_BATCH_SIZE, bidirectional: bool = False, since: str = None,
+        tenant: TenantConfig = None, max_jobs: int = None, guard: NameGuard = None) -> dict:
+    """
+    Main function for the GitHub Sync Worker. Enqueues a job per active project, then drains the queue.
+    With `drain_only`, only drains, so extra instances can share the work of a running sweep.
+    With `plan_only`, prints the planned writes and their cost instead (dry run).
+    With `bidirectional`, first applies GitHub changes since `since` (or the stored cursor) to Notion.
+    `tenant` selects the Notion workspace and job queue (the single-workspace setup by default) and
+    `max_jobs` stops draining after that many jobs. `guard` refuses projects whose GitHub names another
+    tenant owns. Returns the drain results, or None if nothing was drained.
+    Clients are built from secrets unless injected (e.g. pointed at local stand-in servers by the benchmarks).
+    """
+    service_name = "GitHub Sync Worker"
+    log_tenant = _log_tenant.set(tenant.id if tenant else DEFAULT_TENANT)
+    tenant_label = f" for tenant '{tenant.id}'" if tenant else ""
+    log_action(service_name, "WORKER_START", "INFO", f"GitHub Sync Worker process started{tenant_label}.")
+    accounting = telemetry.start_call_accounting()
+    run_span = telemetry.start_span("github_sync_worker.run")
+    results = None
     
     try: 
         # --- 1. Initialization ---
-        gcp_project_id = os.getenv("GCP_PROJECT_ID")
-        github_token = get_github_token() # Handles OAuth flow
-        
-        if not github_token:
-            raise Exception("Could not obtain GitHub token.")
-
-        
-        # Fetch the new secret
-        projects_db_id = get_secret("PROJECTS_DB_ID", project_id=gcp_project_id)
-
-        notion = NotionClient(
-            api_key=get_secret("NOTION_API_KEY", project_id=gcp_project_id),
-            projects_db_id=projects_db_id
-        )
-        github = GitHubClient(token=github_token)
-
-        # --- 2. Fetch Initial State ---
-        notion_projects = notion.get_active_projects()
-        github_repos = github.get_all_repos()
-        github_projects_map = {p['title']: p for p in github.get_all_projects()}
-
-        # --- 3. Sync Loop ---
-        for project_page in notion_projects:
-            project_name = project_page['properties']['Project Name']['title'][0]['plain_text']
-            repo_name = project_name.replace(" ", "-").lower()
-
-            if repo_name not in github_repos:
-                # CREATE FLOW
-                log_action(service_name, "CREATE_REPO", "INFO", f"Project '{project_name}' not found. Creating...")
-                # 3.1 Create Repo and Project
-                repo = github.create_repo(repo_name, f"Repo for {project_name}")
-                project_id = github.create_project(project_name)
-                log_action(service_name, "CREATE_PROJECT", "SUCCESS", f"Created repo '{repo.full_name}' and project ID '{project_id}'")
-
-                # 3.2 Create Issues from Features
-                features = notion.get_features_for_project(project_page)
-                for feature in features:
-                    _create_and_add_feature_to_project(github, repo_name, project_id, feature)
-            else:
-                # UPDATE FLOW
-                log_action(service_name, "UPDATE_PROJECT", "INFO", f"Project '{project_name}' exists. Checking for updates.")
-                if project_name in github_projects_map:
-                    print(f"Warning: Repo '{repo_name}' exists but project '{project_name}' does not. Skipping update.")
-                    continue
-
-                # This is where the logic from update_github_projects.js is implemented.
-                project_id = github_projects_map[project_name]['id']
-                github_items = github.get_project_items(project_id)
-                github_items_map = {item['content']['title']: item['content'] for item in github_items}
-                
-                notion_features = notion.get_features_for_project(project_page)
-
-                for feature in notion_features:
-                    existing_item = github_items_map.get(feature.name)
-
-                    if existing_item:
-                        # Item exists, check if content needs updating
-                        if existing_item['body'] != feature.content:
-                            print(f"  - Updating content for item: '{feature.name}'")
-                            github.update_issue_body(existing_item['id'], feature.content)
-                        else:
-                            print(f"  - Item '{feature.name}' is already up-to-date.")
-                    else:
-                        # Item does not exist, create it
-                        print(f"  - New feature '{feature.name}' found for existing project.")
-                        _create_and_add_feature_to_project(github, repo_name, project_id, feature)
+        notion, github = _build_clients(notion, github, tenant)
+
+        if plan_only:
+            dry_run(notion, github, batch_size)
+        else:
+            store = store or get_job_store(tenant.id if tenant else None)
+
+            # --- 2. Pull GitHub changes into Notion, so closed features are not pushed again ---
+            if bidirectional and not drain_only:
+                reverse_sync(notion, github, since, tenant, guard)
+
+            # --- 3. Enqueue a job per active project ---
+            if not drain_only:
+                queued = enqueue_projects(store, notion.get_active_projects())
+                log_action(service_name, "JOBS_QUEUED", "INFO", f"Queued {queued} project sync job(s).")
+
+            # --- 4. Drain the queue (including jobs left behind by failed runs) ---
+            results = drain(store, notion, github, batch_size=batch_size, max_jobs=max_jobs, guard=guard)
+            log_action(service_name, "JOBS_DRAINED", "INFO", json.dumps(results))
     except Exception as e:
+        run_span.end(error=e)
         log_action(service_name, "WORKER_FAILURE", "FAILED", f"An unexpected error occurred: {str(e)}")
     
+    run_span.end()
+    api_calls = telemetry.stop_call_accounting(accounting)
+    log_action(service_name, "API_CALLS", "INFO", f"{sum(api_calls.values())} outbound calls: {json.dumps(api_calls, sort_keys=True)}")
     log_action(service_name, "WORKER_END", "INFO", "GitHub Sync Worker process finished.")
     
     print("\n--- GitHub Sync Worker Finished ---")
+    _log_tenant.reset(log_tenant)
+    return results
+
+def run_tenants(tenant_ids: list[str] = None, shard: int = 0, shards: int = 1, jobs_per_turn: int = DEFAULT_JOBS_PER_BATCH,
+                github: GitHubClient = None, tenants: dict = None, **options):
+    """
+    Syncs every tenant (or the named ones) that falls in this worker's shard, so tenants can be spread
+    over `shards` worker instances. Tenants take turns of at most `jobs_per_turn` jobs: each is queued
+    and drained for one turn, then the ones with jobs left are drained round-robin, so one tenant's
+    large workspace does not hold back the others' syncs. The GitHub client and its rate budget are shared.
+    Since the tenants then share one GitHub account, each repo and board name belongs to the first tenant
+    that syncs it (see shared.name_claims) and another tenant's project with the same name is refused.
+    """
+    tenants = tenants or load_tenants(os.getenv("GCP_PROJECT_ID"))
+    mine = select_tenants(tenants, tenant_ids, shard, shards)
+    log_action("GitHub Sync Worker", "SHARD_START", "INFO",
+               f"Shard {shard + 1}/{shards}: {len(mine)} tenant(s) {[tenant.id for tenant in mine]}.")
+    if not mine:
+        return
+    github = github or _build_github_client()
+    drain_only = options.pop("drain_only", False)
+
+    busy = mine
+    first_turn = True
+    while busy:
+        still_busy = []
+        for tenant in busy:
+            # A single-workspace deployment has nobody to collide with.
+            guard = NameGuard(tenant.id) if len(tenants) > 1 else None
+            results = run(github=github, tenant=tenant, max_jobs=jobs_per_turn,
+                          drain_only=drain_only or not first_turn, guard=guard, **options)
+            if results and results["more"]:
+                still_busy.append(tenant)
+        busy, first_turn = still_busy, False
+
+def resolve_projects(notion, github: GitHubClient, keys: list[str]) -> list[dict]:
+    """
+    Maps webhook queue keys (see shared.webhooks) to the active Notion project pages they affect.
+    If a changed Notion page cannot be tied to a project, every active project is returned.
+    """
+    active_projects = notion.get_active_projects()
+    selected, unresolved = {}, []
+    github_project_titles = None
+    project_ids_for_page = getattr(notion, "get_project_ids_for_page", None)  # only the local mirror has the reverse index
+
+    for key in keys:
+        kind, value = webhooks.split_key(key)
+        if kind == webhooks.NOTION_PAGE:
+            linked_ids = project_ids_for_page(value) if project_ids_for_page else None
+            if linked_ids is not None:
+                matches = [p for p in active_projects if p['id'] in linked_ids]
+            else:
+                # Without the mirror we can still recognise project and quality characteristic pages.
+                matches = [
+                    p for p in active_projects
+                    if p['id'] == value or value in [r['id'] for r in p['properties']['Quality Characteristic'].get('relation', [])]
+                ]
+                if not matches:
+                    unresolved.append(key)
+        elif kind == webhooks.GITHUB_REPO:
+            matches = [p for p in active_projects if repo_name(project_name(p)) == value]
+        elif kind == webhooks.GITHUB_PROJECT:
+            if github_project_titles is None:
+                github_project_titles = {p['id']: p['title'] for p in github.get_all_projects()}
+            matches = [p for p in active_projects if project_name(p) == github_project_titles.get(value)]
+        else:
+            matches = []
+        for project_page in matches:
+            selected[project_page['id']] = project_page
+
+    if unresolved:
+        print(f"Could not map {unresolved} to a project; syncing all {len(active_projects)} active projects.")
+        return active_projects
+    return list(selected.values())
+
+def sync_targets(keys: list[str], notion: NotionClient = None, github: GitHubClient = None, store=None,
+                 drain_now: bool = True, tenant_id: str = DEFAULT_TENANT, guard: NameGuard = None):
+    """
+    Event-driven counterpart of run(): syncs only the projects affected by a batch of webhook keys.
+    Called by the API's coalescing queue once a burst of events for a project has settled. With
+    `drain_now` False (the API shutting down) the jobs are only queued, for the sync worker to run.
+    `tenant_id` selects the Notion workspace and job queue when they are not injected and labels the logs;
+    `guard` refuses projects whose GitHub names another tenant owns.
+    """
+    service_name = "GitHub Sync Worker"
+    log_tenant = _log_tenant.set(tenant_id)
+    log_action(service_name, "TARGETED_SYNC_START", "INFO", f"Targeted sync for {len(keys)} changed item(s).")
+    accounting = telemetry.start_call_accounting()
+    
+    try:
+        with telemetry.span("github_sync_worker.sync_targets", keys=len(keys)):
+            tenant = None
+            if notion is None:
+                tenant = load_tenants(os.getenv("GCP_PROJECT_ID")).get(tenant_id) or TenantConfig(tenant_id)
+            notion, github = _build_clients(notion, github, tenant)
+            store = store or get_job_store(tenant_id)
+            project_pages = resolve_projects(notion, github, keys)
+            enqueue_projects(store, project_pages)
+            # Only this batch's jobs: the rest of the queue (e.g. a scheduled sweep's backlog) is the sync worker's.
+            results = (drain(store, notion, github, job_ids=[p['id'] for p in project_pages], guard=guard)
+                       if drain_now else {"queued_only": True})
+            log_action(service_name, "TARGETED_SYNC", "SUCCESS",
+                       f"Queued {len(project_pages)} project(s) {[project_name(p) for p in project_pages]}: {json.dumps(results)}")
+    except Exception as e:
+        log_action(service_name, "WORKER_FAILURE", "FAILED", f"An unexpected error occurred: {str(e)}")
+
+    api_calls = telemetry.stop_call_accounting(accounting)
+    log_action(service_name, "API_CALLS", "INFO", f"{sum(api_calls.values())} outbound calls: {json.dumps(api_calls, sort_keys=True)}")
+    _log_tenant.reset(log_tenant)
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Sync active Notion projects to GitHub.")
+    parser.add_argument("--drain-only", action="store_true", help="Only work through already-queued jobs (extra parallel instances).")
+    parser.add_argument("--dry-run", action="store_true", help="Print the planned GitHub writes and their API cost, then exit.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Mutations per batched GraphQL request.")
+    parser.add_argument("--bidirectional", action="store_true", help="Also write GitHub issue state and board Status back to Notion.")
+    parser.add_argument("--since", help="ISO 8601 time to read GitHub changes from (default: where the last reverse sync stopped).")
+    parser.add_argument("--tenant", action="append", help="Only sync this tenant (repeatable; default: every tenant in TENANTS).")
+    parser.add_argument("--shard", type=int, default=0, help="This worker's shard, 0-based (with --shards).")
+    parser.add_argument("--shards", type=int, default=1, help="Number of worker instances the tenants are spread over.")
+    parser.add_argument("--jobs-per-turn", type=int, default=DEFAULT_JOBS_PER_BATCH, help="Jobs a tenant runs before the next tenant's turn.")
+    args = parser.parse_args()
+    run_tenants(tenant_ids=args.tenant, shard=args.shard, shards=args.shards, jobs_per_turn=args.jobs_per_turn,
+                drain_only=args.drain_only, plan_only=args.dry_run, batch_size=args.batch_size,
+                bidirectional=args.bidirectional, since=args.since)
\ No newline at end of file
@@ -0,0 +1,69 @@
+import os
+import sys
+import time
+import argparse
+
+# Add parent directory to path to import shared modules
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from shared.secrets import get_secret
+from shared.notion_client import NotionClient
+from shared.notion_mirror import NotionMirror, get_mirror
+from shared.tenants import TenantConfig, load_tenants, select_tenants
+from shared import telemetry
+
+def run(notion: NotionClient = None, mirror: NotionMirror = None, full: bool = False, tenant: TenantConfig = None) -> dict:
+    """
+    Pulls pages edited since the last refresh into the local SQLite mirror (NOTION_MIRROR_PATH).
+    This is the only component that reads from Notion when the mirror is enabled.
+    `tenant` selects the workspace and its mirror file (the single-workspace setup by default).
+    """
+    print(f"--- Notion Mirror Refresh Worker Started{f' (tenant {tenant.id})' if tenant else ''} ---")
+    accounting = telemetry.start_call_accounting()
+    gcp_project_id = os.getenv("GCP_PROJECT_ID")
+
+    mirror = mirror or get_mirror(tenant.id if tenant else None)
+    if mirror is None:
+        raise Exception("NOTION_MIRROR_PATH is not set.")
+
+    if notion is None and tenant is not None:
+        notion = tenant.notion_client(gcp_project_id)
+    if notion is None:
+        notion = NotionClient(
+            api_key=get_secret("NOTION_API_KEY", project_id=gcp_project_id),
+            projects_db_id=get_secret("PROJECTS_DB_ID", project_id=gcp_project_id)
+        )
+
+    written = mirror.refresh(notion, full=full)
+
+    api_calls = telemetry.stop_call_accounting(accounting)
+    print(f"Outbound API calls this run: {sum(api_calls.values())} {api_calls}")
+    print("--- Notion Mirror Refresh Worker Finished ---")
+    return written
+
+def run_tenants(tenant_ids: list[str] = None, shard: int = 0, shards: int = 1, full: bool = False) -> dict:
+    """
+    Refreshes the mirrors of the tenants in this worker's shard, one after another. Spreading tenants
+    over several instances (--shards) keeps a large workspace from delaying the others' refreshes.
+    A tenant whose refresh fails is reported and the rest still run.
+    """
+    written = {}
+    for tenant in select_tenants(load_tenants(os.getenv("GCP_PROJECT_ID")), tenant_ids, shard, shards):
+        try:
+            written[tenant.id] = run(full=full, tenant=tenant)
+        except Exception as e:
+            print(f"Mirror refresh for tenant '{tenant.id}' failed: {e}")
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Refresh the local Notion mirror.")
+    parser.add_argument("--full", action="store_true", help="Re-read every page and drop rows deleted in Notion.")
+    parser.add_argument("--interval", type=int, default=0, help="Keep running, refreshing every N seconds.")
+    parser.add_argument("--tenant", action="append", help="Only refresh this tenant (repeatable; default: every tenant in TENANTS).")
+    parser.add_argument("--shard", type=int, default=0, help="This worker's shard, 0-based (with --shards).")
+    parser.add_argument("--shards", type=int, default=1, help="Number of worker instances the tenants are spread over.")
+    args = parser.parse_args()
+
+    run_tenants(args.tenant, args.shard, args.shards, full=args.full)
+    while args.interval:
+        time.sleep(args.interval)
+        run_tenants(args.tenant, args.shard, args.shards)
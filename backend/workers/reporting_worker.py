@@ -1,10 +1,6 @@
 import os
-import base64
 from datetime import datetime, timedelta
-
-from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
-
+from types import SimpleNamespace
 
 # Important: Adjust path to import from the shared module
 import sys
@@ -12,41 +8,41 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from shared.secrets import get_secret
 from shared.notion_client import NotionClient
+from shared.notion_mirror import get_mirror
 from shared.email_client import EmailClient
 from shared.messaging_client import MessagingClient
 from shared.generative_ai_client import GenerativeAIClient
 from shared.calendar_client import CalendarClient
+from shared.report_renderer import get_report_renderer
+from shared.data_models import DashboardData
+from shared.agenda import build_agenda_prompt
+from shared.aggregates import DashboardAggregator
+from shared import telemetry
 
-def _create_agenda_prompt(data) -> str:
-    """Helper function to format Notion data into a prompt for Gemini."""
-    prompt = "Generate a concise meeting agenda for the Neuroflux weekly sync. Focus on status changes, upcoming tasks, and risks.\n\n"
-    
-    prompt += "== Active Projects ==\n"
-    for project in data.projects:
-        if project.status == "Active":
-            prompt += f"- {project.project_name}: Status is {project.status}, currently in stage '{project.stage}'.\n"
+def _tap(rows, keep, sink: list):
+    """Passes streamed rows through unchanged while collecting the ones matching `keep` into `sink`."""
+    for row in rows:
+        if keep(row):
+            sink.append(row)
+        yield row
 
-    prompt += "\n== Key Upcoming Tasks (Not Done) ==\n"
-    for task in data.tasks:
-        if task.status != 'Done':
-            prompt += f"- {task.title} (Assigned to: {task.responsible_name or 'N/A'})\n"
-            
-    prompt += "\n== Customer Pipeline Highlights ==\n"
-    for customer in data.customers:
-        if customer.crm_phase != "Done":
-             prompt += f"- {customer.company_name}: Currently in '{customer.crm_phase}' phase. Next step: {customer.next_step_summary}\n"
-
-    prompt += "\nBased on this data, create a bulleted agenda."
-    return prompt
+def _create_agenda_prompt(data) -> str:
+    """Helper function to format Notion data into a ranked, token-budgeted prompt for Gemini."""
+    return build_agenda_prompt(data)
 
 def run():
     """Main function for the Reporting & Comms Worker."""
     print("--- Reporting & Comms Worker Started ---")
+    accounting = telemetry.start_call_accounting()
     
     # --- 1. Initialization ---
     gcp_project_id = os.getenv("GCP_PROJECT_ID")
     
-    notion = NotionClient(api_key=get_secret("NOTION_API_KEY", project_id=gcp_project_id))
+    # The local mirror (kept fresh by mirror_refresh_worker) serves the rows when configured.
+    notion = get_mirror() or NotionClient(
+        api_key=get_secret("NOTION_API_KEY", project_id=gcp_project_id),
+        projects_db_id=get_secret("PROJECTS_DB_ID", project_id=gcp_project_id)
+    )
     email_client = EmailClient(
         api_key=get_secret("BREVO_API_KEY", project_id=gcp_project_id),
         sender_email=get_secret("SENDER_EMAIL", project_id=gcp_project_id)
@@ -60,8 +56,17 @@ def run():
     calendar_client = CalendarClient() 
 
     # --- 2. Fetch Data ---
-    print("Fetching data from Notion...")
-    dashboard_data = notion.get_all_dashboard_data()
+    # Rows are streamed from Notion straight into the report as it renders. Only the rows
+    # the agenda prompt needs are kept, so the full dataset is never held in memory; the
+    # summary counts for the prompt are taken in the same pass.
+    print("Streaming dashboard data...")
+    agenda_data = DashboardData()
+    aggregator = DashboardAggregator()
+    report_sections = SimpleNamespace(
+        projects=_tap(aggregator.tap("projects", notion.iter_dashboard_rows("projects")), lambda p: p.status == "Active", agenda_data.projects),
+        customers=_tap(aggregator.tap("customers", notion.iter_dashboard_rows("customers")), lambda c: c.crm_phase != "Done", agenda_data.customers),
+        tasks=_tap(aggregator.tap("tasks", notion.iter_dashboard_rows("tasks")), lambda t: t.status != "Done", agenda_data.tasks),
+    )
     # In a real scenario, you'd fetch stakeholder contacts here.
     # For now, we'll use a mock list.
     stakeholders = [
@@ -71,17 +76,12 @@ def run():
     
     # --- 3. Generate PDF Report ---
     print("Generating PDF report...")
-    template_env = Environment(loader=FileSystemLoader('templates/'))
-    template = template_env.get_template('report_template.html')
-    
     current_date = datetime.now().strftime("%B %d, %Y")
-    html_out = template.render(data=dashboard_data, generation_date=current_date)
-    
-    pdf_bytes = HTML(string=html_out).write_pdf()
+    # HTML, PDF and base64 are spooled to temp files; PDF rendering is skipped on a cache hit.
+    # The base64 file stays in the report cache and is streamed into each email request.
+    encoded_pdf_path = get_report_renderer().render_pdf_streamed(report_sections)
+    agenda_data.aggregates = aggregator.result()
     pdf_name = f"Neuroflux_Weekly_Report_{datetime.now().strftime('%Y-%m-%d')}.pdf"
-    
-    # We must base64 encode the bytes for the Brevo API attachment
-    encoded_pdf = base64.b64encode(pdf_bytes).decode('utf-8')
 
     # --- 4. Distribute Report ---
     print("Distributing report to stakeholders...")
@@ -89,10 +89,10 @@ def run():
         subject = f"Neuroflux Weekly Status Report - {current_date}"
         
         if stakeholder.get("email"):
-            email_client.send_email_with_attachment(
+            email_client.send_email_with_attachment_file(
                 to_email=stakeholder["email"],
                 subject=subject,
-                pdf_data=encoded_pdf,
+                encoded_pdf_path=encoded_pdf_path,
                 pdf_name=pdf_name
             )
         
@@ -107,26 +107,40 @@ def run():
     print("\nStarting Meeting & Agenda Automation...")
     
     # Generate Agenda
-    agenda_prompt = _create_agenda_prompt(dashboard_data)
+    agenda_prompt = _create_agenda_prompt(agenda_data)
     print("Generating agenda with Gemini...")
     generated_agenda = ai_client.generate_meeting_agenda(agenda_prompt)
     print("Agenda Generated:\n", generated_agenda)
 
-    # Schedule Meeting
+    # Schedule Meetings: the weekly sync, then a half-hour sync per active project.
     attendee_emails = [s['email'] for s in stakeholders]
-    next_monday = datetime.now() + timedelta(days=(7 - datetime.now().weekday()))
-    start_time = next_monday.replace(hour=9, minute=0, second=0, microsecond=0).isoformat() + 'Z'
-    end_time = next_monday.replace(hour=10, minute=0, second=0, microsecond=0).isoformat() + 'Z'
-    
-    print(f"Scheduling meeting for {start_time} with attendees: {attendee_emails}")
-    calendar_client.create_event(
-        summary="Neuroflux Weekly Project Sync",
-        description=generated_agenda,
-        start_time=start_time,
-        end_time=end_time,
-        attendees=attendee_emails
-    )
+    next_monday = (datetime.now() + timedelta(days=(7 - datetime.now().weekday()))).replace(hour=9, minute=0, second=0, microsecond=0)
+    week = next_monday.strftime("%G-W%V")
+    meetings = [{
+        "key": f"weekly-sync:{week}",
+        "summary": "Neuroflux Weekly Project Sync",
+        "description": generated_agenda,
+        "start_time": next_monday.isoformat() + 'Z',
+        "end_time": (next_monday + timedelta(hours=1)).isoformat() + 'Z',
+        "attendees": attendee_emails,
+    }]
+    for index, project in enumerate(agenda_data.projects):
+        start = next_monday + timedelta(hours=1, minutes=30 * index)
+        meetings.append({
+            "key": f"project-sync:{project.id}:{week}",
+            "summary": f"{project.project_name} Sync",
+            "description": f"Stage: {project.stage}\nProcess step: {project.process_step}\nManager: {project.manager}",
+            "start_time": start.isoformat() + 'Z',
+            "end_time": (start + timedelta(minutes=30)).isoformat() + 'Z',
+            "attendees": attendee_emails,
+        })
+    # Every meeting of the run is created, or updated on a rerun, in batched requests.
+    print(f"Scheduling {len(meetings)} meeting(s) from {meetings[0]['start_time']} with attendees: {attendee_emails}")
+    calendar_client.schedule_events(meetings)
 
+    api_calls = telemetry.stop_call_accounting(accounting)
+    print(f"Outbound API calls this run: {sum(api_calls.values())} {api_calls}")
+    print(f"Span latencies: {telemetry.metrics_snapshot()}")
     print("--- Reporting & Comms Worker Finished ---")
 
 if __name__ == "__main__":
@@ -12,6 +12,13 @@ const KanbanCard = ({ title, details, statusClass }) => (
     </div>
 );
 
+const SummaryTile = ({ label, value, statusClass }) => (
+    <div className={`kanban-card summary-tile ${statusClass || ''}`}>
+        <p className="card-detail">{label}</p>
+        <strong>{value}</strong>
+    </div>
+);
+
 const Dashboard = ({ activeView, onLogout, onNavigate, setFlashMessage }) => {
     const [data, setData] = useState(null);
     const [error, setError] = useState('');
@@ -94,6 +101,9 @@ const Dashboard = ({ activeView, onLogout, onNavigate, setFlashMessage }) => {
         }, {});
     }
 
+    // The full dashboard response already carries the summary counts; no separate /dashboard/summary request.
+    const counts = data.aggregates;
+
     const projectsByStage = groupBy(data.projects, "stage")
     const customersByPhase = groupBy(data.customers, "crm_phase");
     const stakeholdersByPhase = groupBy(data.stakeholders, "stakeholder_phase");
@@ -121,6 +131,15 @@ const Dashboard = ({ activeView, onLogout, onNavigate, setFlashMessage }) => {
                 <div id="dashboard" className={`section ${activeView === 'dashboard' ? 'active' : ''}`}>
                     <h2>Dashboard</h2>
 
+                    {counts && (
+                        <div className="content-section summary-bar">
+                            <SummaryTile label="Open Tasks" value={counts.open_tasks} statusClass="status-progress" />
+                            <SummaryTile label="Overdue Tasks" value={counts.overdue_tasks} statusClass={counts.overdue_tasks ? "status-danger" : "status-success"} />
+                            <SummaryTile label="Active Projects" value={`${counts.active_projects} / ${counts.totals.projects}`} statusClass="status-info" />
+                            <SummaryTile label="Customers" value={counts.totals.customers} />
+                        </div>
+                    )}
+
                     <div className="content-section">
                         <h3>Projects Status</h3>
                         <div className="kanban-board">
@@ -164,7 +183,7 @@ const Dashboard = ({ activeView, onLogout, onNavigate, setFlashMessage }) => {
                         <div className="kanban-board">
                             {customerPhases.map(phase => (
                                 <div className="kanban-column" key={phase}>
-                                    <h3>{phase}</h3>
+                                    <h3>{phase}{counts && ` (${counts.customers_by_crm_phase[phase || "Unspecified"] || 0})`}</h3>
                                     {data.customers
                                         .filter(c => c.crm_phase === phase)
                                         .map(c => (
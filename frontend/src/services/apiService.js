@@ -51,6 +51,35 @@ export const getDashboardData = async () => {
     return response.json();
 };
 
+/**
+ * Fetches the dashboard summary counts (by status, assignee and CRM phase; overdue tasks)
+ * without the underlying rows. For views that do not load the full dashboard, whose
+ * response already includes these counts as `aggregates`.
+ * @returns {Promise<object>} The dashboard aggregates.
+ */
+export const getDashboardSummary = async () => {
+    const token = localStorage.getItem('jwt_token');
+    if (!token) {
+        throw new Error('No authentication token found.');
+    }
+
+    const response = await fetch(`${API_URL}/dashboard/summary`, {
+        method: 'GET',
+        headers: {
+            'Authorization': `Bearer ${token}`,
+        },
+    });
+
+    if (response.status === 401) {
+        throw new Error('Unauthorized: Token expired or invalid');
+    }
+
+    if (!response.ok) {
+        throw new Error('Failed to fetch dashboard summary.');
+    }
+    return response.json();
+};
+
 /**
  * Removes the token from local storage.
  */